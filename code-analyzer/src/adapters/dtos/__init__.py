@@ -3,4 +3,5 @@ from .conversation import ConversationDTO as ConversationDTO
 from .content import ContentDTO as ContentDTO
 from .document import DocumentDTO as DocumentDTO
 from .repository import RepositoryDTO, TypeRepositoryEnum
+from .changed_file import ChangedFileDTO, ChangeStatusEnum
 from .user_prefer import UserPreferDTO
@@ -0,0 +1,19 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ChangeStatusEnum(str, Enum):
+    ADDED = 'added'
+    MODIFIED = 'modified'
+    RENAMED = 'renamed'
+    REMOVED = 'removed'
+
+
+class ChangedFileDTO(BaseModel):
+    path: str
+    status: ChangeStatusEnum = ChangeStatusEnum.MODIFIED
+    sha: Optional[str] = None
+    previous_path: Optional[str] = None
+    patch: Optional[str] = None
+    size: Optional[int] = None
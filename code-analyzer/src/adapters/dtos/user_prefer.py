@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 
 from .repository import RepositoryDTO
+from .changed_file import ChangedFileDTO
 
 
 class UserPreferDTO(BaseModel):
@@ -13,4 +14,7 @@ class UserPreferDTO(BaseModel):
     token: str = Field(...)
     repository: RepositoryDTO
     analyze_full_project: Optional[bool] = False
-    modified_files: Optional[List[str]] = None
\ No newline at end of file
+    modified_files: Optional[List[str]] = None
+    changed_files: Optional[List[ChangedFileDTO]] = None
+    head_sha: Optional[str] = None
+    base_sha: Optional[str] = None
\ No newline at end of file
@@ -1,6 +1,12 @@
+from .vector_index import VectorIndex as VectorIndex
 from .rag import RAG as RAG
 from .llm_gateway import LLMGateway as LLMGateway
+from .embedding_cache import EmbeddingCache as EmbeddingCache
 from .model_embeddings import ModelEmbeddings as ModelEmbeddings
+from .client_registry import ClientRegistry as ClientRegistry
+from .llm_cache import LLMCache as LLMCache
+from .context_cache import ContextCache as ContextCache
+from .rate_limiter import RateLimiter as RateLimiter, LLMQuotaExceededError as LLMQuotaExceededError
 from .context_conversation import ContextConversation as ContextConversation
 from .users import User as User
 from .groups import UserGroup as UserGroup
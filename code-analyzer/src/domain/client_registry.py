@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain_google_vertexai import ChatVertexAI
+
+from ..utils import Environment
+from .model_embeddings import ModelEmbeddings
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """
+    Registro de clientes Vertex AI compartilhados pelo processo.
+
+    Cada cliente é criado uma única vez por (tipo, modelo, projeto, localização) e
+    reutilizado pelas threads do worker, tirando do caminho crítico a leitura de
+    credenciais e a abertura do canal gRPC.
+    """
+
+    _clients: Dict[Tuple[str, Optional[str], Optional[str], Optional[str]], Any] = {}
+    _locks: Dict[Tuple[str, Optional[str], Optional[str], Optional[str]], threading.Lock] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def chat(model_name: Optional[str] = None, project: Optional[str] = None,
+             location: Optional[str] = None) -> ChatVertexAI:
+        """
+        Retorna o cliente de chat para o modelo informado (padrão: GOOGLE_AI_MODEL_NAME).
+        """
+        model_name = model_name or Environment.get("GOOGLE_AI_MODEL_NAME")
+        project = project or Environment.get("GOOGLE_PROJECT")
+        location = location or Environment.get("GOOGLE_LOCATION")
+
+        return ClientRegistry._get(
+            ("chat", model_name, project, location),
+            # As novas tentativas ficam a cargo do RateLimiter, que ajusta a concorrência aos erros de cota
+            lambda: ChatVertexAI(model_name=model_name, project=project, location=location, max_retries=1)
+        )
+
+    @staticmethod
+    def embeddings(model_name: Optional[str] = None, project: Optional[str] = None,
+                   location: Optional[str] = None) -> ModelEmbeddings:
+        """
+        Retorna o cliente de embeddings para o modelo informado (padrão: EMBEDDINGS_MODEL_NAME).
+        """
+        model_name = model_name or Environment.get("EMBEDDINGS_MODEL_NAME") or ModelEmbeddings.DEFAULT_MODEL_NAME
+        project = project or Environment.get("GOOGLE_PROJECT")
+        location = location or Environment.get("GOOGLE_LOCATION")
+
+        return ClientRegistry._get(
+            ("embeddings", model_name, project, location),
+            lambda: ModelEmbeddings(model_name=model_name, project=project, location=location)
+        )
+
+    @staticmethod
+    def warm_up() -> None:
+        """
+        Cria os clientes padrão e abre os canais gRPC antes do primeiro uso.
+
+        Falhas são apenas registradas: o cliente é criado novamente na primeira chamada.
+        """
+        if (Environment.get("LLM_WARM_UP") or "true").lower() == "false":
+            return
+
+        for name, factory in (("chat", ClientRegistry.chat), ("embeddings", ClientRegistry.embeddings)):
+            try:
+                client = factory()
+                # Acessar o cliente de predição força a carga das credenciais e a criação do canal
+                getattr(client, "prediction_client", None)
+                logger.info(f"[CLIENT-REGISTRY] Cliente {name} inicializado")
+            except Exception as e:
+                logger.warning(f"[CLIENT-REGISTRY] Falha ao inicializar cliente {name}: {str(e)}")
+
+    @staticmethod
+    def clear() -> None:
+        with ClientRegistry._lock:
+            ClientRegistry._clients.clear()
+            ClientRegistry._locks.clear()
+
+    @staticmethod
+    def _get(key: Tuple[str, Optional[str], Optional[str], Optional[str]], factory: Callable[[], Any]) -> Any:
+        client = ClientRegistry._clients.get(key)
+        if client is not None:
+            return client
+
+        # Um lock por chave: a criação de um cliente lento não bloqueia os demais
+        with ClientRegistry._lock:
+            key_lock = ClientRegistry._locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            client = ClientRegistry._clients.get(key)
+            if client is None:
+                logger.info(f"[CLIENT-REGISTRY] Criando cliente {key[0]} para {key[1]} ({key[2]}/{key[3]})")
+                client = factory()
+                ClientRegistry._clients[key] = client
+
+        return client
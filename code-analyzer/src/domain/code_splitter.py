@@ -0,0 +1,215 @@
+import ast
+import re
+import logging
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+from pydantic import BaseModel
+
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+from ..utils.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Padrão: trechos de até 512 tokens (o modelo de embeddings aceita até 2048 por texto)
+DEFAULT_CHUNK_TOKENS = 512
+
+MODULE_SYMBOL = "<module>"
+
+# Nome declarado em uma linha de definição (função, classe, tipo, variável com função)
+DEFINITION_NAME = re.compile(
+    r'(?:\bfunction\*?|\bclass|\binterface|\btype|\benum|\bstruct|\btrait|\bimpl|\bmod|\bmodule|\bdef|\bfn|\bfunc(?:\s*\([^)]*\))?|\bconst|\blet|\bvar)\s+([A-Za-z_$][\w$.]*)'
+)
+CALLABLE_NAME = re.compile(r'([A-Za-z_$][\w$]*)\s*(?:<[^>]*>)?\s*\(')
+
+
+class Symbol(BaseModel):
+    name: str
+    start: int
+    end: int
+
+
+class CodeSplitter:
+    """
+    Divide código-fonte em trechos nos limites das definições de nível superior.
+
+    Python usa o ast; as demais linguagens usam as heurísticas de chaves e indentação
+    de SourceFiles. Definições pequenas e consecutivas são agrupadas até o tamanho alvo e
+    definições grandes são divididas nas definições internas; cada parte repete a
+    assinatura da definição que a contém, que é a única sobreposição entre trechos.
+    """
+
+    def __init__(self, chunk_tokens: Optional[int] = None):
+        self.chunk_tokens = chunk_tokens if chunk_tokens is not None else int(
+            Environment.get("CODE_CHUNK_TOKENS") or DEFAULT_CHUNK_TOKENS
+        )
+
+    @staticmethod
+    def language_of(document: Document) -> Optional[str]:
+        metadata = document.metadata or {}
+        if metadata.get("language"):
+            return metadata["language"]
+        path = metadata.get("source") or metadata.get("path")
+        return SourceFiles.language(str(path)) if path else None
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Divide documentos de código; cada trecho leva caminho, símbolos e linhas nos metadados.
+        """
+        chunks = []
+        for document in documents:
+            language = CodeSplitter.language_of(document)
+            for text, symbols, start, end in self.split_text(document.page_content, language):
+                metadata = dict(document.metadata or {})
+                metadata.update(language=language, symbols=symbols, start_line=start + 1, end_line=end)
+                chunks.append(Document(page_content=text, metadata=metadata))
+        return chunks
+
+    def split_text(self, text: str, language: Optional[str]) -> List[Tuple[str, List[str], int, int]]:
+        """
+        Returns:
+            List[Tuple[str, List[str], int, int]]: (texto, símbolos, linha inicial, linha final) de cada trecho
+        """
+        lines = text.splitlines(keepends=True)
+        if not lines:
+            return []
+
+        symbols = self.symbols(text, language)
+        pieces: List[Tuple[int, int, str, str]] = []
+        for symbol in symbols:
+            pieces.extend(self._fit(lines, symbol, language, ''))
+
+        # Agrupar trechos consecutivos pequenos até o tamanho alvo
+        chunks: List[Tuple[List[str], int, int, int, str]] = []
+        for start, end, name, header in pieces:
+            tokens = TokenCounter.count("".join(lines[start:end])) + TokenCounter.count(header)
+            # Só partes com o mesmo cabeçalho (a mesma definição externa, ou nenhuma) são agrupadas
+            if chunks and chunks[-1][4] == header and chunks[-1][3] + tokens - TokenCounter.count(header) <= self.chunk_tokens:
+                names, chunk_start, _, chunk_tokens, _ = chunks[-1]
+                chunks[-1] = (names + [name], chunk_start, end, chunk_tokens + tokens - TokenCounter.count(header), header)
+            else:
+                chunks.append(([name], start, end, tokens, header))
+
+        return [
+            (header + "".join(lines[start:end]), [n for n in dict.fromkeys(names) if n != MODULE_SYMBOL], start, end)
+            for names, start, end, _, header in chunks
+        ]
+
+    def symbols(self, text: str, language: Optional[str]) -> List[Symbol]:
+        """
+        Definições de nível superior, cobrindo o arquivo inteiro (o código entre elas vira MODULE_SYMBOL).
+        """
+        lines = text.splitlines(keepends=True)
+        spans: List[Tuple[int, int, str]] = []
+
+        if language == 'python':
+            spans = CodeSplitter._python_spans(text)
+
+        if spans is None or not spans:
+            starts = SourceFiles.definition_starts(lines, language) if language else []
+            spans = [
+                (start, end, CodeSplitter.definition_name(lines, start))
+                for start, end in zip(starts, starts[1:] + [len(lines)])
+            ]
+
+        symbols: List[Symbol] = []
+        position = 0
+        for start, end, name in spans:
+            if start > position:
+                symbols.append(Symbol(name=MODULE_SYMBOL, start=position, end=start))
+            symbols.append(Symbol(name=name, start=start, end=end))
+            position = end
+        if position < len(lines):
+            symbols.append(Symbol(name=MODULE_SYMBOL, start=position, end=len(lines)))
+
+        return symbols
+
+    @staticmethod
+    def definition_name(lines: List[str], start: int) -> str:
+        # Pular decoradores, anotações e comentários até a linha da definição
+        for line in lines[start:start + 10]:
+            body = line.strip()
+            if not body or body.startswith(('@', '#', '//', '/*', '*')):
+                continue
+            match = DEFINITION_NAME.search(body) or CALLABLE_NAME.search(body)
+            return match.group(1) if match else body[:60]
+        return MODULE_SYMBOL
+
+    @staticmethod
+    def _python_spans(text: str) -> Optional[List[Tuple[int, int, str]]]:
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+
+        spans = []
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+                spans.append((start, node.end_lineno, node.name))
+        return spans
+
+    def _fit(self, lines: List[str], symbol: Symbol, language: Optional[str],
+             header: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Divide um símbolo grande nas definições internas; cada parte recebe a assinatura do símbolo.
+
+        Returns:
+            List[Tuple[int, int, str, str]]: (início, fim, símbolo, cabeçalho) de cada parte
+        """
+        tokens = TokenCounter.count("".join(lines[symbol.start:symbol.end])) + TokenCounter.count(header)
+        if tokens <= self.chunk_tokens:
+            return [(symbol.start, symbol.end, symbol.name, header)]
+        if symbol.name == MODULE_SYMBOL:
+            return self._line_parts(lines, symbol, header, repeat_first_line=False)
+
+        body_start = symbol.start
+        while body_start < symbol.end and (
+                not SourceFiles.is_definition(lines, body_start, language) or lines[body_start].lstrip().startswith('@')):
+            body_start += 1
+        indent = CodeSplitter._inner_indent(lines, body_start, symbol.end)
+        inner = []
+        if indent is not None:
+            inner = [
+                body_start + 1 + i
+                for i in SourceFiles.definition_starts(lines[body_start + 1:symbol.end], language, indent)
+            ]
+
+        if not inner:
+            return self._line_parts(lines, symbol, header)
+
+        signature = header + "".join(lines[symbol.start:body_start + 1])
+        parts = [(symbol.start, inner[0], symbol.name, header)]
+        for start, end in zip(inner, inner[1:] + [symbol.end]):
+            name = f"{symbol.name}.{CodeSplitter.definition_name(lines, start)}"
+            parts.extend(self._fit(lines, Symbol(name=name, start=start, end=end), language, signature))
+        return parts
+
+    def _line_parts(self, lines: List[str], symbol: Symbol, header: str,
+                    repeat_first_line: bool = True) -> List[Tuple[int, int, str, str]]:
+        # Último recurso: dividir por linhas; as partes seguintes repetem a primeira linha da definição
+        parts = []
+        start = symbol.start
+        part_header = header
+        tokens = TokenCounter.count(header)
+        for i in range(symbol.start, symbol.end):
+            line_tokens = TokenCounter.count(lines[i])
+            if i > start and tokens + line_tokens > self.chunk_tokens:
+                parts.append((start, i, symbol.name, part_header))
+                start = i
+                part_header = header + lines[symbol.start] if repeat_first_line else header
+                tokens = TokenCounter.count(part_header)
+            tokens += line_tokens
+        parts.append((start, symbol.end, symbol.name, part_header))
+        return parts
+
+    @staticmethod
+    def _inner_indent(lines: List[str], start: int, end: int) -> Optional[str]:
+        # Indentação do corpo: a da primeira linha não vazia após a assinatura
+        for line in lines[start + 1:end]:
+            if not line.strip():
+                continue
+            prefix = line[:len(line) - len(line.lstrip())]
+            return prefix or None
+        return None
@@ -0,0 +1,315 @@
+import time
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from ..utils import Environment
+from ..utils.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Padrões: 1 hora de validade, renovação quando faltarem 5 minutos e prefixos a partir de 4096 tokens
+# (abaixo do mínimo aceito pelo Vertex AI o cache não é criado)
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_REFRESH_SECONDS = 300
+DEFAULT_MIN_TOKENS = 4096
+
+
+class CachedPrefix(BaseModel):
+    key: str
+    name: str
+    model: str
+    tokens: int
+    expires_at: float
+
+
+class ContextCacheBackend(ABC):
+    """
+    Implementação do cache de contexto no provedor.
+    """
+
+    @abstractmethod
+    def create(self, model: str, prefix: str, ttl: float) -> str:
+        """
+        Cria o conteúdo em cache e retorna o identificador no provedor.
+        """
+        pass
+
+    @abstractmethod
+    def extend(self, name: str, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        pass
+
+    @abstractmethod
+    def generate(self, name: str, suffix: str) -> str:
+        """
+        Gera a resposta para o prefixo em cache seguido de suffix.
+        """
+        pass
+
+
+class VertexContextCacheBackend(ContextCacheBackend):
+    """
+    CachedContent do Vertex AI (vertexai.preview.caching, disponível a partir do google-cloud-aiplatform 1.60).
+    """
+
+    def __init__(self):
+        import vertexai
+        from vertexai.preview import caching
+        from vertexai.preview.generative_models import GenerativeModel
+
+        vertexai.init(project=Environment.get("GOOGLE_PROJECT"), location=Environment.get("GOOGLE_LOCATION"))
+        self._caching = caching
+        self._model_class = GenerativeModel
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def create(self, model: str, prefix: str, ttl: float) -> str:
+        cached_content = self._caching.CachedContent.create(
+            model_name=model,
+            system_instruction=prefix,
+            ttl=timedelta(seconds=ttl)
+        )
+        with self._lock:
+            self._models[cached_content.name] = self._model_class.from_cached_content(cached_content=cached_content)
+        return cached_content.name
+
+    def extend(self, name: str, ttl: float) -> None:
+        self._caching.CachedContent(cached_content_name=name).update(ttl=timedelta(seconds=ttl))
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+        self._caching.CachedContent(cached_content_name=name).delete()
+
+    def generate(self, name: str, suffix: str) -> str:
+        with self._lock:
+            model = self._models.get(name)
+        if model is None:
+            model = self._model_class.from_cached_content(cached_content=self._caching.CachedContent(cached_content_name=name))
+            with self._lock:
+                self._models[name] = model
+        return model.generate_content(suffix).text
+
+
+class LocalContextCacheBackend(ContextCacheBackend):
+    """
+    Substituto local: guarda o prefixo em memória e envia prefixo + sufixo ao gerador informado.
+
+    Usado nos testes e em ambientes sem suporte a CachedContent.
+    """
+
+    def __init__(self, generator=None):
+        self.generator = generator
+        self.contents: Dict[str, str] = {}
+        self.expirations: Dict[str, float] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def create(self, model: str, prefix: str, ttl: float) -> str:
+        with self._lock:
+            self._sequence += 1
+            name = f"local/cachedContents/{self._sequence}"
+            self.contents[name] = prefix
+            self.expirations[name] = time.time() + ttl
+        return name
+
+    def extend(self, name: str, ttl: float) -> None:
+        with self._lock:
+            self.expirations[name] = time.time() + ttl
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            self.contents.pop(name, None)
+            self.expirations.pop(name, None)
+
+    def generate(self, name: str, suffix: str) -> str:
+        with self._lock:
+            prefix = self.contents[name]
+        if self.generator is None:
+            raise ValueError("Nenhum gerador configurado para o cache de contexto local")
+        return self.generator(prefix + suffix)
+
+
+class ContextCache:
+    """
+    Reaproveita no provedor o prefixo compartilhado pelas requisições de um job
+    (instruções, template e contexto do repositório).
+
+    Cada prefixo é criado uma vez por (modelo, conteúdo), renovado quando está perto de
+    expirar e removido quando expira. Registra os tokens de entrada economizados e a
+    latência das chamadas com e sem cache.
+    """
+
+    _default: Optional["ContextCache"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, backend: Optional[ContextCacheBackend] = None, ttl: Optional[float] = None,
+                 min_tokens: Optional[int] = None, refresh_seconds: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl if ttl is not None else float(
+            Environment.get("CONTEXT_CACHE_TTL_SECONDS") or DEFAULT_TTL_SECONDS
+        )
+        self.min_tokens = min_tokens if min_tokens is not None else int(
+            Environment.get("CONTEXT_CACHE_MIN_TOKENS") or DEFAULT_MIN_TOKENS
+        )
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else DEFAULT_REFRESH_SECONDS
+        self._entries: Dict[str, CachedPrefix] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._purged_at = time.time()
+
+        self.created = 0
+        self.calls = 0
+        self.cached_calls = 0
+        self.tokens_saved = 0
+        self.latency_cached = 0.0
+        self.latency_uncached = 0.0
+        self.uncached_calls = 0
+
+    @classmethod
+    def default(cls) -> "ContextCache":
+        """Retorna a instância compartilhada pelo processo, com o backend do Vertex AI."""
+        with cls._default_guard:
+            if cls._default is None:
+                backend = None
+                try:
+                    backend = VertexContextCacheBackend()
+                except Exception as e:
+                    logger.warning(f"[CONTEXT-CACHE] CachedContent indisponível, cache de contexto desativado: {str(e)}")
+                cls._default = cls(backend=backend)
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("CONTEXT_CACHE_ENABLED")
+        return value is not None and value.lower() in ("1", "true", "yes")
+
+    @classmethod
+    def available(cls) -> bool:
+        """Habilitado e com o backend do provedor disponível."""
+        return cls.enabled() and cls.default().backend is not None
+
+    @staticmethod
+    def key(model: str, prefix: str) -> str:
+        return hashlib.sha256(f"{model}\0{prefix}".encode('utf-8')).hexdigest()
+
+    def get_or_create(self, model: str, prefix: str) -> Optional[CachedPrefix]:
+        """
+        Retorna o prefixo em cache, criando-o se necessário.
+
+        Returns:
+            Optional[CachedPrefix]: None se o backend não estiver disponível ou o prefixo for pequeno demais
+        """
+        if self.backend is None:
+            return None
+
+        # Os prefixos de jobs anteriores que não voltaram a ser usados são removidos periodicamente
+        if time.time() - self._purged_at >= self.refresh_seconds:
+            self.purge()
+
+        tokens = TokenCounter.count(prefix)
+        if tokens < self.min_tokens:
+            return None
+
+        key = ContextCache.key(model, prefix)
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            now = time.time()
+            entry = self._entries.get(key)
+
+            if entry is not None and entry.expires_at <= now:
+                self._discard(entry)
+                entry = None
+
+            if entry is not None and entry.expires_at - now < self.refresh_seconds:
+                try:
+                    self.backend.extend(entry.name, self.ttl)
+                    entry.expires_at = now + self.ttl
+                except Exception as e:
+                    logger.warning(f"[CONTEXT-CACHE] Erro ao renovar {entry.name}: {str(e)}")
+
+            if entry is None:
+                try:
+                    name = self.backend.create(model, prefix, self.ttl)
+                except Exception as e:
+                    logger.warning(f"[CONTEXT-CACHE] Erro ao criar cache de contexto: {str(e)}")
+                    return None
+                entry = CachedPrefix(key=key, name=name, model=model, tokens=tokens, expires_at=now + self.ttl)
+                with self._lock:
+                    self._entries[key] = entry
+                    self.created += 1
+                logger.info(f"[CONTEXT-CACHE] Prefixo de {tokens} tokens em cache: {name}")
+
+            return entry
+
+    def generate(self, entry: CachedPrefix, suffix: str) -> str:
+        """
+        Gera a resposta usando o prefixo em cache e registra a economia.
+        """
+        started = time.monotonic()
+        response = self.backend.generate(entry.name, suffix)
+        self.record(time.monotonic() - started, saved_tokens=entry.tokens)
+        return response
+
+    def record(self, latency: float, saved_tokens: int = 0) -> None:
+        """
+        Registra uma chamada (com saved_tokens > 0 quando usou o cache).
+        """
+        with self._lock:
+            self.calls += 1
+            if saved_tokens:
+                self.cached_calls += 1
+                self.tokens_saved += saved_tokens
+                self.latency_cached += latency
+            else:
+                self.uncached_calls += 1
+                self.latency_uncached += latency
+
+    def purge(self) -> int:
+        """
+        Remove do provedor os prefixos expirados.
+
+        Returns:
+            int: Quantidade removida
+        """
+        now = time.time()
+        with self._lock:
+            self._purged_at = now
+            expired = [entry for entry in self._entries.values() if entry.expires_at <= now]
+        for entry in expired:
+            self._discard(entry)
+        return len(expired)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "available": self.backend is not None,
+                "entries": len(self._entries),
+                "created": self.created,
+                "calls": self.calls,
+                "cached_calls": self.cached_calls,
+                "tokens_saved": self.tokens_saved,
+                "latency_ms_cached_avg": round(1000 * self.latency_cached / self.cached_calls, 1) if self.cached_calls else 0.0,
+                "latency_ms_uncached_avg": round(1000 * self.latency_uncached / self.uncached_calls, 1) if self.uncached_calls else 0.0,
+            }
+
+    def _discard(self, entry: CachedPrefix):
+        with self._lock:
+            self._entries.pop(entry.key, None)
+            self._locks.pop(entry.key, None)
+        try:
+            self.backend.delete(entry.name)
+        except Exception as e:
+            # O provedor também remove o conteúdo expirado por conta própria
+            logger.info(f"[CONTEXT-CACHE] Erro ao remover {entry.name}: {str(e)}")
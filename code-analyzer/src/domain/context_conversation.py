@@ -1,7 +1,7 @@
-from typing import List
+from typing import List, Optional
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
-from ..utils import Extractor
+from ..utils import Extractor, ExtractionEngine
 
 from ..adapters.dtos import DocumentDTO
 from . import RAG
@@ -9,25 +9,40 @@ from . import RAG
 class ContextConversation:
 
     @staticmethod
-    def retriever(documents: List[DocumentDTO], embeddings: Embeddings) -> List[Document]:
+    def retriever(documents: List[DocumentDTO], embeddings: Embeddings, repository: Optional[str] = None) -> List[Document]:
         """
                 Recupera documentos relevantes com base nos embeddings fornecidos.
 
                 Args:
                     documents (List[DocumentDTO]): Uma lista de objetos DocumentDTO que contêm o conteúdo e os metadados dos documentos.
                     embeddings (Embeddings): Embeddings utilizados para a recuperação de documentos.
+                    repository (Optional[str]): Repositório dos documentos, para reutilizar o seu índice vetorial persistente.
 
                 Returns:
                     List[Document]: Uma lista de objetos Document contendo o texto extraído e os metadados.
         """
         buffer = []
+        texts = ContextConversation._extract(documents)
 
-        for document in documents:
-            document_bytes_IO = Extractor.stream(document.content.parts)
-            text = Extractor.extract_text(document_bytes_IO, document.content.content_type)
+        for document, text in zip(documents, texts):
             metadata = document.metadata if document.metadata else {}
             document = Document(text, metadata=metadata)
 
             buffer.append(document)
 
-        return RAG.retriever(buffer, embeddings)
+        return RAG.retriever(buffer, embeddings, repository)
+
+    @staticmethod
+    def _extract(documents: List[DocumentDTO]) -> List[str]:
+        # PDFs e DOCX do lote são extraídos em paralelo no pool de processos
+        if not ExtractionEngine.enabled():
+            # O base64 é decodificado uma única vez, dentro do Extractor
+            return [Extractor.extract_text(document.content.parts, document.content.content_type) for document in documents]
+
+        texts = ExtractionEngine.default().extract_many(
+            [(document.content.parts, document.content.content_type) for document in documents]
+        )
+        for text in texts:
+            if isinstance(text, Exception):
+                raise text
+        return texts
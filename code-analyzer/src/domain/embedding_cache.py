@@ -0,0 +1,207 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..utils import Environment
+from ..utils.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Padrões: 64 MiB de vetores em memória (cerca de 21 mil vetores float32 de 768 dimensões) e os
+# limites por requisição da API de embeddings do Vertex AI (250 textos e 20000 tokens)
+DEFAULT_MEMORY_BYTES = 64 * 1024 ** 2
+DEFAULT_BATCH_SIZE = 250
+DEFAULT_BATCH_TOKENS = 20000
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings chaveado por (modelo, tipo de tarefa, hash do texto).
+
+    Possui um LRU em memória, limitado em bytes e com os vetores em float32, e um SQLite
+    em disco. Os textos ausentes do cache são deduplicados e enviados em lotes do maior
+    tamanho aceito pelo provedor.
+    """
+
+    _default: Optional["EmbeddingCache"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, memory_bytes: Optional[int] = None,
+                 batch_size: Optional[int] = None, batch_tokens: Optional[int] = None):
+        self.path = path or Environment.get("EMBEDDING_CACHE_PATH") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-embedding-cache.sqlite3"
+        )
+        self.memory_bytes = memory_bytes if memory_bytes is not None else int(
+            Environment.get("EMBEDDING_CACHE_MEMORY_BYTES") or DEFAULT_MEMORY_BYTES
+        )
+        self.batch_size = batch_size if batch_size is not None else int(
+            Environment.get("EMBEDDING_BATCH_SIZE") or DEFAULT_BATCH_SIZE
+        )
+        self.batch_tokens = batch_tokens if batch_tokens is not None else int(
+            Environment.get("EMBEDDING_BATCH_TOKENS") or DEFAULT_BATCH_TOKENS
+        )
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_size = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+
+    @classmethod
+    def default(cls) -> "EmbeddingCache":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("EMBEDDING_CACHE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def key(model: str, task_type: Optional[str], text: str) -> str:
+        payload = f"{model}\0{task_type or ''}\0{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def embed(self, model: str, task_type: Optional[str], texts: List[str],
+              embed_batch: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Retorna o embedding de cada texto, calculando apenas os que não estão em cache.
+
+        Args:
+            model: Nome do modelo de embeddings
+            task_type: Tipo de tarefa do embedding (documento ou consulta)
+            texts: Textos, na ordem desejada
+            embed_batch: Função que calcula os embeddings de um lote em uma única requisição
+
+        Returns:
+            List[List[float]]: Embeddings na ordem dos textos
+        """
+        keys = [EmbeddingCache.key(model, task_type, text) for text in texts]
+        vectors: Dict[str, np.ndarray] = self._lookup(set(keys))
+
+        # Textos repetidos são calculados uma única vez
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            missing_keys = list(missing)
+            for batch in self.batches([missing[key] for key in missing_keys]):
+                batch_keys = missing_keys[:len(batch)]
+                missing_keys = missing_keys[len(batch):]
+                batch_vectors = [np.asarray(vector, dtype='float32') for vector in embed_batch(batch)]
+                with self._lock:
+                    self.requests += 1
+                self._store(dict(zip(batch_keys, batch_vectors)))
+                vectors.update(zip(batch_keys, batch_vectors))
+
+            logger.info(f"[EMBEDDING-CACHE] {len(texts)} texto(s): {len(missing)} calculado(s), {len(texts) - len(missing)} do cache")
+
+        # Conversão para listas só na saída; o cache guarda apenas os arrays
+        return [vectors[key].tolist() for key in keys]
+
+    def batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Agrupa os textos em lotes consecutivos de até batch_size textos e batch_tokens tokens.
+        """
+        batches: List[List[str]] = []
+        tokens = 0
+        for text in texts:
+            text_tokens = TokenCounter.count(text)
+            if not batches or len(batches[-1]) >= self.batch_size or tokens + text_tokens > self.batch_tokens:
+                batches.append([])
+                tokens = 0
+            batches[-1].append(text)
+            tokens += text_tokens
+        return batches
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "requests": self.requests,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+            }
+
+    def _lookup(self, keys: set) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            pending = [key for key in keys if key not in found]
+            try:
+                # Consultas em blocos, abaixo do limite de parâmetros do SQLite
+                for i in range(0, len(pending), 500):
+                    chunk = pending[i:i + 500]
+                    rows = self._db().execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype='float32')
+                        found[key] = vector
+                        self._remember(key, vector)
+            except sqlite3.Error as e:
+                logger.warning(f"[EMBEDDING-CACHE] Erro ao consultar o cache: {str(e)}")
+
+        return found
+
+    def _store(self, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            try:
+                connection = self._db()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in vectors.items()]
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[EMBEDDING-CACHE] Erro ao gravar no cache: {str(e)}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # Chamado com self._lock adquirido
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_size += vector.nbytes
+
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= evicted.nbytes
+
+    def _db(self) -> sqlite3.Connection:
+        # Chamado com self._lock adquirido
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
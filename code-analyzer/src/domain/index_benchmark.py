@@ -0,0 +1,107 @@
+import time
+import argparse
+import logging
+from typing import List, Optional, Sequence
+
+import faiss
+import numpy as np
+from pydantic import BaseModel
+
+from .vector_storage import KINDS, VectorStorage
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkResult(BaseModel):
+    kind: str
+    vectors: int
+    build_seconds: float
+    query_ms: float
+    recall: float
+    bytes_per_vector: float
+
+
+class IndexBenchmark:
+    """
+    Mede recall@k, latência de busca e memória por vetor de cada tipo de índice do
+    VectorStorage, em relação à busca exata, para calibrar os limites de tamanho.
+
+    Uso: python -m src.domain.index_benchmark --vectors 100000 --dim 768
+    """
+
+    @staticmethod
+    def synthetic(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+        """
+        Vetores normalizados agrupados em torno de centros aleatórios, como embeddings de trechos de código.
+        """
+        rng = np.random.default_rng(seed)
+        centers = rng.standard_normal((clusters, dimension)).astype('float32')
+        vectors = centers[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dimension)).astype('float32')
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    @staticmethod
+    def run(vectors: np.ndarray, queries: np.ndarray, k: int = 10, kinds: Sequence[str] = KINDS,
+            storage: Optional[VectorStorage] = None) -> List[BenchmarkResult]:
+        storage = storage or VectorStorage(kind="auto")
+
+        exact = faiss.IndexFlatIP(vectors.shape[1])
+        exact.add(vectors)
+        _, truth = exact.search(queries, k)
+
+        results = []
+        for kind in kinds:
+            started = time.perf_counter()
+            index = storage.build(vectors, kind=kind)
+            build_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for query in queries:
+                _, found = index.search(query.reshape(1, -1), k)
+            # Consultas uma a uma, como no retriever
+            query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            _, found = index.search(queries, k)
+            hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+
+            results.append(BenchmarkResult(
+                kind=VectorStorage.kind_of(index),
+                vectors=len(vectors),
+                build_seconds=round(build_seconds, 3),
+                query_ms=round(query_ms, 3),
+                recall=round(hits / (len(queries) * k), 4),
+                bytes_per_vector=round(IndexBenchmark.size(index) / len(vectors), 1),
+            ))
+            logger.info(f"[INDEX-BENCHMARK] {results[-1]}")
+        return results
+
+    @staticmethod
+    def size(index: faiss.Index) -> int:
+        # Tamanho serializado, o mesmo ocupado pelo segmento em disco e mapeado em memória
+        writer = faiss.VectorIOWriter()
+        faiss.write_index(index, writer)
+        return writer.data.size()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall, latência e memória por tipo de índice vetorial")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    args = parser.parse_args()
+
+    data = IndexBenchmark.synthetic(args.vectors + args.queries, args.dim)
+    results = IndexBenchmark.run(data[:args.vectors], data[args.vectors:], args.k, args.kinds.split(","))
+
+    print(f"{'tipo':<8}{'vetores':>10}{'build (s)':>12}{'busca (ms)':>12}{'recall':>9}{'bytes/vetor':>14}")
+    for result in results:
+        print(
+            f"{result.kind:<8}{result.vectors:>10}{result.build_seconds:>12}{result.query_ms:>12}"
+            f"{result.recall:>9}{result.bytes_per_vector:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import re
+import math
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros usuais do BM25 e constante da fusão por posição (reciprocal rank fusion)
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+# Padrões: cada busca traz 4x k candidatos de cada lado (ao menos 20) e os dois lados pesam igual
+DEFAULT_CANDIDATES = 20
+DEFAULT_LEXICAL_WEIGHT = 1.0
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+')
+# Limites entre palavras de um identificador: fooBar, FOOBar, foo_bar, foo2
+WORD_BOUNDARY = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+
+class LexicalIndex:
+    """
+    Índice invertido BM25 sobre os tokens de código dos trechos.
+
+    Cada identificador entra inteiro e também dividido nas suas palavras (camelCase e
+    snake_case), então "getUserById" casa tanto com a consulta exata quanto com "user id".
+    As listas invertidas ficam em tabelas SQLite na conexão informada, o que permite
+    gravá-las na mesma transação dos trechos de um VectorIndex; quem chama faz o commit.
+    """
+
+    def __init__(self, connection: Optional[sqlite3.Connection] = None, lock: Optional[Any] = None):
+        self._connection = connection or sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = lock or threading.RLock()
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lexical_documents (chunk_id INTEGER PRIMARY KEY, length INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lexical_postings (term TEXT NOT NULL, chunk_id INTEGER NOT NULL, tf INTEGER NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS lexical_postings_term ON lexical_postings (term)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS lexical_postings_chunk ON lexical_postings (chunk_id)")
+            self._connection.commit()
+
+    @staticmethod
+    def hybrid_enabled() -> bool:
+        value = Environment.get("HYBRID_RETRIEVAL_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def tokens(text: str) -> List[str]:
+        tokens = []
+        for identifier in IDENTIFIER.findall(text):
+            lowered = identifier.lower()
+            tokens.append(lowered)
+            words = [word.lower() for word in WORD_BOUNDARY.findall(identifier)]
+            if len(words) > 1:
+                tokens.extend(words)
+        return tokens
+
+    def add(self, chunks: Iterable[Tuple[int, str]]):
+        """
+        Indexa os trechos (id, texto).
+        """
+        documents, postings = [], []
+        for chunk_id, text in chunks:
+            counts = Counter(LexicalIndex.tokens(text))
+            documents.append((chunk_id, sum(counts.values())))
+            postings.extend((term, chunk_id, tf) for term, tf in counts.items())
+
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO lexical_documents (chunk_id, length) VALUES (?, ?)", documents)
+            self._connection.executemany("INSERT INTO lexical_postings (term, chunk_id, tf) VALUES (?, ?, ?)", postings)
+
+    def remove(self, chunk_ids: Iterable[int]):
+        rows = [(chunk_id,) for chunk_id in chunk_ids]
+        with self._lock:
+            self._connection.executemany("DELETE FROM lexical_postings WHERE chunk_id = ?", rows)
+            self._connection.executemany("DELETE FROM lexical_documents WHERE chunk_id = ?", rows)
+
+    def ids(self) -> Set[int]:
+        with self._lock:
+            return {row[0] for row in self._connection.execute("SELECT chunk_id FROM lexical_documents")}
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Returns:
+            List[Tuple[int, float]]: (id, pontuação BM25) dos k trechos mais relevantes
+        """
+        terms = list(dict.fromkeys(LexicalIndex.tokens(query)))
+        if not terms:
+            return []
+
+        placeholders = ','.join('?' * len(terms))
+        with self._lock:
+            count, average = self._connection.execute("SELECT COUNT(*), AVG(length) FROM lexical_documents").fetchone()
+            if not count:
+                return []
+            frequencies = dict(self._connection.execute(
+                f"SELECT term, COUNT(*) FROM lexical_postings WHERE term IN ({placeholders}) GROUP BY term", terms
+            ).fetchall())
+            rows = self._connection.execute(
+                "SELECT p.chunk_id, p.term, p.tf, d.length FROM lexical_postings p "
+                f"JOIN lexical_documents d ON d.chunk_id = p.chunk_id WHERE p.term IN ({placeholders})", terms
+            ).fetchall()
+
+        average = average or 1.0
+        scores: Dict[int, float] = {}
+        for chunk_id, term, tf, length in rows:
+            frequency = frequencies[term]
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+            )
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    @staticmethod
+    def candidates(k: int) -> int:
+        return max(4 * k, int(Environment.get("HYBRID_CANDIDATES") or DEFAULT_CANDIDATES))
+
+    @staticmethod
+    def fuse(vector_ranking: Sequence[int], lexical_ranking: Sequence[int], k: int,
+             lexical_weight: Optional[float] = None) -> List[int]:
+        """
+        Combina as duas listas ordenadas por reciprocal rank fusion, que usa só as posições
+        e dispensa normalizar pontuações de escalas diferentes.
+        """
+        weight = lexical_weight if lexical_weight is not None else float(
+            Environment.get("HYBRID_LEXICAL_WEIGHT") or DEFAULT_LEXICAL_WEIGHT
+        )
+        scores: Dict[int, float] = {}
+        for rank, chunk_id in enumerate(vector_ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        for rank, chunk_id in enumerate(lexical_ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (RRF_K + rank + 1)
+        return [chunk_id for chunk_id, _ in sorted(scores.items(), key=lambda item: -item[1])[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever do LangChain que funde a busca de um FAISS em memória com a de um LexicalIndex.
+
+    Os ids do índice léxico são as posições dos trechos no FAISS.
+    """
+
+    vector: Any
+    lexical: Any
+    documents: List[Document]
+    embeddings: Any
+    k: int = 4
+
+    @classmethod
+    def build(cls, vector: Any, documents: List[Document], embeddings: Embeddings, k: int = 4) -> "HybridRetriever":
+        lexical = LexicalIndex()
+        lexical.add((position, document.page_content) for position, document in enumerate(documents))
+        return cls(vector=vector, lexical=lexical, documents=documents, embeddings=embeddings, k=k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        fetch = LexicalIndex.candidates(self.k)
+        # A ordem por produto interno não depende da norma da consulta; no L2 a consulta vai como está
+        vector = np.array([self.embeddings.embed_query(query)], dtype='float32')
+        _, positions = self.vector.index.search(vector, min(fetch, self.vector.index.ntotal))
+        vector_ranking = [int(p) for p in positions[0] if p >= 0]
+        lexical_ranking = [chunk_id for chunk_id, _ in self.lexical.search(query, fetch)]
+
+        return [self.documents[p] for p in LexicalIndex.fuse(vector_ranking, lexical_ranking, self.k)]
@@ -0,0 +1,200 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato das respostas em cache; incrementar invalida todas as entradas gravadas
+CACHE_VERSION = "1"
+
+# Padrões: 7 dias de validade e 2048 respostas em memória
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 2048
+
+
+class LLMCache:
+    """
+    Cache das respostas do LLM, chaveado por (modelo, hash do prompt, linguagem, hash do código).
+
+    Possui duas camadas: um LRU em memória e um SQLite em disco compartilhado entre
+    os processos do worker. As entradas expiram após o TTL e são descartadas quando
+    a versão do cache (CACHE_VERSION + LLM_CACHE_VERSION) muda.
+    """
+
+    _default: Optional["LLMCache"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 memory_entries: Optional[int] = None, version: Optional[str] = None):
+        self.path = path or Environment.get("LLM_CACHE_PATH") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-llm-cache.sqlite3"
+        )
+        self.ttl = ttl if ttl is not None else float(
+            Environment.get("LLM_CACHE_TTL_SECONDS") or DEFAULT_TTL_SECONDS
+        )
+        self.memory_entries = memory_entries if memory_entries is not None else int(
+            Environment.get("LLM_CACHE_MEMORY_ENTRIES") or DEFAULT_MEMORY_ENTRIES
+        )
+        self.version = version or f"{CACHE_VERSION}.{Environment.get('LLM_CACHE_VERSION') or '0'}"
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @classmethod
+    def default(cls) -> "LLMCache":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("LLM_CACHE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def key(model: Optional[str], prompt: Optional[str], language: Optional[str], code: str) -> str:
+        """
+        Monta a chave do cache.
+
+        Args:
+            model: Nome do modelo
+            prompt: Prompt (template) usado na análise; None para o prompt padrão
+            language: Linguagem do código
+            code: Código analisado
+
+        Returns:
+            str: SHA-256 da combinação
+        """
+        payload = json.dumps([
+            model or "",
+            hashlib.sha256((prompt or "").encode('utf-8')).hexdigest(),
+            language or "",
+            hashlib.sha256(code.encode('utf-8')).hexdigest(),
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Busca uma resposta, primeiro em memória e depois no SQLite.
+
+        Returns:
+            Optional[str]: Resposta armazenada ou None se ausente ou expirada
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[2] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.tokens_saved += entry[1]
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+        row = None
+        try:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT response, tokens, expires_at FROM llm_cache WHERE key = ? AND version = ? AND expires_at > ?",
+                    (key, self.version, now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM-CACHE] Erro ao consultar o cache: {str(e)}")
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += row[1]
+            self._remember(key, (row[0], row[1], row[2]))
+
+        return row[0]
+
+    def put(self, key: str, response: str, tokens: int) -> None:
+        """
+        Armazena uma resposta.
+
+        Args:
+            key: Chave gerada por LLMCache.key
+            response: Resposta do modelo
+            tokens: Tokens consumidos pela chamada (prompt + resposta), usados na métrica de economia
+        """
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._remember(key, (response, tokens, expires_at))
+            try:
+                connection = self._db()
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, tokens, version, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, response, tokens, self.version, expires_at)
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[LLM-CACHE] Erro ao gravar no cache: {str(e)}")
+
+    def invalidate(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._memory.clear()
+            try:
+                connection = self._db()
+                connection.execute("DELETE FROM llm_cache")
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[LLM-CACHE] Erro ao limpar o cache: {str(e)}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, entry: Tuple[str, int, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _db(self) -> sqlite3.Connection:
+        # Chamado com self._lock adquirido
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, tokens INTEGER NOT NULL, "
+                "version TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            # Descartar entradas de outras versões e expiradas
+            removed = connection.execute(
+                "DELETE FROM llm_cache WHERE version != ? OR expires_at <= ?", (self.version, time.time())
+            ).rowcount
+            connection.commit()
+            if removed:
+                logger.info(f"[LLM-CACHE] {removed} entradas expiradas ou de outra versão removidas")
+            self._connection = connection
+        return self._connection
@@ -1,6 +1,12 @@
 from langchain_google_vertexai import ChatVertexAI
 from langchain_core.messages import HumanMessage
 from ..utils import Environment
+from ..utils.tokens import TokenCounter
+from .client_registry import ClientRegistry
+from .context_cache import ContextCache
+from .llm_cache import LLMCache
+from .rate_limiter import RateLimiter, LLMQuotaExceededError
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +21,7 @@ class LLMGateway(ChatVertexAI):
         super().__init__(model_name=model_name, project=project, location=location)
     
     @staticmethod
-    def analyze_code(code: str, prompt: str = None, language: str = None) -> str:
+    def analyze_code(code: str, prompt: str = None, language: str = None, shared_prefix: str = None) -> str:
         """
         Analisa o código usando o modelo de linguagem.
         
@@ -23,18 +29,13 @@ class LLMGateway(ChatVertexAI):
             code: Código a ser analisado
             prompt: Prompt personalizado para análise (opcional)
             language: Linguagem de programação do código (opcional)
+            shared_prefix: Início do prompt comum a todas as requisições do job, reaproveitado
+                pelo cache de contexto do provedor quando habilitado (opcional)
             
         Returns:
             str: Resultado da análise
         """
         try:
-            # Inicializar o modelo
-            model_name = Environment.get("GOOGLE_AI_MODEL_NAME")
-            project = Environment.get("GOOGLE_PROJECT")
-            location = Environment.get("GOOGLE_LOCATION")
-            
-            model = ChatVertexAI(model_name=model_name, project=project, location=location)
-            
             # Usar o prompt personalizado ou o prompt padrão
             if not prompt:
                 # Prompt padrão
@@ -60,17 +61,55 @@ class LLMGateway(ChatVertexAI):
             ```
             '''
             
+            # Consultar o cache antes de chamar o modelo
+            cache = LLMCache.default() if LLMCache.enabled() else None
+            cache_key = LLMCache.key(Environment.get("GOOGLE_AI_MODEL_NAME"), base_prompt, language, code)
+            if cache:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"[LLM-GATEWAY] Resposta obtida do cache para {len(code)} caracteres")
+                    return cached
+            
             logger.info(f"[LLM-GATEWAY] Enviando {len(code)} caracteres para análise")
             
-            # Enviar a solicitação
-            messages = [HumanMessage(content=final_prompt)]
-            response = model.invoke(messages)
+            # Prefixo compartilhado já em cache no provedor: enviar apenas o restante do prompt
+            context_cache = ContextCache.default() if shared_prefix and ContextCache.enabled() else None
+            cached_prefix = None
+            if context_cache and base_prompt.startswith(shared_prefix):
+                cached_prefix = context_cache.get_or_create(Environment.get("GOOGLE_AI_MODEL_NAME"), shared_prefix)
             
-            if not response or not response.content:
+            started = time.monotonic()
+            if cached_prefix:
+                suffix = final_prompt.replace(shared_prefix, "", 1)
+                content = RateLimiter.default().call(
+                    lambda: context_cache.generate(cached_prefix, suffix),
+                    tokens=TokenCounter.count(suffix)
+                )
+            else:
+                # Cliente compartilhado pelo processo (credenciais e canal gRPC já inicializados)
+                model = ClientRegistry.chat()
+                
+                # Enviar a solicitação respeitando os limites de cota compartilhados
+                messages = [HumanMessage(content=final_prompt)]
+                response = RateLimiter.default().call(
+                    lambda: model.invoke(messages),
+                    tokens=TokenCounter.count(final_prompt)
+                )
+                content = response.content if response else None
+                if context_cache:
+                    context_cache.record(time.monotonic() - started)
+            
+            if not content:
                 raise ValueError("O modelo não retornou uma resposta válida")
+            
+            if cache:
+                cache.put(cache_key, content, TokenCounter.count(final_prompt) + TokenCounter.count(content))
                 
-            return response.content
+            return content
             
+        except LLMQuotaExceededError:
+            logger.error("[LLM-GATEWAY] Cota do LLM esgotada, análise deve ser reprocessada")
+            raise
         except Exception as e:
             logger.error(f"[LLM-GATEWAY] Erro ao analisar código: {str(e)}")
             raise ValueError(f"Erro na análise do código: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,47 @@
+from typing import ClassVar, List, Optional
+
 from langchain_google_vertexai import VertexAIEmbeddings
 
+from .embedding_cache import EmbeddingCache
+
 
 class ModelEmbeddings(VertexAIEmbeddings):
 
-    def __init__(self):
-        model_name = "textembedding-gecko@003"
+    DEFAULT_MODEL_NAME: ClassVar[str] = "textembedding-gecko@003"
+
+    def __init__(self, model_name: Optional[str] = None, project: Optional[str] = None,
+                 location: Optional[str] = None):
+        kwargs = {}
+        if project:
+            kwargs["project"] = project
+        if location:
+            kwargs["location"] = location
+
+        super().__init__(model_name=model_name or ModelEmbeddings.DEFAULT_MODEL_NAME, **kwargs)
+
+    def embed_documents(self, texts: List[str], batch_size: int = 0) -> List[List[float]]:
+        """
+        Calcula os embeddings dos documentos, reaproveitando os que estão no EmbeddingCache.
+
+        Os textos ausentes do cache vão em lotes montados pelo cache, um por requisição.
+        """
+        if not EmbeddingCache.enabled():
+            return super().embed_documents(texts, batch_size)
+
+        return EmbeddingCache.default().embed(
+            self.model_name,
+            "RETRIEVAL_DOCUMENT",
+            texts,
+            lambda batch: self.embed(batch, len(batch), "RETRIEVAL_DOCUMENT")
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        if not EmbeddingCache.enabled():
+            return super().embed_query(text)
 
-        super().__init__(model_name=model_name)
+        return EmbeddingCache.default().embed(
+            self.model_name,
+            "RETRIEVAL_QUERY",
+            [text],
+            lambda batch: self.embed(batch, 1, "RETRIEVAL_QUERY")
+        )[0]
@@ -1,8 +1,17 @@
-from typing import List, Any
+import uuid
+from typing import List, Any, Optional
+import faiss
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from .code_splitter import CodeSplitter
+from .vector_index import VectorIndex
+from .vector_storage import VectorStorage, FLAT
+from .lexical_index import LexicalIndex, HybridRetriever
 
 class RAG:
 
@@ -22,7 +31,13 @@ class RAG:
             chunk_overlap=100,
             separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
         )
-        docs = text_splitter.split_documents(documents)
+        code_splitter = CodeSplitter()
+
+        # Código-fonte é dividido nos limites das definições; os demais documentos, por texto
+        docs = []
+        for document in documents:
+            splitter = code_splitter if CodeSplitter.language_of(document) else text_splitter
+            docs.extend(splitter.split_documents([document]))
 
         return docs
 
@@ -38,23 +53,49 @@ class RAG:
                Returns:
                    Any: Um vetor FAISS contendo os documentos vetorizados.
         """
-        vector = FAISS.from_documents(documents=documents, embedding=embeddings)
+        # Corpora pequenos usam busca exata; os maiores, o índice escolhido pelo VectorStorage
+        storage = VectorStorage()
+        if storage.choose(len(documents)) == FLAT:
+            return FAISS.from_documents(documents=documents, embedding=embeddings)
+
+        vectors = np.array(embeddings.embed_documents([document.page_content for document in documents]), dtype='float32')
+        faiss.normalize_L2(vectors)
+        ids = [str(uuid.uuid4()) for _ in documents]
+        vector = FAISS(
+            embedding_function=embeddings,
+            index=storage.build(vectors),
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
 
         return vector
 
     @staticmethod
-    def retriever(documents: List[Document], embeddings: Embeddings):
+    def retriever(documents: List[Document], embeddings: Embeddings, repository: Optional[str] = None):
         """
               Recupera documentos relevantes com base nos embeddings fornecidos.
 
               Args:
                   documents (List[Document]): Lista de documentos a serem processados e recuperados.
                   embeddings (Embeddings): Embeddings usados para a recuperação dos documentos.
+                  repository (Optional[str]): Repositório dos documentos, que identifica o índice persistente
+                      (padrão: derivado das fontes dos documentos). Só os documentos alterados têm embeddings calculados.
 
               Returns:
                   Any: Um objeto retriever configurado para recuperar documentos relevantes.
         """
-        vector = RAG.vector(documents=RAG.split_documents(documents), embeddings=embeddings)
+        if VectorIndex.enabled():
+            index = VectorIndex.open(repository or VectorIndex.corpus(documents), embeddings, RAG.split_documents)
+            index.sync(documents)
+            return index.as_retriever()
+
+        chunks = RAG.split_documents(documents)
+        vector = RAG.vector(documents=chunks, embeddings=embeddings)
+        # Busca vetorial fundida à busca BM25 pelos identificadores da consulta
+        if LexicalIndex.hybrid_enabled():
+            return HybridRetriever.build(vector, chunks, embeddings)
         retriever = vector.as_retriever()
 
         return retriever
@@ -0,0 +1,244 @@
+import re
+import time
+import random
+import logging
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Padrões de cota do Vertex AI por worker (0 desativa o limite correspondente)
+DEFAULT_RPM = 60
+DEFAULT_TPM = 0
+DEFAULT_MAX_INFLIGHT = 8
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+# Código 429 isolado (não "4290 tokens" nem parte de um id) acompanhado do motivo de cota
+QUOTA_STATUS = re.compile(r'\b429\b')
+QUOTA_REASON = re.compile(r'too many requests|resource.?exhausted|quota exceeded', re.IGNORECASE)
+
+
+class LLMQuotaExceededError(Exception):
+    """
+    Indica que a cota do LLM continuou esgotada após todas as tentativas.
+
+    O job deve ser devolvido à fila (nack) em vez de descartado.
+    """
+    pass
+
+
+class TokenBucket:
+    """
+    Balde de tokens reabastecido continuamente a uma taxa por minuto.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Reserva amount tokens e retorna quantos segundos esperar antes de usá-los.
+
+        A reserva é feita mesmo sem saldo (o saldo fica negativo), o que mantém a
+        ordem de chegada entre as threads.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Uma requisição maior que a capacidade espera apenas pelo balde cheio
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Limitador compartilhado pelo processo para as chamadas ao Vertex AI.
+
+    Combina baldes de requisições/minuto e tokens/minuto, um limite de chamadas
+    simultâneas ajustado por AIMD (aumento aditivo a cada sucesso, redução
+    multiplicativa a cada erro de cota) e novas tentativas com backoff exponencial
+    e jitter para erros 429/ResourceExhausted.
+    """
+
+    _default: Optional["RateLimiter"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None,
+                 max_inflight: Optional[int] = None, max_retries: Optional[int] = None,
+                 backoff_base: Optional[float] = None, backoff_max: Optional[float] = None):
+        rpm = rpm if rpm is not None else int(Environment.get("LLM_RPM_LIMIT") or DEFAULT_RPM)
+        tpm = tpm if tpm is not None else int(Environment.get("LLM_TPM_LIMIT") or DEFAULT_TPM)
+        self.requests_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self.max_inflight = max_inflight if max_inflight is not None else int(
+            Environment.get("LLM_MAX_INFLIGHT") or DEFAULT_MAX_INFLIGHT
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            Environment.get("LLM_MAX_RETRIES") or DEFAULT_MAX_RETRIES
+        )
+        self.backoff_base = backoff_base if backoff_base is not None else float(
+            Environment.get("LLM_BACKOFF_BASE_SECONDS") or DEFAULT_BACKOFF_BASE
+        )
+        self.backoff_max = backoff_max if backoff_max is not None else float(
+            Environment.get("LLM_BACKOFF_MAX_SECONDS") or DEFAULT_BACKOFF_MAX
+        )
+
+        self.concurrency_limit = float(self.max_inflight)
+        self.inflight = 0
+        self._condition = threading.Condition()
+
+        self.requests = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failures = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+
+    @classmethod
+    def default(cls) -> "RateLimiter":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def is_quota_error(error: Exception) -> bool:
+        """
+        Classifica pelo tipo da exceção ou pelo código gRPC/HTTP, inclusive nas causas encadeadas.
+
+        O texto só decide quando traz o código 429 isolado junto do motivo de cota, para que
+        erros determinísticos que apenas mencionam o número não sejam repetidos.
+        """
+        try:
+            from google.api_core import exceptions as google_exceptions
+            quota_types = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+        except ImportError:
+            quota_types = ()
+
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            if quota_types and isinstance(error, quota_types):
+                return True
+            if RateLimiter._status_code(error) == 429:
+                return True
+            message = str(error)
+            if QUOTA_STATUS.search(message) and QUOTA_REASON.search(message):
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        # gRPC: code() retorna um StatusCode; HTTP: status_code no erro ou na resposta
+        code = getattr(error, "code", None)
+        if callable(code):
+            try:
+                code = code()
+            except Exception:
+                code = None
+        if code is not None and getattr(code, "name", None) == "RESOURCE_EXHAUSTED":
+            return 429
+        for value in (code, getattr(error, "status_code", None),
+                      getattr(getattr(error, "response", None), "status_code", None)):
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        return None
+
+    def call(self, fn: Callable[[], T], tokens: int = 0) -> T:
+        """
+        Executa fn respeitando os limites e repetindo em caso de erro de cota.
+
+        Args:
+            fn: Chamada ao modelo
+            tokens: Tokens estimados da requisição (para o limite de tokens/minuto)
+
+        Returns:
+            T: Resultado de fn
+
+        Raises:
+            LLMQuotaExceededError: Se a cota continuar esgotada após max_retries tentativas
+        """
+        for attempt in range(self.max_retries + 1):
+            self._acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not self.is_quota_error(e):
+                    self._release(success=None)
+                    raise
+                self._release(success=False)
+
+                if attempt == self.max_retries:
+                    with self._condition:
+                        self.failures += 1
+                    raise LLMQuotaExceededError(f"Cota do LLM esgotada após {attempt + 1} tentativas: {str(e)}")
+
+                # Backoff exponencial com jitter completo
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                with self._condition:
+                    self.retries += 1
+                logger.warning(f"[RATE-LIMITER] Cota esgotada (tentativa {attempt + 1}), nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self._release(success=True)
+            return result
+
+    def metrics(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "requests": self.requests,
+                "throttles": self.throttles,
+                "retries": self.retries,
+                "failures": self.failures,
+                "inflight": self.inflight,
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "queue_delay_seconds_total": round(self.queue_delay_total, 3),
+                "queue_delay_seconds_avg": round(self.queue_delay_total / self.requests, 3) if self.requests else 0.0,
+                "queue_delay_seconds_max": round(self.queue_delay_max, 3),
+            }
+
+    def _acquire(self, tokens: int):
+        started = time.monotonic()
+
+        with self._condition:
+            while self.inflight >= max(1, int(self.concurrency_limit)):
+                self._condition.wait()
+            self.inflight += 1
+
+        wait = 0.0
+        if self.requests_bucket:
+            wait = max(wait, self.requests_bucket.reserve(1))
+        if self.tokens_bucket and tokens:
+            wait = max(wait, self.tokens_bucket.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+        delay = time.monotonic() - started
+        with self._condition:
+            self.requests += 1
+            self.queue_delay_total += delay
+            self.queue_delay_max = max(self.queue_delay_max, delay)
+
+    def _release(self, success: Optional[bool]):
+        with self._condition:
+            self.inflight -= 1
+            if success is True:
+                self.concurrency_limit = min(float(self.max_inflight), self.concurrency_limit + 1.0 / self.concurrency_limit)
+            elif success is False:
+                self.throttles += 1
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+            self._condition.notify_all()
@@ -0,0 +1,378 @@
+import os
+import json
+import uuid
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+from .vector_storage import VectorStorage
+from .lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+# Padrões: compactar quando 25% dos vetores forem lápides ou houver mais de 8 segmentos
+DEFAULT_COMPACT_RATIO = 0.25
+DEFAULT_MAX_SEGMENTS = 8
+
+SEGMENT_PREFIX = "segment-"
+
+
+class VectorIndex:
+    """
+    Índice vetorial persistente de um repositório, atualizado de forma incremental.
+
+    Cada documento é identificado pela fonte (metadata["source"]) e pelo SHA do seu conteúdo.
+    Uma sincronização só calcula embeddings das fontes novas ou alteradas; os trechos das
+    fontes alteradas ou removidas viram lápides, ignoradas nas buscas.
+
+    Os vetores ficam em segmentos FAISS imutáveis, abertos com memory mapping, e os textos
+    e metadados em um SQLite ao lado. O tipo de cada segmento depende do seu tamanho
+    (VectorStorage): busca exata nos pequenos, HNSW ou IVF comprimido nos grandes.
+    A compactação (em segundo plano) junta os segmentos e descarta as lápides sem
+    recalcular embeddings.
+
+    Um índice BM25 dos mesmos trechos (LexicalIndex) fica no mesmo SQLite e é fundido à
+    busca vetorial, para que identificadores citados na consulta sejam encontrados.
+    """
+
+    _instances: Dict[str, "VectorIndex"] = {}
+    _instances_guard = threading.Lock()
+
+    def __init__(self, repository: str, embeddings: Embeddings,
+                 splitter: Callable[[List[Document]], List[Document]], directory: Optional[str] = None,
+                 compact_ratio: Optional[float] = None, max_segments: Optional[int] = None,
+                 storage: Optional[VectorStorage] = None):
+        self.repository = repository
+        self.embeddings = embeddings
+        self.splitter = splitter
+        self.directory = directory or os.path.join(
+            Environment.get("VECTOR_INDEX_DIR") or os.path.join(tempfile.gettempdir(), "code-analyzer-vector-indexes"),
+            VectorIndex.key(repository, embeddings)
+        )
+        self.compact_ratio = compact_ratio if compact_ratio is not None else float(
+            Environment.get("VECTOR_INDEX_COMPACT_RATIO") or DEFAULT_COMPACT_RATIO
+        )
+        self.max_segments = max_segments if max_segments is not None else int(
+            Environment.get("VECTOR_INDEX_MAX_SEGMENTS") or DEFAULT_MAX_SEGMENTS
+        )
+        self.storage = storage or VectorStorage()
+
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._segments: Dict[str, Any] = {}
+        self._deleted: set = set()
+        self._compaction: Optional[threading.Thread] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(self.directory, "chunks.sqlite3"), timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, text TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.execute("CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, blob_sha TEXT NOT NULL)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY)")
+        self._connection.commit()
+        self.lexical = LexicalIndex(self._connection, self._lock)
+        self._index_lexical()
+        self._load()
+
+    @classmethod
+    def open(cls, repository: str, embeddings: Embeddings,
+             splitter: Callable[[List[Document]], List[Document]]) -> "VectorIndex":
+        """Retorna o índice do repositório, compartilhado pelo processo."""
+        key = VectorIndex.key(repository, embeddings)
+        with cls._instances_guard:
+            if key not in cls._instances:
+                cls._instances[key] = cls(repository, embeddings, splitter)
+            return cls._instances[key]
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("VECTOR_INDEX_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def key(repository: str, embeddings: Embeddings) -> str:
+        # Vetores de modelos diferentes não são comparáveis: um índice por (repositório, modelo)
+        model = getattr(embeddings, "model_name", None) or type(embeddings).__name__
+        return hashlib.sha256(f"{repository}\0{model}".encode('utf-8')).hexdigest()[:32]
+
+    @staticmethod
+    def corpus(documents: List[Document]) -> str:
+        """
+        Identificação estável de um conjunto de documentos sem repositório informado: as mesmas
+        fontes reabrem o mesmo índice, que recalcula embeddings só do conteúdo alterado.
+        """
+        sources = sorted({VectorIndex.source_of(document) for document in documents})
+        return "sources:" + hashlib.sha256("\0".join(sources).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def source_of(document: Document) -> str:
+        metadata = document.metadata or {}
+        return str(metadata.get("source") or hashlib.sha1(document.page_content.encode('utf-8')).hexdigest())
+
+    def sync(self, documents: List[Document]) -> Dict[str, int]:
+        """
+        Atualiza o índice para refletir exatamente os documentos informados.
+
+        Returns:
+            Dict[str, int]: Fontes inalteradas, adicionadas ou alteradas, removidas e trechos indexados
+        """
+        by_source: Dict[str, List[Document]] = {}
+        for document in documents:
+            source = VectorIndex.source_of(document)
+            # A fonte vai nos metadados para que os trechos herdem a mesma identificação
+            document = Document(page_content=document.page_content, metadata=dict(document.metadata or {}, source=source))
+            by_source.setdefault(source, []).append(document)
+
+        shas = {
+            source: SourceFiles.blob_sha("\0".join(d.page_content for d in docs).encode('utf-8'))
+            for source, docs in by_source.items()
+        }
+
+        # Uma sincronização por vez; as buscas só esperam pela gravação, não pelos embeddings
+        with self._sync_lock:
+            with self._lock:
+                stored = dict(self._connection.execute("SELECT source, blob_sha FROM sources").fetchall())
+            changed = [source for source, sha in shas.items() if stored.get(source) != sha]
+            removed = [source for source in stored if source not in shas]
+
+            chunks = self.splitter([d for source in changed for d in by_source[source]]) if changed else []
+            vectors = self._embed([chunk.page_content for chunk in chunks]) if chunks else None
+
+            with self._lock:
+                self._commit(stored, changed, removed, shas, chunks, vectors)
+
+        result = {
+            "unchanged": len(shas) - len(changed),
+            "changed": len(changed),
+            "removed": len(removed),
+            "chunks": len(chunks),
+        }
+        logger.info(f"[VECTOR-INDEX] Sincronização concluída: {result}")
+        self._maybe_compact()
+        return result
+
+    def search(self, query: str, k: int = 4) -> List[Document]:
+        """
+        Retorna os k trechos mais similares à consulta, ignorando as lápides.
+        """
+        with self._lock:
+            segments = list(self._segments.values())
+            deleted = self._deleted
+
+        if not segments:
+            return []
+
+        hybrid = LexicalIndex.hybrid_enabled()
+        # Na busca híbrida, cada lado traz mais candidatos para a fusão
+        wanted = LexicalIndex.candidates(k) if hybrid else k
+
+        vector = self._embed([query], query=True)
+        candidates: List[Tuple[float, int]] = []
+        for index in segments:
+            fetch = min(index.ntotal, wanted + len(deleted))
+            if fetch == 0:
+                continue
+            scores, ids = index.search(vector, fetch)
+            candidates.extend((float(s), int(i)) for s, i in zip(scores[0], ids[0]) if i >= 0 and int(i) not in deleted)
+
+        top = [i for _, i in sorted(candidates, reverse=True)[:wanted]]
+        if hybrid:
+            top = LexicalIndex.fuse(top, [i for i, _ in self.lexical.search(query, wanted) if i not in deleted], k)
+        if not top:
+            return []
+
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, text, metadata FROM chunks WHERE id IN ({','.join('?' * len(top))})", top
+            ).fetchall()
+        by_id = {row[0]: Document(page_content=row[1], metadata=json.loads(row[2])) for row in rows}
+        return [by_id[i] for i in top if i in by_id]
+
+    def as_retriever(self, k: int = 4) -> "VectorIndexRetriever":
+        return VectorIndexRetriever(index=self, k=k)
+
+    def compact(self) -> bool:
+        """
+        Junta todos os segmentos em um só, sem os vetores das lápides.
+
+        Returns:
+            bool: True se houve compactação
+        """
+        with self._lock:
+            names = list(self._segments)
+            deleted = set(self._deleted)
+
+        if len(names) <= 1 and not deleted:
+            return False
+
+        vectors, ids = [], []
+        for name in names:
+            # Leitura completa (sem mmap) para reconstruir os vetores do segmento
+            segment_vectors, segment_ids = VectorStorage.vectors(faiss.read_index(os.path.join(self.directory, name)))
+            if len(segment_ids) == 0:
+                continue
+            live = np.array([int(i) not in deleted for i in segment_ids], dtype=bool)
+            vectors.append(segment_vectors[live])
+            ids.append(segment_ids[live])
+
+        with self._lock:
+            try:
+                new_name = None
+                if ids and sum(len(i) for i in ids):
+                    new_name = self._write_segment(np.vstack(vectors), np.concatenate(ids))
+                    self._connection.execute("INSERT INTO segments (name) VALUES (?)", (new_name,))
+                self._connection.executemany("DELETE FROM segments WHERE name = ?", [(name,) for name in names])
+                # Só as lápides que existiam no início: as criadas durante a compactação continuam nos vetores
+                self._connection.executemany("DELETE FROM chunks WHERE id = ? AND deleted = 1", [(i,) for i in deleted])
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+
+            self._load()
+
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+        logger.info(f"[VECTOR-INDEX] Compactação: {len(names)} segmento(s) em 1, {len(deleted)} lápide(s) descartada(s)")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "vectors": sum(index.ntotal for index in self._segments.values()),
+                "tombstones": len(self._deleted),
+            }
+
+    def _maybe_compact(self):
+        stats = self.stats()
+        if stats["vectors"] == 0:
+            return
+        if stats["segments"] <= self.max_segments and stats["tombstones"] / stats["vectors"] < self.compact_ratio:
+            return
+
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(target=self._compact_safely, name="vector-index-compaction", daemon=True)
+            self._compaction.start()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"[VECTOR-INDEX] Erro na compactação: {str(e)}")
+
+    def _embed(self, texts: List[str], query: bool = False) -> np.ndarray:
+        vectors = [self.embeddings.embed_query(texts[0])] if query else self.embeddings.embed_documents(texts)
+        array = np.array(vectors, dtype='float32')
+        # Vetores normalizados: produto interno equivale à similaridade de cosseno
+        faiss.normalize_L2(array)
+        return array
+
+    def _commit(self, stored: Dict[str, str], changed: List[str], removed: List[str], shas: Dict[str, str],
+                chunks: List[Document], vectors: Optional[np.ndarray]):
+        # Chamado com self._lock adquirido: lápides, novos trechos e novo segmento em uma única transação
+        try:
+            stale = [source for source in changed + removed if source in stored]
+            for source in stale:
+                self.lexical.remove(row[0] for row in self._connection.execute(
+                    "SELECT id FROM chunks WHERE source = ? AND deleted = 0", (source,)
+                ).fetchall())
+                self._connection.execute("UPDATE chunks SET deleted = 1 WHERE source = ? AND deleted = 0", (source,))
+                self._connection.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+            if chunks:
+                ids = []
+                for chunk in chunks:
+                    cursor = self._connection.execute(
+                        "INSERT INTO chunks (source, text, metadata) VALUES (?, ?, ?)",
+                        (VectorIndex.source_of(chunk), chunk.page_content, json.dumps(chunk.metadata or {}, default=str))
+                    )
+                    ids.append(cursor.lastrowid)
+                self.lexical.add(zip(ids, (chunk.page_content for chunk in chunks)))
+                name = self._write_segment(vectors, np.array(ids, dtype='int64'))
+                self._connection.execute("INSERT INTO segments (name) VALUES (?)", (name,))
+
+            for source in changed:
+                self._connection.execute("INSERT OR REPLACE INTO sources (source, blob_sha) VALUES (?, ?)", (source, shas[source]))
+
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+
+        self._load()
+
+    def _index_lexical(self):
+        # Índices gravados antes do LexicalIndex: indexar os trechos vivos que ainda não estão nele
+        with self._lock:
+            indexed = self.lexical.ids()
+            rows = self._connection.execute("SELECT id, text FROM chunks WHERE deleted = 0").fetchall()
+            missing = [(chunk_id, text) for chunk_id, text in rows if chunk_id not in indexed]
+            if missing:
+                self.lexical.add(missing)
+                self._connection.commit()
+                logger.info(f"[VECTOR-INDEX] {len(missing)} trecho(s) incluído(s) no índice léxico")
+
+    def _write_segment(self, vectors: np.ndarray, ids: np.ndarray) -> str:
+        index = self.storage.build(vectors, ids)
+
+        name = f"{SEGMENT_PREFIX}{uuid.uuid4().hex}.faiss"
+        tmp_path = os.path.join(self.directory, f"{name}.tmp")
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        return name
+
+    def _load(self):
+        # Chamado com self._lock adquirido
+        names = [row[0] for row in self._connection.execute("SELECT name FROM segments").fetchall()]
+        segments = {}
+        for name in names:
+            segment = self._segments.get(name)
+            if segment is None:
+                segment = faiss.read_index(os.path.join(self.directory, name), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                self.storage.tune(segment)
+            segments[name] = segment
+        self._segments = segments
+        self._deleted = {row[0] for row in self._connection.execute("SELECT id FROM chunks WHERE deleted = 1").fetchall()}
+
+        # Segmentos gravados por uma sincronização interrompida não estão no SQLite
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name not in segments:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class VectorIndexRetriever(BaseRetriever):
+    """
+    Retriever do LangChain sobre um VectorIndex.
+    """
+
+    index: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.index.search(query, self.k)
@@ -0,0 +1,168 @@
+import math
+import logging
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Tipos de índice: busca exata (float32), grafo HNSW, IVF com vetores em float16 e IVF com quantização por produto
+FLAT = "flat"
+HNSW = "hnsw"
+SQ16 = "sq16"
+IVF = "ivf"
+IVFPQ = "ivfpq"
+KINDS = (FLAT, HNSW, SQ16, IVF, IVFPQ)
+
+# Padrões: busca exata até 20 mil vetores, HNSW até 200 mil e IVF com float16 acima disso
+DEFAULT_FLAT_MAX = 20000
+DEFAULT_COMPRESS_MIN = 200000
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+DEFAULT_NPROBE = 16
+
+# O k-means do IVF precisa de ao menos 39 pontos por lista
+MIN_POINTS_PER_LIST = 39
+MIN_LISTS = 8
+
+
+class VectorStorage:
+    """
+    Escolhe e monta o índice FAISS de um conjunto de vetores normalizados (produto interno).
+
+    Conjuntos pequenos usam busca exata em float32; médios, um grafo HNSW; grandes, IVF
+    com os vetores em float16 (ou quantização por produto, se configurada), o que reduz a
+    memória por vetor e o tempo de busca. VECTOR_INDEX_TYPE fixa um tipo para todos os índices.
+    """
+
+    def __init__(self, kind: Optional[str] = None, flat_max: Optional[int] = None,
+                 compress_min: Optional[int] = None, ef_search: Optional[int] = None,
+                 nprobe: Optional[int] = None):
+        self.kind = (kind or Environment.get("VECTOR_INDEX_TYPE") or "auto").lower()
+        self.flat_max = flat_max if flat_max is not None else int(
+            Environment.get("VECTOR_INDEX_FLAT_MAX") or DEFAULT_FLAT_MAX
+        )
+        self.compress_min = compress_min if compress_min is not None else int(
+            Environment.get("VECTOR_INDEX_COMPRESS_MIN") or DEFAULT_COMPRESS_MIN
+        )
+        self.ef_search = ef_search if ef_search is not None else int(
+            Environment.get("VECTOR_INDEX_EF_SEARCH") or DEFAULT_EF_SEARCH
+        )
+        self.nprobe = nprobe if nprobe is not None else int(
+            Environment.get("VECTOR_INDEX_NPROBE") or DEFAULT_NPROBE
+        )
+        if self.kind != "auto" and self.kind not in KINDS:
+            raise ValueError(f"Tipo de índice vetorial desconhecido: {self.kind}")
+
+    def choose(self, count: int) -> str:
+        """
+        Tipo de índice para count vetores.
+        """
+        kind = self.kind
+        if kind == "auto":
+            if count <= self.flat_max:
+                kind = FLAT
+            elif count < self.compress_min:
+                kind = HNSW
+            else:
+                kind = IVF
+
+        # Poucos vetores para treinar o IVF: float16 sem listas invertidas
+        if kind in (IVF, IVFPQ) and VectorStorage.lists(count) < MIN_LISTS:
+            kind = SQ16
+        return kind
+
+    @staticmethod
+    def lists(count: int) -> int:
+        return min(int(4 * math.sqrt(count)), count // MIN_POINTS_PER_LIST)
+
+    def build(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None, kind: Optional[str] = None) -> faiss.Index:
+        """
+        Monta e treina o índice com os vetores; com ids, o índice é um IndexIDMap2.
+        """
+        dimension = vectors.shape[1]
+        kind = kind or self.choose(len(vectors))
+
+        if kind == FLAT:
+            index = faiss.IndexFlatIP(dimension)
+        elif kind == HNSW:
+            index = faiss.IndexHNSWFlat(dimension, DEFAULT_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        elif kind == SQ16:
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        elif kind == IVF:
+            index = faiss.index_factory(dimension, f"IVF{VectorStorage.lists(len(vectors))},SQfp16", faiss.METRIC_INNER_PRODUCT)
+        elif kind == IVFPQ:
+            index = faiss.index_factory(
+                dimension, f"IVF{VectorStorage.lists(len(vectors))},PQ{VectorStorage.subquantizers(dimension)}",
+                faiss.METRIC_INNER_PRODUCT
+            )
+            # O treino polissêmico só serve à busca por distância de Hamming, que não é usada, e domina o tempo de treino
+            faiss.downcast_index(index).do_polysemous_training = False
+        else:
+            raise ValueError(f"Tipo de índice vetorial desconhecido: {kind}")
+
+        if not index.is_trained:
+            index.train(vectors)
+
+        if ids is not None:
+            index = faiss.IndexIDMap2(index)
+            index.add_with_ids(vectors, ids)
+        else:
+            index.add(vectors)
+
+        self.tune(index)
+        return index
+
+    @staticmethod
+    def subquantizers(dimension: int) -> int:
+        # 1 byte a cada 8 dimensões (96 bytes por vetor de 768 dimensões), um divisor da dimensão
+        for m in range(max(1, dimension // 8), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
+
+    def tune(self, index: faiss.Index):
+        """
+        Ajusta os parâmetros de busca (efSearch do HNSW, nprobe do IVF), que não são gravados no arquivo.
+        """
+        inner = VectorStorage.inner(index)
+        if isinstance(inner, faiss.IndexHNSW):
+            inner.hnsw.efSearch = self.ef_search
+        elif isinstance(inner, faiss.IndexIVF):
+            inner.nprobe = self.nprobe
+
+    @staticmethod
+    def inner(index: faiss.Index) -> faiss.Index:
+        index = faiss.downcast_index(index)
+        if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+            index = faiss.downcast_index(index.index)
+        return index
+
+    @staticmethod
+    def kind_of(index: faiss.Index) -> str:
+        inner = VectorStorage.inner(index)
+        if isinstance(inner, faiss.IndexHNSW):
+            return HNSW
+        if isinstance(inner, faiss.IndexIVFPQ):
+            return IVFPQ
+        if isinstance(inner, faiss.IndexIVF):
+            return IVF
+        if isinstance(inner, faiss.IndexScalarQuantizer):
+            return SQ16
+        return FLAT
+
+    @staticmethod
+    def vectors(index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vetores (reconstruídos, aproximados nos tipos comprimidos) e ids de um IndexIDMap2 lido sem mmap.
+        """
+        ids = faiss.vector_to_array(index.id_map)
+        inner = VectorStorage.inner(index)
+        if len(ids) == 0:
+            return np.zeros((0, index.d), dtype='float32'), ids
+        if isinstance(inner, faiss.IndexIVF):
+            inner.make_direct_map()
+        return inner.reconstruct_n(0, index.ntotal), ids
@@ -7,7 +7,7 @@ from datetime import datetime
 from .utils import logger, Policy, Environment
 from .startup import startup_event
 
-from .routers import user_router, integrations_router, file_quota_router
+from .routers import user_router, integrations_router, file_quota_router, metrics_router
 
 app = FastAPI(
     title="ChatAgent",
@@ -52,5 +52,6 @@ app.add_event_handler("startup", startup_event)
 api_router.include_router(user_router)
 api_router.include_router(integrations_router)
 api_router.include_router(file_quota_router)
+api_router.include_router(metrics_router)
 
 app.include_router(api_router)
@@ -1,3 +1,4 @@
 from .user import user_router
 from .integrations import integrations_router
 from .file_quota import file_quota_router
+from .metrics import metrics_router
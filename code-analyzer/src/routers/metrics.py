@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from typing import Dict
+
+from ..domain import LLMCache, ContextCache, EmbeddingCache, RateLimiter
+from ..services.blob_store import BlobStore
+from ..services.worker_pool import WorkerPool
+
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+@metrics_router.get("/llm")
+async def get_llm_metrics() -> Dict:
+    """
+    Retorna as métricas das chamadas ao LLM deste worker.
+
+    Returns:
+        Dict: Limitador de cota (fila, throttles, concorrência), caches de respostas, de contexto e de embeddings e BlobStore
+    """
+    return {
+        "rate_limiter": RateLimiter.default().metrics(),
+        "llm_cache": LLMCache.default().stats() if LLMCache.enabled() else None,
+        "context_cache": ContextCache.default().stats() if ContextCache.enabled() else None,
+        "embedding_cache": EmbeddingCache.default().stats() if EmbeddingCache.enabled() else None,
+        "blob_store": BlobStore.default().stats() if BlobStore.enabled() else None,
+    }
+
+
+@metrics_router.get("/workers")
+async def get_worker_metrics() -> Dict:
+    """
+    Retorna as métricas dos jobs de análise deste worker.
+
+    Returns:
+        Dict: Limites de jobs e de controle de fluxo, fila, jobs em andamento e duração dos jobs
+    """
+    return WorkerPool.default().metrics()
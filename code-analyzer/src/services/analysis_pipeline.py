@@ -0,0 +1,420 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from ..domain import LLMGateway, LLMQuotaExceededError
+from ..utils import Environment
+from ..utils.concurrency import Concurrency
+from ..utils.source_files import SourceFiles
+from ..utils.tokens import TokenCounter
+from .file_collector import FileRecord
+from .analysis_store import AnalysisStore
+from .prompt_compiler import BATCH_HEADER, CompiledPrompt
+from .token_packer import Batch, PackUnit, TokenPacker
+
+logger = logging.getLogger(__name__)
+
+# Padrões: checkpoints no diretório temporário, descartados após 1 dia, e agrupamento pelo diretório de primeiro nível
+DEFAULT_CHECKPOINT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_GROUP_DEPTH = 1
+
+ROOT_GROUP = "."
+
+# Cabeçalho da seção de um arquivo na resposta de um lote, com ou sem o nível de título pedido
+BATCH_SECTION = re.compile(r'^\s*(?:#+\s*)?\**' + re.escape(BATCH_HEADER.strip('# ')) + r'\**\s*(.+?)\s*$')
+
+COMBINE_PROMPT = '''
+Você é um líder técnico consolidando revisões de código. Abaixo estão as análises dos arquivos de `{group}`.
+Escreva um resumo desse módulo: os problemas mais relevantes (indicando os arquivos afetados), padrões que se repetem
+e as recomendações prioritárias. Seja direto e sucinto, sem repetir trechos de código.
+'''
+
+REDUCE_PROMPT = '''
+Você é um líder técnico escrevendo o relatório final da análise de um repositório. Abaixo estão os resumos de cada módulo.
+Escreva um relatório com: visão geral da qualidade do código, problemas mais críticos (indicando módulos e arquivos),
+padrões recorrentes entre os módulos e um plano de ação priorizado. Seja direto e sucinto, pois você está escrevendo um comentário.
+'''
+
+
+class PipelineReport(BaseModel):
+    files: int = 0
+    reused_files: int = 0
+    units: int = 0
+    batches: int = 0
+    groups: int = 0
+    llm_calls: int = 0
+    resumed: int = 0
+    failed: int = 0
+
+
+class PipelineCheckpoint:
+    """
+    Resultados já obtidos em uma execução do pipeline, gravados em disco a cada etapa concluída.
+
+    Se o worker cair no meio da análise, a próxima entrega da mesma mensagem retoma do ponto
+    em que parou em vez de reenviar ao LLM o que já foi analisado. Cada resultado é acrescentado
+    como uma linha JSON ao arquivo, que é reconstruído na carga; a escrita custa apenas o
+    próprio resultado, qualquer que seja o tamanho da execução.
+    """
+
+    def __init__(self, run_id: str, directory: Optional[str] = None, ttl: Optional[float] = None):
+        self.directory = directory or Environment.get("PIPELINE_CHECKPOINT_DIR") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-checkpoints"
+        )
+        self.ttl = ttl if ttl is not None else float(
+            Environment.get("PIPELINE_CHECKPOINT_TTL_SECONDS") or DEFAULT_CHECKPOINT_TTL_SECONDS
+        )
+        self.path = os.path.join(self.directory, f"{run_id}.jsonl")
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._purge_stale()
+        self._results: Dict[str, str] = self._load()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._results.get(key)
+
+    def put(self, key: str, result: str):
+        # Serializado fora do lock; sob o lock, apenas o acréscimo de uma linha
+        line = json.dumps({"key": key, "result": result}) + "\n"
+        with self._lock:
+            self._results[key] = result
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def clear(self):
+        with self._lock:
+            self._results = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _load(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        results: Dict[str, str] = {}
+        try:
+            with open(self.path, 'rb+') as f:
+                data = f.read()
+                # Linha final incompleta de uma escrita interrompida pela queda do worker: descartada,
+                # para que o próximo resultado não seja acrescentado a ela
+                complete = data.rfind(b"\n") + 1
+                if complete < len(data):
+                    f.truncate(complete)
+            for line in data[:complete].splitlines():
+                entry = json.loads(line)
+                results[entry["key"]] = entry["result"]
+        except Exception as e:
+            logger.warning(f"[ANALYSIS-PIPELINE] Checkpoint ilegível ignorado ({self.path}): {str(e)}")
+            os.remove(self.path)
+            return {}
+        logger.info(f"[ANALYSIS-PIPELINE] Retomando execução com {len(results)} resultado(s) do checkpoint")
+        return results
+
+    def _purge_stale(self):
+        limit = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class AnalysisPipeline:
+    """
+    Análise hierárquica de um repositório inteiro.
+
+    - map: cada arquivo (ou trecho de arquivo grande) é analisado em paralelo
+    - combine: as análises de cada módulo (diretório) são resumidas
+    - reduce: os resumos dos módulos viram o relatório final do repositório
+
+    A concorrência é limitada por LLM_MAX_CONCURRENCY e cada resultado intermediário é
+    gravado no checkpoint da execução. Com um AnalysisStore, arquivos cujo conteúdo não
+    mudou desde a última execução reaproveitam a análise anterior em vez de ir ao LLM.
+    """
+
+    def __init__(self, compiled_prompt: CompiledPrompt, checkpoint: PipelineCheckpoint,
+                 packer: Optional[TokenPacker] = None, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, group_depth: Optional[int] = None,
+                 store: Optional[AnalysisStore] = None, repository: Optional[str] = None):
+        self.compiled_prompt = compiled_prompt
+        self.checkpoint = checkpoint
+        self.store = store if repository else None
+        self.repository = repository
+        self.packer = packer or TokenPacker()
+        self.max_workers = max_workers or int(Environment.get("LLM_MAX_CONCURRENCY") or 4)
+        self.timeout = timeout if timeout is not None else float(Environment.get("LLM_FILE_TIMEOUT") or 180)
+        self.group_depth = group_depth if group_depth is not None else int(
+            Environment.get("PIPELINE_GROUP_DEPTH") or DEFAULT_GROUP_DEPTH
+        )
+        self.report = PipelineReport()
+        self._report_lock = threading.Lock()
+
+    @staticmethod
+    def run_id(repository: str, revision: Optional[str], prompt_key: str) -> str:
+        """
+        Identificador estável de uma execução: mesmo repositório, revisão e prompt retomam o mesmo checkpoint.
+        """
+        payload = f"{repository}\0{revision or ''}\0{prompt_key}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def group(path: str, depth: int) -> str:
+        """
+        Módulo de um arquivo: seus primeiros depth diretórios (ROOT_GROUP para arquivos na raiz).
+        """
+        directories = path.split('/')[:-1]
+        if not directories or depth <= 0:
+            return ROOT_GROUP
+        return '/'.join(directories[:depth])
+
+    def run(self, records: Iterable[FileRecord]) -> Optional[str]:
+        """
+        Executa as três etapas e remove o checkpoint ao final.
+
+        Returns:
+            Optional[str]: Relatório do repositório (None se não houver código)
+        """
+        units: List[PackUnit] = []
+        shas: Dict[str, str] = {}
+        for record in records:
+            if record.text.strip():
+                self.report.files += 1
+                shas[record.path] = SourceFiles.blob_sha(record.text.encode('utf-8'))
+                units.extend(self.packer.split(record.path, record.text, record.language))
+
+        if not units:
+            return None
+
+        self.report.units = len(units)
+        unit_results = self._map(units, shas)
+
+        groups: Dict[str, List[str]] = {}
+        for unit, result in zip(units, unit_results):
+            groups.setdefault(AnalysisPipeline.group(unit.path, self.group_depth), []).append(
+                f"### Arquivo: {unit.label}\n\n{result}"
+            )
+        self.report.groups = len(groups)
+
+        names = list(groups)
+        outcomes = Concurrency.map_ordered(
+            lambda name: self._combine(name, groups[name]), names, self.max_workers
+        )
+        AnalysisPipeline._raise_errors(outcomes, every=False)
+        summaries = dict(zip(names, outcomes))
+
+        if len(summaries) == 1:
+            result = summaries[names[0]]
+        else:
+            sections = [f"## Módulo: {name}\n\n{summary}" for name, summary in summaries.items()]
+            report = self._summarize(sections, REDUCE_PROMPT)
+            result = report + "\n\n---\n\n" + "\n\n".join(sections)
+
+        if self.store:
+            result = (
+                f"_{self.report.files} arquivo(s) analisado(s), {self.report.reused_files} reaproveitado(s) "
+                f"de execuções anteriores por não terem mudado._\n\n" + result
+            )
+
+        logger.info(f"[ANALYSIS-PIPELINE] Execução concluída: {self.report.model_dump()}")
+        self.checkpoint.clear()
+        return result
+
+    def _map(self, units: List[PackUnit], shas: Dict[str, str]) -> List[str]:
+        # Arquivos sem alteração desde a última execução: reaproveitar a análise de todos os seus trechos
+        stored: Dict[str, List[str]] = {}
+        if self.store:
+            parts: Dict[str, int] = {}
+            for unit in units:
+                parts[unit.path] = parts.get(unit.path, 0) + 1
+            for path, count in parts.items():
+                results = self.store.get(self.repository, path, shas[path], self.compiled_prompt.key)
+                # Se o orçamento de tokens mudou, o arquivo pode ter sido dividido de outra forma
+                if results is not None and len(results) == count:
+                    stored[path] = results
+            self.report.reused_files = len(stored)
+            logger.info(f"[ANALYSIS-PIPELINE] {len(stored)} de {self.report.files} arquivo(s) reaproveitado(s) do AnalysisStore")
+
+        pending = [unit for unit in units if unit.path not in stored]
+
+        # Trechos pequenos vão juntos em lotes dentro do orçamento, uma requisição por lote
+        batches = self.packer.pack(pending).batches if pending else []
+        self.report.batches = len(batches)
+        batch_outcomes = Concurrency.map_ordered(self._analyze_batch, batches, self.max_workers, self.timeout)
+
+        by_unit: Dict[int, object] = {}
+        for batch, outcome in zip(batches, batch_outcomes):
+            for i, unit in enumerate(batch.units):
+                by_unit[id(unit)] = outcome if isinstance(outcome, Exception) else outcome[i]
+        outcomes = [by_unit[id(unit)] for unit in pending]
+        AnalysisPipeline._raise_errors(outcomes, every=True)
+
+        analyzed: Dict[str, List[str]] = {}
+        failed = set()
+        for unit, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"[ANALYSIS-PIPELINE] Falha na análise de {unit.label}: {str(outcome)}")
+                self.report.failed += 1
+                failed.add(unit.path)
+                outcome = f"_Não foi possível analisar este trecho: {str(outcome)}_"
+            analyzed.setdefault(unit.path, []).append(outcome)
+
+        if self.store:
+            for path, results in analyzed.items():
+                if path not in failed:
+                    self.store.put(self.repository, path, shas[path], self.compiled_prompt.key, results)
+
+        results = []
+        for path in dict.fromkeys(unit.path for unit in units):
+            results.extend(stored.get(path) or analyzed[path])
+        return results
+
+    def _analyze_unit(self, unit: PackUnit) -> str:
+        key = self._key("map", unit.label, unit.text)
+        return self._cached(key, lambda: LLMGateway.analyze_code(
+            code=unit.text,
+            prompt=self.compiled_prompt.for_file(unit.label),
+            shared_prefix=self.compiled_prompt.prefix
+        ))
+
+    def _analyze_batch(self, batch: Batch) -> List:
+        """
+        Analisa os trechos de um lote em uma única requisição e separa a resposta por trecho.
+
+        Se a requisição falhar ou a resposta não trouxer a seção de algum trecho, cada trecho
+        é analisado sozinho, para que a falha de um não descarte os demais.
+
+        Returns:
+            List: Análise (ou exceção) de cada trecho, na ordem do lote
+        """
+        if len(batch.units) == 1:
+            return [self._analyze_unit(batch.units[0])]
+
+        labels = [unit.label for unit in batch.units]
+        key = self._key("batch", *(f"{unit.label}\0{unit.text}" for unit in batch.units))
+        try:
+            response = self._cached(key, lambda: LLMGateway.analyze_code(
+                code=batch.render(),
+                prompt=self.compiled_prompt.for_batch(labels),
+                shared_prefix=self.compiled_prompt.prefix
+            ))
+            sections = AnalysisPipeline.split_batch(labels, response)
+        except LLMQuotaExceededError:
+            raise
+        except Exception as e:
+            logger.warning(f"[ANALYSIS-PIPELINE] Falha no lote {batch.index}: {str(e)}; analisando um a um")
+            sections = None
+        else:
+            if sections is None:
+                logger.warning(f"[ANALYSIS-PIPELINE] Resposta do lote {batch.index} sem as seções de todos os arquivos; analisando um a um")
+
+        if sections is not None:
+            return sections
+
+        outcomes = []
+        for unit in batch.units:
+            try:
+                outcomes.append(self._analyze_unit(unit))
+            except LLMQuotaExceededError:
+                raise
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+    @staticmethod
+    def split_batch(labels: List[str], response: str) -> Optional[List[str]]:
+        """
+        Separa a resposta de um lote nas seções de cada arquivo, na ordem de labels.
+
+        Returns:
+            Optional[List[str]]: Seção de cada arquivo, ou None se faltar alguma
+        """
+        sections: Dict[str, List[str]] = {}
+        current: Optional[List[str]] = None
+        for line in response.splitlines():
+            header = BATCH_SECTION.match(line)
+            label = header.group(1).strip().strip('`').strip() if header else None
+            if label in labels and label not in sections:
+                current = sections[label] = []
+            elif current is not None:
+                current.append(line)
+
+        if len(sections) != len(labels):
+            return None
+        return ["\n".join(sections[label]).strip() for label in labels]
+
+    def _combine(self, group: str, analyses: List[str]) -> str:
+        if len(analyses) == 1:
+            return analyses[0]
+        return self._summarize(analyses, COMBINE_PROMPT.format(group=group))
+
+    def _summarize(self, texts: List[str], prompt: str) -> str:
+        """
+        Resume texts com o prompt informado, em níveis, de forma que cada requisição caiba no orçamento.
+        """
+        while True:
+            chunks = self._chunks(texts)
+            if len(chunks) == 1:
+                return self._call(prompt, chunks[0])
+
+            logger.info(f"[ANALYSIS-PIPELINE] Resumindo {len(texts)} texto(s) em {len(chunks)} parte(s)")
+            outcomes = Concurrency.map_ordered(lambda chunk: self._call(prompt, chunk), chunks, self.max_workers)
+            AnalysisPipeline._raise_errors(outcomes, every=False)
+            texts = outcomes
+
+    def _chunks(self, texts: List[str]) -> List[str]:
+        # Pelo menos dois textos por parte, para que cada nível reduza a quantidade de textos
+        chunks: List[List[str]] = []
+        tokens = 0
+        for text in texts:
+            text_tokens = TokenCounter.count(text)
+            if chunks and (len(chunks[-1]) < 2 or tokens + text_tokens <= self.packer.budget):
+                chunks[-1].append(text)
+                tokens += text_tokens
+            else:
+                chunks.append([text])
+                tokens = text_tokens
+        return ["\n\n".join(chunk) for chunk in chunks]
+
+    def _call(self, prompt: str, text: str) -> str:
+        return self._cached(self._key("summary", prompt, text), lambda: LLMGateway.analyze_code(code=text, prompt=prompt))
+
+    def _cached(self, key: str, fn: Callable[[], str]) -> str:
+        result = self.checkpoint.get(key)
+        if result is not None:
+            with self._report_lock:
+                self.report.resumed += 1
+            return result
+
+        result = fn()
+        with self._report_lock:
+            self.report.llm_calls += 1
+        self.checkpoint.put(key, result)
+        return result
+
+    def _key(self, stage: str, *parts: str) -> str:
+        payload = "\0".join((stage, self.compiled_prompt.key) + parts)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _raise_errors(outcomes: List, every: bool):
+        errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        # Cota esgotada devolve o job para a fila; o checkpoint preserva o que já foi feito
+        quota_errors = [error for error in errors if isinstance(error, LLMQuotaExceededError)]
+        if quota_errors:
+            raise quota_errors[0]
+        if errors and (not every or len(errors) == len(outcomes)):
+            raise errors[0]
@@ -0,0 +1,125 @@
+import os
+import time
+import json
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Padrão: resultados mantidos por 30 dias sem serem reaproveitados
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+
+class AnalysisStore:
+    """
+    Resultados da análise de cada arquivo em execuções de projeto inteiro, chaveados por
+    (repositório, caminho, SHA do blob, chave do prompt compilado).
+
+    A chave do prompt inclui a versão do template, então mudar o template ou o prompt
+    do usuário faz os arquivos serem analisados de novo. Guarda apenas o resultado mais
+    recente de cada arquivo.
+    """
+
+    _default: Optional["AnalysisStore"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = path or Environment.get("ANALYSIS_STORE_PATH") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-analysis-store.sqlite3"
+        )
+        self.ttl = ttl if ttl is not None else float(
+            Environment.get("ANALYSIS_STORE_TTL_SECONDS") or DEFAULT_TTL_SECONDS
+        )
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def default(cls) -> "AnalysisStore":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("ANALYSIS_STORE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    def get(self, repository: str, path: str, blob_sha: str, template_key: str) -> Optional[List[str]]:
+        """
+        Busca a análise de um arquivo.
+
+        Returns:
+            Optional[List[str]]: Análise de cada trecho do arquivo, ou None se o conteúdo ou o prompt mudou
+        """
+        try:
+            with self._lock:
+                connection = self._db()
+                row = connection.execute(
+                    "SELECT results FROM file_analysis WHERE repository = ? AND path = ? AND blob_sha = ? AND template_key = ?",
+                    (repository, path, blob_sha, template_key)
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE file_analysis SET used_at = ? WHERE repository = ? AND path = ? AND template_key = ?",
+                        (time.time(), repository, path, template_key)
+                    )
+                    connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[ANALYSIS-STORE] Erro ao consultar resultado de {path}: {str(e)}")
+            return None
+
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, repository: str, path: str, blob_sha: str, template_key: str, results: List[str]) -> None:
+        """
+        Grava a análise de um arquivo, substituindo a de versões anteriores do mesmo arquivo.
+        """
+        try:
+            with self._lock:
+                connection = self._db()
+                connection.execute(
+                    "INSERT OR REPLACE INTO file_analysis (repository, path, template_key, blob_sha, results, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (repository, path, template_key, blob_sha, json.dumps(results), time.time())
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[ANALYSIS-STORE] Erro ao gravar resultado de {path}: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        try:
+            with self._lock:
+                row = self._db().execute("SELECT COUNT(*), COUNT(DISTINCT repository) FROM file_analysis").fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"[ANALYSIS-STORE] Erro ao consultar estatísticas: {str(e)}")
+            return {}
+        return {"files": row[0], "repositories": row[1]}
+
+    def _db(self) -> sqlite3.Connection:
+        # Chamado com self._lock adquirido
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS file_analysis ("
+                "repository TEXT NOT NULL, path TEXT NOT NULL, template_key TEXT NOT NULL, "
+                "blob_sha TEXT NOT NULL, results TEXT NOT NULL, used_at REAL NOT NULL, "
+                "PRIMARY KEY (repository, path, template_key))"
+            )
+            # Descartar resultados que não foram reaproveitados dentro do TTL
+            removed = connection.execute(
+                "DELETE FROM file_analysis WHERE used_at <= ?", (time.time() - self.ttl,)
+            ).rowcount
+            connection.commit()
+            if removed:
+                logger.info(f"[ANALYSIS-STORE] {removed} resultados antigos removidos")
+            self._connection = connection
+        return self._connection
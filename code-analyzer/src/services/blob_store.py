@@ -0,0 +1,265 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão: 1 GiB em disco e 64 MiB em memória
+DEFAULT_MAX_BYTES = 1024 ** 3
+DEFAULT_MEMORY_BYTES = 64 * 1024 ** 2
+
+
+class BlobRecord(BaseModel):
+    sha: str
+    size: int
+    language: Optional[str] = None
+    binary: bool = False
+    text: Optional[str] = None
+
+
+class BlobStore:
+    """
+    Armazenamento local endereçado por conteúdo (SHA do blob git), compartilhado entre jobs.
+
+    Guarda o texto decodificado e os metadados de cada blob em duas camadas: um LRU em
+    memória e um diretório em disco, ambos limitados por tamanho.
+    """
+
+    _default: Optional["BlobStore"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None,
+                 memory_bytes: Optional[int] = None):
+        self.root = root or Environment.get("BLOB_STORE_DIR") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-blobs"
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            Environment.get("BLOB_STORE_MAX_BYTES") or DEFAULT_MAX_BYTES
+        )
+        self.memory_bytes = memory_bytes if memory_bytes is not None else int(
+            Environment.get("BLOB_STORE_MEMORY_BYTES") or DEFAULT_MEMORY_BYTES
+        )
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, BlobRecord]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def default(cls) -> "BlobStore":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("BLOB_STORE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    def get(self, sha: str) -> Optional[BlobRecord]:
+        """
+        Busca um blob pelo SHA, primeiro em memória e depois em disco.
+
+        Args:
+            sha: SHA-1 do blob git
+
+        Returns:
+            Optional[BlobRecord]: Registro do blob ou None se não estiver armazenado
+        """
+        with self._lock:
+            record = self._memory.get(sha)
+            if record is not None:
+                self._memory.move_to_end(sha)
+                self.hits += 1
+                return record
+
+        record = self._read_disk(sha)
+
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(record)
+
+        return record
+
+    def put(self, data: bytes, path: str, sha: Optional[str] = None) -> BlobRecord:
+        """
+        Armazena um blob a partir do conteúdo bruto.
+
+        Args:
+            data: Conteúdo do arquivo
+            path: Caminho do arquivo, usado para detectar a linguagem
+            sha: SHA do blob, se já conhecido (calculado a partir de data caso contrário)
+
+        Returns:
+            BlobRecord: Registro armazenado
+        """
+        binary = SourceFiles.is_binary(data)
+        text = None
+
+        if not binary:
+            try:
+                text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                binary = True
+
+        record = BlobRecord(
+            sha=sha or SourceFiles.blob_sha(data),
+            size=len(data),
+            language=SourceFiles.language(path),
+            binary=binary,
+            text=text
+        )
+
+        self._write_disk(record)
+
+        with self._lock:
+            self._remember(record)
+
+        return record
+
+    def get_or_load(self, sha: Optional[str], path: str, loader: Callable[[], bytes]) -> BlobRecord:
+        """
+        Retorna o blob armazenado ou carrega o conteúdo com loader e o armazena.
+
+        Args:
+            sha: SHA do blob, se conhecido
+            path: Caminho do arquivo
+            loader: Função que lê o conteúdo bruto (disco ou rede)
+
+        Returns:
+            BlobRecord: Registro do blob
+        """
+        if sha:
+            record = self.get(sha)
+            if record is not None:
+                return record
+
+        return self.put(loader(), path, sha)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size or 0,
+            }
+
+    def _remember(self, record: BlobRecord):
+        if record.sha in self._memory:
+            self._memory.move_to_end(record.sha)
+            return
+
+        self._memory[record.sha] = record
+        self._memory_size += record.size
+
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= evicted.size
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, sha[:2], f"{sha[2:]}.json")
+
+    def _read_disk(self, sha: str) -> Optional[BlobRecord]:
+        path = self._blob_path(sha)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                record = BlobRecord(**json.load(handle))
+            # Atualizar o mtime mantém a ordem de uso para o LRU em disco
+            os.utime(path, None)
+            return record
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[BLOB-STORE] Registro inválido para {sha}, ignorando: {str(e)}")
+            return None
+
+    def _write_disk(self, record: BlobRecord):
+        path = self._blob_path(record.sha)
+
+        if os.path.exists(path):
+            os.utime(path, None)
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'w', encoding='utf-8') as temp_file:
+                temp_file.write(record.model_dump_json())
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"[BLOB-STORE] Erro ao gravar blob {record.sha}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = self._scan_disk_size()
+            else:
+                self._disk_size += os.path.getsize(path)
+            over_budget = self._disk_size > self.max_bytes
+
+        if over_budget:
+            self._evict_disk()
+
+    def _scan_disk_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.root):
+            for file in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file))
+                except OSError:
+                    continue
+        return total
+
+    def _evict_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.root):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                except OSError:
+                    continue
+
+        total = sum(size for _, size, _ in entries)
+        # Remover até 90% do orçamento para não disparar a limpeza a cada escrita
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                continue
+
+        with self._lock:
+            self._disk_size = total
+            self.evictions += evicted
+
+        logger.info(f"[BLOB-STORE] {evicted} blobs removidos pelo LRU em disco ({total} bytes restantes)")
@@ -1,9 +1,24 @@
 import os
 import logging
+import itertools
 import git
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from ..adapters.dtos import UserPreferDTO
-from ..domain import LLMGateway, ModelEmbeddings
+from ..domain import LLMGateway, LLMQuotaExceededError, ContextCache
+from .file_source import FileSource, LocalFileSource
+from .blob_store import BlobStore
+from .file_collector import FileCollector, FileRecord
+from .token_packer import TokenPacker
+from .diff_scoper import DiffScoper
+from .file_set import FileSet, SourceFile
+from .prompt_compiler import PromptCompiler
+from .analysis_pipeline import AnalysisPipeline, PipelineCheckpoint
+from .analysis_store import AnalysisStore
+from .symbol_index import SymbolIndex
+from .context_enricher import ContextEnricher
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+from ..utils.concurrency import Concurrency
 
 logger = logging.getLogger(__name__)
 
@@ -23,31 +38,41 @@ class CodeAnalyzer:
         try:
             logger.info(f"[CODE-ANALYZER] Iniciando análise do repositório em: {repo_path}")
             
-            # Inicializar LLM e embeddings
-            llm = LLMGateway()
-            embeddings = ModelEmbeddings()
-            
-            # Coletar todos os arquivos relevantes
-            all_code = ""
-            for root, _, files in os.walk(repo_path):
-                for file in files:
-                    if file.endswith(('.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs')):
-                        file_path = os.path.join(root, file)
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                all_code += f"\n# File: {os.path.relpath(file_path, repo_path)}\n{content}\n"
-                        except Exception as e:
-                            logger.warning(f"[CODE-ANALYZER] Erro ao ler arquivo {file_path}: {str(e)}")
-            
-            if not all_code:
+            # Coletar os arquivos relevantes sob demanda, respeitando os limites de bytes do coletor
+            source = LocalFileSource(repo_path)
+            collector = FileCollector(repo_path)
+            
+            # Execuções da mesma revisão com o mesmo prompt retomam o checkpoint da anterior
+            compiled_prompt = PromptCompiler.compile(user_prefer.prompt, user_prefer.language)
+            repository_id = CodeAnalyzer._repository_id(user_prefer)
+            run_id = AnalysisPipeline.run_id(repository_id, CodeAnalyzer._head_revision(repo_path), compiled_prompt.key)
+            
+            # map (arquivos em paralelo) -> combine (por módulo) -> reduce (relatório do repositório);
+            # arquivos sem alteração desde a execução anterior reaproveitam a análise gravada
+            pipeline = AnalysisPipeline(
+                compiled_prompt,
+                PipelineCheckpoint(run_id),
+                store=AnalysisStore.default() if AnalysisStore.enabled() else None,
+                repository=repository_id
+            )
+            records = collector.collect(lambda path: CodeAnalyzer._read_text(source, path))
+            
+            # O índice de símbolos usado para enriquecer as análises de PR é atualizado durante a coleta
+            symbol_index = SymbolIndex.default() if ContextEnricher.enabled() else None
+            if symbol_index is not None:
+                records = CodeAnalyzer._indexed(symbol_index, repository_id, records)
+            
+            analysis_result = pipeline.run(records)
+            logger.info(f"[CODE-ANALYZER] Coleta concluída: {collector.stats}")
+            
+            if symbol_index is not None:
+                removed = symbol_index.prune(repository_id, lambda path: os.path.isfile(os.path.join(repo_path, path)))
+                logger.info(f"[CODE-ANALYZER] Índice de símbolos: {symbol_index.stats(repository_id)}, {removed} arquivo(s) removido(s)")
+            
+            if analysis_result is None:
                 logger.warning("[CODE-ANALYZER] Nenhum arquivo de código encontrado no repositório")
                 return "Nenhum arquivo de código fonte encontrado para análise."
             
-            # Analisar o código coletado
-            logger.info(f"[CODE-ANALYZER] Analisando {len(all_code)} caracteres de código")
-            analysis_result = llm.analyze_code(all_code)
-            
             return analysis_result
             
         except Exception as e:
@@ -55,13 +80,16 @@ class CodeAnalyzer:
             raise
 
     @staticmethod
-    def analyze_pr(repo_path: str, user_prefer: UserPreferDTO) -> str:
+    def analyze_pr(repo_path: Optional[str], user_prefer: UserPreferDTO, source: Optional[FileSource] = None,
+                   file_set: Optional[FileSet] = None) -> str:
         """
         Analisa apenas os arquivos modificados no PR.
         
         Args:
-            repo_path: Caminho do repositório
+            repo_path: Caminho do repositório (None quando os arquivos vêm da API do provedor)
             user_prefer: Preferências do usuário
+            source: Origem dos arquivos (padrão: cópia local em repo_path)
+            file_set: Conjunto preenchido com os arquivos analisados (opcional, para quem chama reutilizá-lo)
             
         Returns:
             str: Resultado da análise
@@ -69,8 +97,11 @@ class CodeAnalyzer:
         try:
             logger.info(f"[CODE-ANALYZER] Iniciando análise do PR #{user_prefer.repository.pull_request_number}")
             
+            if source is None:
+                source = LocalFileSource(repo_path)
+            
             # Obter lista de arquivos modificados no PR
-            modified_files = CodeAnalyzer._get_pr_modified_files(repo_path, user_prefer)
+            modified_files = CodeAnalyzer._get_pr_modified_files(repo_path, user_prefer, source)
             
             if not modified_files:
                 logger.warning("[CODE-ANALYZER] Nenhum arquivo modificado encontrado no PR")
@@ -80,10 +111,7 @@ class CodeAnalyzer:
             code_files = []
             for file_path in modified_files:
                 # Verificar extensões de código-fonte comuns
-                if any(file_path.endswith(ext) for ext in 
-                      ('.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.go', 
-                       '.rb', '.c', '.cpp', '.h', '.hpp', '.cs', '.php', 
-                       '.swift', '.kt', '.rs', '.scala', '.sh', '.bash')):
+                if SourceFiles.is_source(file_path):
                     code_files.append(file_path)
                 else:
                     logger.info(f"[CODE-ANALYZER] Ignorando arquivo não-código: {file_path}")
@@ -93,201 +121,55 @@ class CodeAnalyzer:
                 logger.warning("[CODE-ANALYZER] Nenhum arquivo de código encontrado, usando todos os arquivos modificados")
                 code_files = modified_files
             
-            # Limitar quantidade de arquivos para não estourar limites de tokens
-            if len(code_files) > 20:
-                logger.warning(f"[CODE-ANALYZER] Muitos arquivos ({len(code_files)}), limitando a 20")
-                code_files = code_files[:20]
+            # Arquivos maiores que o orçamento de uma requisição são divididos em limites de funções/classes
+            packer = TokenPacker()
+            file_units = {}
             
-            # Concatenar conteúdo dos arquivos modificados
-            all_code = ""
-            processed_files = []
+            # No modo por diff, apenas as regiões alteradas (com contexto) vão para o prompt
+            scoper = DiffScoper() if DiffScoper.enabled() else None
             
-            for file_path in code_files:
-                abs_path = os.path.join(repo_path, file_path)
-                if not os.path.exists(abs_path):
-                    logger.warning(f"[CODE-ANALYZER] Arquivo não encontrado: {file_path}")
-                    continue
-                    
-                try:
-                    with open(abs_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        # Ignorar arquivos vazios
-                        if not file_content.strip():
-                            logger.info(f"[CODE-ANALYZER] Arquivo vazio ignorado: {file_path}")
-                            continue
-                        # Adicionar o conteúdo com cabeçalho
-                        all_code += f"\n\n# Arquivo: {file_path}\n{file_content}"
-                        processed_files.append(file_path)
-                except Exception as e:
-                    logger.warning(f"[CODE-ANALYZER] Erro ao ler arquivo {file_path}: {str(e)}")
-            
-            if not all_code.strip():
+            # Ler cada arquivo uma única vez; o FileSet é compartilhado com o prompt e a contagem de quota
+            if file_set is None:
+                file_set = FileSet()
+            file_set.load(source, code_files, CodeAnalyzer._read_text)
+            processed_files = file_set.paths
+            
+            if not processed_files:
                 logger.warning("[CODE-ANALYZER] Nenhum conteúdo de código encontrado nos arquivos modificados")
                 return "Não foi encontrado conteúdo de código válido nos arquivos modificados no PR."
             
-            logger.info(f"[CODE-ANALYZER] Analisando {len(all_code)} caracteres de código de {len(processed_files)} arquivos")
+            for source_file in file_set:
+                code = CodeAnalyzer._scoped_code(scoper, repo_path, user_prefer, source_file)
+                tokens = source_file.tokens if code is source_file.content else None
+                file_units[source_file.path] = packer.split(source_file.path, code, source_file.language, tokens)
+            
+            logger.info(f"[CODE-ANALYZER] Analisando {file_set.total_bytes} bytes ({file_set.total_tokens} tokens) de código de {len(file_set)} arquivos")
             logger.info(f"[CODE-ANALYZER] Arquivos processados: {', '.join(processed_files)}")
+            logger.info(
+                f"[CODE-ANALYZER] Plano: {sum(len(u) for u in file_units.values())} requisição(ões), "
+                f"{sum(unit.tokens for units in file_units.values() for unit in units)} tokens"
+            )
             
-            def format_prompt(file_path: str, code: str, user_prefer: UserPreferDTO) -> str:
-                # Usar o prompt personalizado que já contém os tipos de análise
-                base_prompt = user_prefer.prompt
-                
-                # Extrair os tipos de análise do prompt de forma mais precisa
-                analysis_types = []
-                logger.info("[CODE-ANALYZER] Extraindo tipos de análise do prompt")
-                
-                # Verificar se o prompt contém a frase "analyze this code for:"
-                if "analyze this code for:" in base_prompt.lower():
-                    # Extrair a parte após "analyze this code for:"
-                    analysis_part = base_prompt.lower().split("analyze this code for:")[1]
-                    # Extrair até o próximo ponto ou final da string
-                    if "." in analysis_part:
-                        analysis_part = analysis_part.split(".")[0]
-                    
-                    logger.info(f"[CODE-ANALYZER] Parte do prompt com tipos de análise: '{analysis_part}'")
-                    
-                    # Mapeamento de termos específicos para tipos de análise
-                    analysis_mappings = {
-                        "code quality": "code quality",
-                        "quality": "code quality",
-                        "security": "security issues",
-                        "security issues": "security issues",
-                        "performance": "performance optimizations",
-                        "performance optimizations": "performance optimizations",
-                        "bugs": "bugs and logical errors",
-                        "logical errors": "bugs and logical errors",
-                        "code smells": "code smells",
-                        "vulnerabilities": "security vulnerabilities",
-                        "owasp": "OWASP principles",
-                        "owasp principles": "OWASP principles",
-                        "solid": "SOLID principles",
-                        "solid principles": "SOLID principles",
-                        "componentization": "componentization",
-                        "componentizacao": "componentization",
-                        "componentização": "componentization",
-                        "optimization": "optimization",
-                        "otimizacao": "optimization",
-                        "otimização": "optimization",
-                        "big o": "algorithmic complexity",
-                        "algorithmic complexity": "algorithmic complexity",
-                        "duplication": "duplication",
-                        "duplicidade": "duplication",
-                        "duplicação": "duplication"
-                    }
-                    
-                    # Verificar cada termo no mapeamento
-                    for term, analysis_type in analysis_mappings.items():
-                        if term in analysis_part:
-                            analysis_types.append(analysis_type)
-                            logger.info(f"[CODE-ANALYZER] Detectado tipo de análise: {analysis_type} (de '{term}')")
+            # Instruções e template resolvidos uma vez por job; cada requisição acrescenta apenas o arquivo e o código
+            compiled_prompt = PromptCompiler.compile(user_prefer.prompt, user_prefer.language)
+            
+            # Definições de outros arquivos relacionadas aos arquivos alterados, do índice montado
+            # pelas análises de projeto inteiro. Com o cache de contexto, as de todo o PR formam uma
+            # seção única no prefixo compartilhado; sem ele, cada arquivo recebe só as suas, depois do prefixo
+            related_context = {}
+            if ContextEnricher.enabled():
+                enricher = ContextEnricher(CodeAnalyzer._repository_id(user_prefer))
+                files = [
+                    (source_file.path, "\n".join(unit.text for unit in file_units[source_file.path]),
+                     source_file.language, source_file.content)
+                    for source_file in file_set
+                ]
+                if ContextCache.available():
+                    compiled_prompt = compiled_prompt.with_context(enricher.shared_context(files, processed_files))
                 else:
-                    # Fallback: verificar termos comuns no prompt inteiro
-                    logger.info("[CODE-ANALYZER] Não encontrou 'analyze this code for:', verificando termos comuns")
-                    
-                    # Mapeamento de termos comuns para tipos de análise
-                    fallback_keywords = {
-                        "quality": "code quality",
-                        "qualidade": "code quality",
-                        "security": "security issues",
-                        "seguranca": "security issues",
-                        "performance": "performance optimizations",
-                        "desempenho": "performance optimizations",
-                        "bugs": "bugs and logical errors",
-                        "erros": "bugs and logical errors",
-                        "code smell": "code smells",
-                        "vulnerabilit": "security vulnerabilities",
-                        "owasp": "OWASP principles",
-                        "solid": "SOLID principles",
-                        "componentizacao": "componentization",
-                        "componentização": "componentization",
-                        "otimizacao": "optimization",
-                        "otimização": "optimization",
-                        "big o": "algorithmic complexity",
-                        "complexidade": "algorithmic complexity",
-                        "duplicidade": "duplication",
-                        "duplicação": "duplication"
-                    }
-                    
-                    # Extrair tipos de análise do prompt completo
-                    for keyword, analysis_type in fallback_keywords.items():
-                        if keyword in base_prompt.lower():
-                            analysis_types.append(analysis_type)
-                            logger.info(f"[CODE-ANALYZER] Detectado tipo de análise (fallback): {analysis_type}")
-                
-                # Remover duplicatas
-                analysis_types = list(set(analysis_types))
-                
-                # Log dos tipos de análise detectados
-                logger.info(f"[CODE-ANALYZER] Tipos de análise detectados: {', '.join(analysis_types)}")
-                
-                # Criar um template dinâmico baseado nos tipos de análise
-                template_sections = []
-                
-                # Mapeamento específico para os tipos de análise do sistema
-                template_mapping = {
-                    # Tipos específicos do sistema
-                    "Princípios SOLID": "Princípios SOLID:\n  [Avalie se o código segue os princípios SOLID (Single Responsibility, Open-Closed, Liskov Substitution, Interface Segregation, Dependency Inversion) e sugira melhorias.]",
-                    "Código Limpo": "Código Limpo:\n  [Avalie a legibilidade, simplicidade e organização do código. Sugira melhorias para tornar o código mais limpo e fácil de manter.]",
-                    "Code Smells": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
-                    "Vulnerabilidades (OWASP)": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
-                    "Componentização": "Componentização:\n  [Avalie a estrutura de componentes do código, a separação de responsabilidades e a reutilização. Sugira melhorias na organização dos componentes.]",
-                    "Otimização (BIG O)": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
-                    "Duplicação": "Duplicação:\n  [Identifique código duplicado ou repetitivo e sugira refatorações para melhorar a reutilização e manutenibilidade.]",
-                    "Boas práticas da Linguagem": "Boas práticas da Linguagem:\n  [Avalie se o código segue as boas práticas e convenções da linguagem de programação utilizada. Sugira melhorias específicas da linguagem.]",
-                    "Boas práticas do Framework": "Boas práticas do Framework:\n  [Avalie se o código segue as boas práticas e padrões recomendados do framework utilizado. Sugira melhorias específicas do framework.]",
-                    
-                    # Mapeamentos alternativos para compatibilidade
-                    "code quality": "Código Limpo:\n  [Avalie a legibilidade, simplicidade e organização do código. Sugira melhorias para tornar o código mais limpo e fácil de manter.]",
-                    "security issues": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
-                    "performance optimizations": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
-                    "bugs and logical errors": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
-                    "code smells": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
-                    "security vulnerabilities": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
-                    "OWASP principles": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
-                    "SOLID principles": "Princípios SOLID:\n  [Avalie se o código segue os princípios SOLID (Single Responsibility, Open-Closed, Liskov Substitution, Interface Segregation, Dependency Inversion) e sugira melhorias.]",
-                    "componentization": "Componentização:\n  [Avalie a estrutura de componentes do código, a separação de responsabilidades e a reutilização. Sugira melhorias na organização dos componentes.]",
-                    "optimization": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
-                    "algorithmic complexity": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
-                    "duplication": "Duplicação:\n  [Identifique código duplicado ou repetitivo e sugira refatorações para melhorar a reutilização e manutenibilidade.]",
-                    "language best practices": "Boas práticas da Linguagem:\n  [Avalie se o código segue as boas práticas e convenções da linguagem de programação utilizada. Sugira melhorias específicas da linguagem.]",
-                    "framework best practices": "Boas práticas do Framework:\n  [Avalie se o código segue as boas práticas e padrões recomendados do framework utilizado. Sugira melhorias específicas do framework.]"
-                }
-                
-                # Para qualquer tipo de análise não mapeado, criar uma seção genérica
-                for analysis_type in analysis_types:
-                    if analysis_type in template_mapping:
-                        template_sections.append(template_mapping[analysis_type])
-                    else:
-                        # Criar uma seção genérica para tipos não mapeados
-                        # Capitalizar a primeira letra e substituir underscores por espaços
-                        section_title = analysis_type.replace('_', ' ').title()
-                        template_sections.append(f"{section_title}:\n  [Analise o código em relação a {analysis_type} e forneça sugestões de melhoria.]")
-                
-                # Sempre incluir considerações gerais
-                template_sections.append("Considerações gerais:\n  [Faça recomendações gerais para melhorar o código, como modularização, legibilidade, uso de boas práticas, etc.]")
-                
-                # Atualizar a lista de tipos de análise para log
-                logger.info(f"[CODE-ANALYZER] Tipos de análise que serão incluídos no template: {', '.join(analysis_types)}")
-                
-                # Criar o prompt com o template específico
-                template_text = "\n\n".join(template_sections)
-                prompt_template = f"""
-Você é um expert em análise de código. Analise o seguinte código e forneça feedback seguindo exatamente o formato abaixo.
-
-- Codigo: {file_path}
-{code}
-
-{base_prompt}
-
-Formate sua resposta seguindo EXATAMENTE este template:
-
-{template_text}
-"""
-                # Log do prompt completo
-                logger.info(f"[CODE-ANALYZER] Prompt completo para análise:\n{'-'*50}\n{prompt_template}\n{'-'*50}")
-                
-                return prompt_template
-
+                    for path, code, language, content in files:
+                        related_context[path] = enricher.context(path, code, language, content, processed_files)
+            
             # Analisar o código usando o LLM
             try:
                 analysis_result = ""
@@ -299,43 +181,46 @@ Formate sua resposta seguindo EXATAMENTE este template:
                 
                 analysis_result += file_summary + "\n"
 
-                # Processar cada arquivo individualmente para melhor formatação
-                for file_path in processed_files:
-                    # Extrair o conteúdo do arquivo do código concatenado
-                    file_content = ""
-                    try:
-                        # Tentar extrair o conteúdo do arquivo do código concatenado
-                        parts = all_code.split(f"\n\n# Arquivo: {file_path}\n")
-                        if len(parts) > 1:
-                            # Pegar o conteúdo após o cabeçalho do arquivo
-                            file_content = parts[1].split("\n\n# Arquivo:")[0] if "\n\n# Arquivo:" in parts[1] else parts[1]
-                        
-                        # Se não conseguir extrair, ler o arquivo novamente
-                        if not file_content:
-                            abs_path = os.path.join(repo_path, file_path)
-                            with open(abs_path, 'r', encoding='utf-8') as f:
-                                file_content = f.read()
-                    except Exception as e:
-                        logger.warning(f"[CODE-ANALYZER] Erro ao extrair conteúdo do arquivo {file_path}: {str(e)}")
-                        continue
-                    
-                    # Criar o prompt formatado para este arquivo
-                    prompt = format_prompt(file_path, file_content, user_prefer)
-                    
-                    # Analisar o arquivo
-                    logger.info(f"[CODE-ANALYZER] Analisando arquivo: {file_path}")
-                    file_analysis = LLMGateway.analyze_code(
-                        code=file_content,
-                        prompt=prompt,
-                        language=user_prefer.language
+                def analyze_unit(unit) -> str:
+                    logger.info(f"[CODE-ANALYZER] Analisando arquivo: {unit.label}")
+                    # A linguagem já está no prefixo compilado
+                    return LLMGateway.analyze_code(
+                        code=unit.text,
+                        prompt=compiled_prompt.for_file(unit.label) + related_context.get(unit.path, ""),
+                        shared_prefix=compiled_prompt.prefix
                     )
-                    
-                    # Adicionar a análise ao resultado
-                    analysis_result += f"\n## Arquivo: {file_path}\n\n{file_analysis}\n\n"
-                    logger.info(f"[CODE-ANALYZER] Análise concluída para: {file_path}")
                 
+                # Analisar os trechos em paralelo, um por requisição; os resultados mantêm a ordem dos arquivos
+                units = [unit for file_path in processed_files for unit in file_units[file_path]]
+                max_workers = int(Environment.get("LLM_MAX_CONCURRENCY") or 4)
+                timeout = float(Environment.get("LLM_FILE_TIMEOUT") or 180)
+                outcomes = Concurrency.map_ordered(analyze_unit, units, max_workers, timeout)
+                
+                errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+                # Cota esgotada não é uma falha do trecho: o job inteiro volta para a fila
+                quota_errors = [error for error in errors if isinstance(error, LLMQuotaExceededError)]
+                if quota_errors:
+                    raise quota_errors[0]
+                if errors and len(errors) == len(outcomes):
+                    raise errors[0]
+                
+                analyses_by_file = {}
+                for unit, outcome in zip(units, outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.error(f"[CODE-ANALYZER] Falha na análise de {unit.label}: {str(outcome)}")
+                        outcome = f"_Não foi possível analisar este trecho: {str(outcome)}_"
+                    if unit.parts > 1:
+                        outcome = f"### {unit.label}\n\n{outcome}"
+                    analyses_by_file.setdefault(unit.path, []).append(outcome)
+                
+                for file_path in processed_files:
+                    analysis_result += f"\n## Arquivo: {file_path}\n\n" + "\n\n".join(analyses_by_file[file_path]) + "\n\n"
+                
+                logger.info(f"[CODE-ANALYZER] Análise concluída: {len(units)} trecho(s), {len(errors)} falha(s)")
                 return analysis_result
                 
+            except LLMQuotaExceededError:
+                raise
             except Exception as e:
                 logger.error(f"[CODE-ANALYZER] Erro ao enviar código para análise: {str(e)}")
                 fallback_message = (
@@ -346,18 +231,97 @@ Formate sua resposta seguindo EXATAMENTE este template:
                     fallback_message += f"- {file}\n"
                 return fallback_message
             
+        except LLMQuotaExceededError:
+            raise
         except Exception as e:
             logger.error(f"[CODE-ANALYZER] Erro ao analisar PR: {str(e)}")
             return f"Erro ao analisar o PR #{user_prefer.repository.pull_request_number}. Detalhes: {str(e)}"
 
     @staticmethod
-    def _get_pr_modified_files(repo_path: str, user_prefer: UserPreferDTO) -> List[str]:
+    def _read_text(source: FileSource, path: str) -> Optional[str]:
+        """
+        Lê o texto de um arquivo passando pelo BlobStore compartilhado entre jobs.
+        
+        Args:
+            source: Origem dos arquivos
+            path: Caminho relativo do arquivo
+            
+        Returns:
+            Optional[str]: Conteúdo do arquivo, ou None se for binário
+        """
+        if not BlobStore.enabled():
+            data = source.read_bytes(path)
+            return None if SourceFiles.is_binary(data) else data.decode('utf-8')
+        
+        record = BlobStore.default().get_or_load(source.blob_sha(path), path, lambda: source.read_bytes(path))
+        return None if record.binary else record.text
+
+    @staticmethod
+    def _scoped_code(scoper: Optional[DiffScoper], repo_path: Optional[str], user_prefer: UserPreferDTO,
+                     source_file: SourceFile) -> str:
+        """
+        Retorna o código a analisar: as regiões alteradas no PR ou, sem diff aplicável, o arquivo inteiro.
+        """
+        if scoper is None:
+            return source_file.content
+        
+        changed_file, patch = DiffScoper.load_patch(user_prefer, source_file.path, repo_path)
+        regions = scoper.scope(
+            source_file.content,
+            patch,
+            source_file.language,
+            changed_file.status if changed_file else None
+        )
+        if not regions:
+            logger.info(f"[CODE-ANALYZER] Analisando arquivo inteiro: {source_file.path}")
+            return source_file.content
+        
+        code = DiffScoper.render(regions)
+        logger.info(f"[CODE-ANALYZER] Analisando {len(regions)} região(ões) alterada(s) de {source_file.path} ({len(code)} de {len(source_file.content)} caracteres)")
+        return code
+
+    @staticmethod
+    def _repository_id(user_prefer: UserPreferDTO) -> str:
+        repository = user_prefer.repository
+        return repository.repository_url or f"{repository.owner}/{repository.repo}"
+
+    @staticmethod
+    def _indexed(index: SymbolIndex, repository_id: str, records: Iterator[FileRecord]) -> Iterator[FileRecord]:
+        """
+        Repassa os registros coletados, indexando os símbolos de cada arquivo.
+        
+        Falhas de indexação não interrompem a análise.
+        """
+        for record in records:
+            try:
+                index.update(
+                    repository_id, record.path, record.text, record.language,
+                    SourceFiles.blob_sha(record.text.encode('utf-8'))
+                )
+            except Exception as e:
+                logger.warning(f"[CODE-ANALYZER] Erro ao indexar símbolos de {record.path}: {str(e)}")
+            yield record
+
+    @staticmethod
+    def _head_revision(repo_path: str) -> Optional[str]:
+        """
+        SHA do commit clonado (None se não for possível obtê-lo).
+        """
+        try:
+            return git.Repo(repo_path).head.commit.hexsha
+        except Exception as e:
+            logger.warning(f"[CODE-ANALYZER] Não foi possível obter o commit de {repo_path}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _get_pr_modified_files(repo_path: Optional[str], user_prefer: UserPreferDTO, source: FileSource) -> List[str]:
         """
         Obtém a lista de arquivos modificados no PR.
         
         Args:
-            repo_path: Caminho do repositório
+            repo_path: Caminho do repositório (None quando os arquivos vêm da API do provedor)
             user_prefer: Preferências do usuário
+            source: Origem dos arquivos
             
         Returns:
             List[str]: Lista de caminhos dos arquivos modificados
@@ -369,9 +333,9 @@ Formate sua resposta seguindo EXATAMENTE este template:
                 # Filtrar apenas arquivos existentes
                 valid_files = [
                     f for f in user_prefer.modified_files 
-                    if os.path.exists(os.path.join(repo_path, f))
+                    if source.exists(f)
                 ]
-                logger.info(f"[CODE-ANALYZER] {len(valid_files)} arquivos existem no repositório local")
+                logger.info(f"[CODE-ANALYZER] {len(valid_files)} arquivos disponíveis para análise")
                 
                 # Log detalhado dos arquivos encontrados
                 logger.info("[CODE-ANALYZER] ===== ARQUIVOS MODIFICADOS NO PR (via RepositoryManager) =====")
@@ -384,6 +348,11 @@ Formate sua resposta seguindo EXATAMENTE este template:
                 
                 return valid_files
                 
+            # Sem cópia local não há como consultar o git
+            if repo_path is None:
+                logger.warning("[CODE-ANALYZER] Lista de arquivos não fornecida e sem repositório local")
+                return []
+            
             # Caso não tenhamos a lista, tentar obtê-la através do git
             logger.info("[CODE-ANALYZER] Lista de arquivos não fornecida por RepositoryManager, tentando obtê-la via git")
             repo = git.Repo(repo_path)
@@ -441,19 +410,8 @@ Formate sua resposta seguindo EXATAMENTE este template:
                 logger.warning(f"[CODE-ANALYZER] Erro ao buscar diff: {str(e)}")
                 # Se falhar, tentar listar apenas os arquivos principais do projeto
                 logger.warning("[CODE-ANALYZER] Tentando encontrar arquivos principais do projeto")
-                modified_files = []
-                for root, _, files in os.walk(repo_path):
-                    if '.git' in root:
-                        continue
-                    for file in files:
-                        if file.endswith(('.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.go', '.cpp', '.c')):
-                            rel_path = os.path.relpath(os.path.join(root, file), repo_path)
-                            modified_files.append(rel_path)
-                
                 # Limitar a quantidade de arquivos para não sobrecarregar
-                if len(modified_files) > 20:
-                    logger.warning(f"[CODE-ANALYZER] Muitos arquivos encontrados ({len(modified_files)}), limitando aos 20 primeiros")
-                    modified_files = modified_files[:20]
+                modified_files = list(itertools.islice(FileCollector(repo_path).paths(), 20))
                 
                 logger.info(f"[CODE-ANALYZER] {len(modified_files)} arquivos selecionados para análise")
                 return modified_files
@@ -478,11 +436,8 @@ Formate sua resposta seguindo EXATAMENTE este template:
         try:
             logger.info(f"[CODE-ANALYZER] Iniciando análise de trecho de código: {len(code)} caracteres")
             
-            # Inicializar LLM
-            llm = LLMGateway()
-            
             # Analisar o código
-            analysis_result = llm.analyze_code(code)
+            analysis_result = LLMGateway.analyze_code(code)
             
             return analysis_result
             
@@ -0,0 +1,7 @@
+__version__ = "0.1.0"
+from .azure import AzureDevOpsContentProvider
+from .bitbucket import BitbucketContentProvider
+from .content_provider import ContentProvider, ContentBudgetExceededError
+from .github import GitHubContentProvider
+from .gitlab import GitLabContentProvider
+from .content_provider_factory import ContentProviderFactory
@@ -0,0 +1,99 @@
+from typing import List
+
+from .content_provider import ContentProvider
+from ...adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+
+
+class AzureDevOpsContentProvider(ContentProvider):
+    """
+    Implementação do provedor de conteúdo para Azure DevOps.
+
+    A organização é lida de `workspace` e o projeto de `project_id` do RepositoryDTO.
+    """
+
+    api_version = '6.0'
+
+    def _headers(self, user_prefer: UserPreferDTO):
+        return {
+            'Authorization': f'Basic {user_prefer.token}'
+        }
+
+    def _repo_url(self, user_prefer: UserPreferDTO) -> str:
+        organization = user_prefer.repository.workspace
+        project = user_prefer.repository.project_id
+
+        if not organization or not project or not user_prefer.repository.repo:
+            raise ValueError("workspace (organização), project_id e repo são obrigatórios para ler arquivos do Azure DevOps")
+
+        return f'https://dev.azure.com/{organization}/{project}/_apis/git/repositories/{user_prefer.repository.repo}'
+
+    def list_changed_files(self, user_prefer: UserPreferDTO) -> List[ChangedFileDTO]:
+        repo_url = self._repo_url(user_prefer)
+        pull_request_id = user_prefer.repository.pull_request_id or user_prefer.repository.pull_request_number
+        headers = self._headers(user_prefer)
+        params = {'api-version': self.api_version}
+
+        pull_request = self._get(f'{repo_url}/pullRequests/{pull_request_id}', headers, params=params).json()
+        user_prefer.head_sha = pull_request['lastMergeSourceCommit']['commitId']
+        user_prefer.base_sha = pull_request['lastMergeTargetCommit']['commitId']
+
+        iterations = self._get(f'{repo_url}/pullRequests/{pull_request_id}/iterations', headers, params=params).json()
+        iteration_id = iterations['value'][-1]['id']
+
+        changes = self._get(
+            f'{repo_url}/pullRequests/{pull_request_id}/iterations/{iteration_id}/changes',
+            headers,
+            params={**params, '$top': 2000}
+        ).json()
+
+        changed_files = []
+        for entry in changes.get('changeEntries', []):
+            item = entry.get('item') or {}
+            if item.get('gitObjectType', 'blob') != 'blob' or not item.get('path'):
+                continue
+
+            # changeType pode combinar valores, por exemplo "edit, rename"
+            change_type = entry.get('changeType', '')
+            if 'delete' in change_type:
+                status = ChangeStatusEnum.REMOVED
+            elif 'add' in change_type:
+                status = ChangeStatusEnum.ADDED
+            elif 'rename' in change_type:
+                status = ChangeStatusEnum.RENAMED
+            else:
+                status = ChangeStatusEnum.MODIFIED
+
+            original_path = entry.get('originalPath')
+            changed_files.append(ChangedFileDTO(
+                path=item['path'].lstrip('/'),
+                status=status,
+                sha=item.get('objectId'),
+                previous_path=original_path.lstrip('/') if original_path else None
+            ))
+
+        self.logger.info(f"[AZURE-CONTENT] PR #{pull_request_id}: {len(changed_files)} arquivos alterados")
+        return changed_files
+
+    def fetch_content(self, user_prefer: UserPreferDTO, changed_file: ChangedFileDTO) -> bytes:
+        repo_url = self._repo_url(user_prefer)
+
+        if changed_file.sha:
+            response = self._get(
+                f'{repo_url}/blobs/{changed_file.sha}',
+                self._headers(user_prefer),
+                params={'api-version': self.api_version, '$format': 'octetstream'}
+            )
+            return response.content
+
+        response = self._get(
+            f'{repo_url}/items',
+            self._headers(user_prefer),
+            params={
+                'api-version': self.api_version,
+                'path': changed_file.path,
+                'versionDescriptor.version': user_prefer.head_sha,
+                'versionDescriptor.versionType': 'commit',
+                '$format': 'octetStream'
+            }
+        )
+        return response.content
@@ -0,0 +1,69 @@
+from typing import List
+from urllib.parse import quote
+
+from .content_provider import ContentProvider
+from ...adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+
+
+class BitbucketContentProvider(ContentProvider):
+    """
+    Implementação do provedor de conteúdo para Bitbucket.
+    """
+
+    base_url = 'https://api.bitbucket.org/2.0/repositories'
+
+    def _headers(self, user_prefer: UserPreferDTO):
+        return {
+            'Authorization': f'Bearer {user_prefer.token}'
+        }
+
+    def _repo_url(self, user_prefer: UserPreferDTO) -> str:
+        if not user_prefer.repository.workspace or not user_prefer.repository.repo_slug:
+            raise ValueError("workspace e repo_slug são obrigatórios para ler arquivos do Bitbucket")
+
+        return f'{self.base_url}/{user_prefer.repository.workspace}/{user_prefer.repository.repo_slug}'
+
+    def list_changed_files(self, user_prefer: UserPreferDTO) -> List[ChangedFileDTO]:
+        repo_url = self._repo_url(user_prefer)
+        pull_request_id = user_prefer.repository.pull_request_id or user_prefer.repository.pull_request_number
+        headers = self._headers(user_prefer)
+
+        pull_request = self._get(f'{repo_url}/pullrequests/{pull_request_id}', headers).json()
+        user_prefer.head_sha = pull_request['source']['commit']['hash']
+        user_prefer.base_sha = pull_request['destination']['commit']['hash']
+
+        changed_files = []
+        url = f'{repo_url}/pullrequests/{pull_request_id}/diffstat'
+        params = {'pagelen': 100}
+
+        while url:
+            page = self._get(url, headers, params=params).json()
+
+            for entry in page.get('values', []):
+                status = entry.get('status')
+                new = entry.get('new') or {}
+                old = entry.get('old') or {}
+
+                if status == 'removed':
+                    changed_files.append(ChangedFileDTO(path=old['path'], status=ChangeStatusEnum.REMOVED))
+                    continue
+
+                changed_files.append(ChangedFileDTO(
+                    path=new['path'],
+                    status=ChangeStatusEnum(status) if status in ChangeStatusEnum._value2member_map_ else ChangeStatusEnum.MODIFIED,
+                    previous_path=old.get('path') if status == 'renamed' else None
+                ))
+
+            # A URL "next" já contém os parâmetros de paginação
+            url = page.get('next')
+            params = None
+
+        self.logger.info(f"[BITBUCKET-CONTENT] PR #{pull_request_id}: {len(changed_files)} arquivos alterados")
+        return changed_files
+
+    def fetch_content(self, user_prefer: UserPreferDTO, changed_file: ChangedFileDTO) -> bytes:
+        response = self._get(
+            f'{self._repo_url(user_prefer)}/src/{user_prefer.head_sha}/{quote(changed_file.path)}',
+            self._headers(user_prefer)
+        )
+        return response.content
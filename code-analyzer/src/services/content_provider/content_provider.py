@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+import logging
+from typing import Dict, List, Optional, Union
+
+from ...adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+from ...utils import Environment
+from ..blob_store import BlobStore
+
+
+class ContentBudgetExceededError(Exception):
+    """
+    Indica que o conteúdo do PR ultrapassou o limite de bytes configurado para o acesso via API.
+    """
+    pass
+
+
+class ContentProvider(ABC):
+    """
+    Classe base abstrata para leitura do conteúdo dos arquivos de um PR diretamente da API do provedor.
+    """
+    def __init__(self):
+        self.request_client = requests
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = int(Environment.get("PR_API_MAX_WORKERS") or 8)
+        self.timeout = float(Environment.get("PR_API_TIMEOUT") or 30)
+
+    @abstractmethod
+    def list_changed_files(self, user_prefer: UserPreferDTO) -> List[ChangedFileDTO]:
+        """
+        Lista os arquivos alterados no PR e preenche head_sha/base_sha em user_prefer.
+
+        Args:
+            user_prefer: Preferências e dados do usuário
+
+        Returns:
+            List[ChangedFileDTO]: Arquivos alterados no PR
+        """
+        pass
+
+    @abstractmethod
+    def fetch_content(self, user_prefer: UserPreferDTO, changed_file: ChangedFileDTO) -> bytes:
+        """
+        Obtém o conteúdo bruto de um arquivo no commit head do PR.
+
+        Args:
+            user_prefer: Preferências e dados do usuário
+            changed_file: Arquivo alterado
+
+        Returns:
+            bytes: Conteúdo do arquivo
+        """
+        pass
+
+    def fetch_files(self, user_prefer: UserPreferDTO, changed_files: List[ChangedFileDTO],
+                    max_bytes: Optional[int] = None) -> Dict[str, Union[bytes, str]]:
+        """
+        Obtém o conteúdo dos arquivos do PR em paralelo, com um pool limitado de threads.
+
+        Arquivos cujo SHA já está no BlobStore não são baixados novamente.
+
+        Args:
+            user_prefer: Preferências e dados do usuário
+            changed_files: Arquivos alterados no PR
+            max_bytes: Limite total de bytes (opcional)
+
+        Returns:
+            Dict[str, Union[bytes, str]]: Conteúdo por caminho, na mesma ordem de changed_files
+
+        Raises:
+            ContentBudgetExceededError: Se o total de bytes ultrapassar max_bytes
+        """
+        files = [f for f in changed_files if f.status != ChangeStatusEnum.REMOVED]
+        contents: Dict[str, Union[bytes, str]] = {}
+        total = 0
+        pending = []
+
+        store = BlobStore.default() if BlobStore.enabled() else None
+        for changed_file in files:
+            record = store.get(changed_file.sha) if store and changed_file.sha else None
+            if record is None:
+                pending.append(changed_file)
+                continue
+
+            total += record.size
+            changed_file.size = record.size
+            contents[changed_file.path] = record.text or ""
+
+        if max_bytes is not None and total > max_bytes:
+            raise ContentBudgetExceededError(f"Conteúdo do PR excede o limite de {max_bytes} bytes")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {executor.submit(self.fetch_content, user_prefer, f): f for f in pending}
+
+            for future in as_completed(futures):
+                changed_file = futures[future]
+                data = future.result()
+                total += len(data)
+
+                if max_bytes is not None and total > max_bytes:
+                    raise ContentBudgetExceededError(
+                        f"Conteúdo do PR excede o limite de {max_bytes} bytes"
+                    )
+
+                changed_file.size = len(data)
+                contents[changed_file.path] = data
+
+                if store:
+                    record = store.put(data, changed_file.path, changed_file.sha)
+                    changed_file.sha = record.sha
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        self.logger.info(f"[CONTENT-PROVIDER] {len(contents)} arquivos obtidos ({len(files) - len(pending)} do BlobStore, {len(pending)} via API, {total} bytes)")
+        return {f.path: contents[f.path] for f in files if f.path in contents}
+
+    def _get(self, url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> requests.Response:
+        response = self.request_client.get(url, headers=headers, params=params, timeout=self.timeout)
+
+        if response.status_code != 200:
+            raise Exception(f'Erro: {response.status_code} - {response.text}')
+
+        return response
@@ -0,0 +1,45 @@
+import logging
+
+from .azure import AzureDevOpsContentProvider
+from .bitbucket import BitbucketContentProvider
+from .content_provider import ContentProvider
+from .github import GitHubContentProvider
+from .gitlab import GitLabContentProvider
+from ...adapters.dtos import UserPreferDTO, TypeRepositoryEnum
+
+logger = logging.getLogger(__name__)
+
+class ContentProviderFactory:
+    """
+    Factory para criar instâncias de ContentProvider de acordo com o tipo de repositório.
+    """
+
+    @staticmethod
+    def create_content_provider(user_prefer: UserPreferDTO) -> ContentProvider:
+        """
+        Cria uma instância de ContentProvider baseada no tipo de repositório.
+
+        Args:
+            user_prefer: UserPreferDTO contendo o tipo de repositório, 
+                         autenticação e detalhes de configuração
+
+        Returns:
+            ContentProvider: Uma instância do provedor de conteúdo apropriado
+            
+        Raises:
+            ValueError: Se o tipo de repositório for inválido
+        """
+        logger.info(f"Creating content provider for repository type: {user_prefer.repository.type}")
+
+        if user_prefer.repository.type == TypeRepositoryEnum.GITLAB:
+            return GitLabContentProvider()
+        elif user_prefer.repository.type == TypeRepositoryEnum.GITHUB:
+            return GitHubContentProvider()
+        elif user_prefer.repository.type == TypeRepositoryEnum.BITBUCKET:
+            return BitbucketContentProvider()
+        elif user_prefer.repository.type == TypeRepositoryEnum.AZURE:
+            return AzureDevOpsContentProvider()
+        else:
+            error_msg = f'Invalid repository type: {user_prefer.repository.type}'
+            logger.error(error_msg)
+            raise ValueError(error_msg)
@@ -0,0 +1,77 @@
+from typing import List
+from urllib.parse import quote
+
+from .content_provider import ContentProvider
+from ...adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+
+
+class GitHubContentProvider(ContentProvider):
+    """
+    Implementação do provedor de conteúdo para GitHub.
+    """
+
+    base_url = 'https://api.github.com'
+
+    def _headers(self, user_prefer: UserPreferDTO, accept: str = 'application/vnd.github.v3+json'):
+        return {
+            'Authorization': f'token {user_prefer.token}',
+            'Accept': accept
+        }
+
+    def _repo_url(self, user_prefer: UserPreferDTO) -> str:
+        if not user_prefer.repository.owner or not user_prefer.repository.repo:
+            raise ValueError("Owner e repo são obrigatórios para ler arquivos do GitHub")
+
+        return f'{self.base_url}/repos/{user_prefer.repository.owner}/{user_prefer.repository.repo}'
+
+    def list_changed_files(self, user_prefer: UserPreferDTO) -> List[ChangedFileDTO]:
+        repo_url = self._repo_url(user_prefer)
+        pr_number = user_prefer.repository.pull_request_number
+        headers = self._headers(user_prefer)
+
+        pull_request = self._get(f'{repo_url}/pulls/{pr_number}', headers).json()
+        user_prefer.head_sha = pull_request['head']['sha']
+        user_prefer.base_sha = pull_request['base']['sha']
+
+        changed_files = []
+        page = 1
+
+        while True:
+            files_data = self._get(
+                f'{repo_url}/pulls/{pr_number}/files', headers, params={'per_page': 100, 'page': page}
+            ).json()
+
+            for file_data in files_data:
+                status = file_data.get('status')
+                changed_files.append(ChangedFileDTO(
+                    path=file_data['filename'],
+                    status=ChangeStatusEnum(status) if status in ChangeStatusEnum._value2member_map_ else ChangeStatusEnum.MODIFIED,
+                    sha=file_data.get('sha'),
+                    previous_path=file_data.get('previous_filename'),
+                    patch=file_data.get('patch')
+                ))
+
+            if len(files_data) < 100:
+                break
+            page += 1
+
+        self.logger.info(f"[GITHUB-CONTENT] PR #{pr_number}: {len(changed_files)} arquivos alterados (head {user_prefer.head_sha[:7]})")
+        return changed_files
+
+    def fetch_content(self, user_prefer: UserPreferDTO, changed_file: ChangedFileDTO) -> bytes:
+        repo_url = self._repo_url(user_prefer)
+
+        # O blob é endereçado pelo SHA e não depende do ref, então é a leitura preferencial
+        if changed_file.sha:
+            response = self._get(
+                f'{repo_url}/git/blobs/{changed_file.sha}',
+                self._headers(user_prefer, 'application/vnd.github.raw+json')
+            )
+            return response.content
+
+        response = self._get(
+            f'{repo_url}/contents/{quote(changed_file.path)}',
+            self._headers(user_prefer, 'application/vnd.github.raw'),
+            params={'ref': user_prefer.head_sha}
+        )
+        return response.content
@@ -0,0 +1,73 @@
+from typing import List
+from urllib.parse import quote
+
+from .content_provider import ContentProvider
+from ...adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+
+
+class GitLabContentProvider(ContentProvider):
+    """
+    Implementação do provedor de conteúdo para GitLab.
+    """
+
+    base_url = 'https://gitlab.com/api/v4'
+
+    def _headers(self, user_prefer: UserPreferDTO):
+        return {
+            'PRIVATE-TOKEN': user_prefer.token
+        }
+
+    def _project_url(self, user_prefer: UserPreferDTO) -> str:
+        if not user_prefer.repository.project_id:
+            raise ValueError("project_id é obrigatório para ler arquivos do GitLab")
+
+        return f'{self.base_url}/projects/{quote(str(user_prefer.repository.project_id), safe="")}'
+
+    def list_changed_files(self, user_prefer: UserPreferDTO) -> List[ChangedFileDTO]:
+        project_url = self._project_url(user_prefer)
+        merge_request_id = user_prefer.repository.pull_request_id or user_prefer.repository.pull_request_number
+        headers = self._headers(user_prefer)
+
+        merge_request = self._get(f'{project_url}/merge_requests/{merge_request_id}', headers).json()
+        user_prefer.head_sha = merge_request['diff_refs']['head_sha']
+        user_prefer.base_sha = merge_request['diff_refs']['base_sha']
+
+        changed_files = []
+        page = 1
+
+        while True:
+            diffs = self._get(
+                f'{project_url}/merge_requests/{merge_request_id}/diffs', headers, params={'per_page': 100, 'page': page}
+            ).json()
+
+            for diff in diffs:
+                if diff.get('deleted_file'):
+                    status = ChangeStatusEnum.REMOVED
+                elif diff.get('new_file'):
+                    status = ChangeStatusEnum.ADDED
+                elif diff.get('renamed_file'):
+                    status = ChangeStatusEnum.RENAMED
+                else:
+                    status = ChangeStatusEnum.MODIFIED
+
+                changed_files.append(ChangedFileDTO(
+                    path=diff['new_path'],
+                    status=status,
+                    previous_path=diff.get('old_path') if status == ChangeStatusEnum.RENAMED else None,
+                    patch=diff.get('diff')
+                ))
+
+            if len(diffs) < 100:
+                break
+            page += 1
+
+        self.logger.info(f"[GITLAB-CONTENT] MR !{merge_request_id}: {len(changed_files)} arquivos alterados")
+        return changed_files
+
+    def fetch_content(self, user_prefer: UserPreferDTO, changed_file: ChangedFileDTO) -> bytes:
+        response = self._get(
+            f'{self._project_url(user_prefer)}/repository/files/{quote(changed_file.path, safe="")}/raw',
+            self._headers(user_prefer),
+            params={'ref': user_prefer.head_sha}
+        )
+        return response.content
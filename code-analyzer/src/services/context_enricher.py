@@ -0,0 +1,182 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .symbol_index import IndexedSymbol, SymbolIndex
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+from ..utils.tokens import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+# Padrões: até 8 definições relacionadas e 1500 tokens de contexto por arquivo, ou 8000 tokens
+# no contexto único do PR inteiro, que vai para o prefixo compartilhado pelo cache de contexto
+DEFAULT_TOP_K = 8
+DEFAULT_MAX_TOKENS = 1500
+DEFAULT_SHARED_MAX_TOKENS = 8000
+
+HEADER = (
+    "\n- Contexto relacionado (definições de outros arquivos do repositório, "
+    "apenas para referência; não analise este código):\n"
+)
+
+# Relação com o arquivo alterado e peso no ranking
+IMPORTED = ("importado", 3)
+CALLEE = ("chamado", 2)
+CALLER = ("chama este arquivo", 1)
+
+
+class ContextEnricher:
+    """
+    Monta, para cada arquivo alterado de um PR, uma seção com as definições de outros
+    arquivos relacionadas a ele, consultadas no SymbolIndex do repositório.
+
+    As definições dos módulos importados pelo arquivo têm prioridade, seguidas das funções
+    que ele chama e, por último, das que chamam as definições do arquivo. A seção respeita
+    o limite de definições e de tokens.
+    """
+
+    def __init__(self, repository: str, index: Optional[SymbolIndex] = None,
+                 top_k: Optional[int] = None, max_tokens: Optional[int] = None):
+        self.repository = repository
+        self.index = index or SymbolIndex.default()
+        self.top_k = top_k if top_k is not None else int(
+            Environment.get("ENRICHMENT_TOP_K") or DEFAULT_TOP_K
+        )
+        self.max_tokens = max_tokens if max_tokens is not None else int(
+            Environment.get("ENRICHMENT_MAX_TOKENS") or DEFAULT_MAX_TOKENS
+        )
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("CONTEXT_ENRICHMENT_ENABLED")
+        return value is not None and value.lower() in ("1", "true", "yes")
+
+    def related(self, path: str, code: str, language: Optional[str], content: Optional[str] = None,
+                changed_paths: Iterable[str] = ()) -> List[Tuple[IndexedSymbol, str]]:
+        """
+        Definições relacionadas a um arquivo alterado, da mais para a menos relevante.
+
+        Args:
+            path: Caminho do arquivo alterado
+            code: Código enviado para análise (o arquivo ou apenas as regiões alteradas)
+            language: Linguagem do arquivo
+            content: Conteúdo completo do arquivo, de onde vêm as importações e as definições
+            changed_paths: Arquivos alterados no PR, cujas definições não entram no contexto
+
+        Returns:
+            List[Tuple[IndexedSymbol, str]]: (definição, relação com o arquivo)
+        """
+        content = content if content is not None else code
+        excluded = set(changed_paths) | {path}
+        called = SymbolIndex.calls(code)
+
+        ranked: Dict[Tuple[str, str], Tuple[int, int, IndexedSymbol, str]] = {}
+
+        def add(symbols: List[IndexedSymbol], relation: Tuple[str, int]):
+            for symbol in symbols:
+                if symbol.path in excluded:
+                    continue
+                key = (symbol.path, symbol.qualified_name)
+                current = ranked.get(key)
+                if current is None or current[0] < relation[1]:
+                    ranked[key] = (relation[1], current[1] if current else len(ranked), symbol, relation[0])
+
+        for module, names in SymbolIndex.imports(content):
+            paths = self.index.module_paths(self.repository, module, path)
+            # Dos módulos importados, apenas os nomes importados ou usados no código alterado
+            wanted = [name for name in names if name in called] or names or list(called)
+            add(self.index.symbols_in(self.repository, paths, wanted), IMPORTED)
+
+        add(self.index.lookup(self.repository, called, excluded), CALLEE)
+
+        defined = [symbol.name for symbol in self.index.definitions(content, language)]
+        add(self.index.callers(self.repository, defined, excluded), CALLER)
+
+        ordered = sorted(ranked.values(), key=lambda entry: (-entry[0], entry[1]))
+        return [(symbol, relation) for _, _, symbol, relation in ordered]
+
+    def context(self, path: str, code: str, language: Optional[str], content: Optional[str] = None,
+                changed_paths: Iterable[str] = ()) -> str:
+        """
+        Seção do prompt com as definições relacionadas, dentro do limite de tokens.
+
+        Returns:
+            str: Seção a ser anexada ao prompt, ou "" se não houver definições relacionadas
+        """
+        try:
+            related = self.related(path, code, language, content, changed_paths)
+        except Exception as e:
+            # O contexto é um complemento: sem ele a análise continua
+            logger.warning(f"[CONTEXT-ENRICHER] Erro ao consultar o índice de símbolos para {path}: {str(e)}")
+            return ""
+
+        blocks = self._blocks(related, self.top_k, self.max_tokens)
+        if not blocks:
+            return ""
+
+        logger.info(f"[CONTEXT-ENRICHER] {path}: {len(blocks)} definição(ões) relacionada(s) de {len(related)} encontrada(s)")
+        return HEADER + "".join(blocks)
+
+    def shared_context(self, files: Iterable[Tuple[str, str, Optional[str], Optional[str]]],
+                       changed_paths: Iterable[str] = (), max_tokens: Optional[int] = None) -> str:
+        """
+        Uma única seção com as definições relacionadas a todos os arquivos alterados.
+
+        As listas de cada arquivo são intercaladas, então todos recebem primeiro as suas
+        definições mais relevantes. Por ser igual em todas as requisições do PR, a seção
+        pode ir para o prefixo compartilhado e entrar no cache de contexto do provedor.
+
+        Args:
+            files: (caminho, código enviado, linguagem, conteúdo completo) de cada arquivo alterado
+            changed_paths: Arquivos alterados no PR, cujas definições não entram no contexto
+            max_tokens: Limite de tokens da seção (padrão: ENRICHMENT_SHARED_MAX_TOKENS)
+
+        Returns:
+            str: Seção do prompt, ou "" se não houver definições relacionadas
+        """
+        changed_paths = list(changed_paths)
+        max_tokens = max_tokens if max_tokens is not None else int(
+            Environment.get("ENRICHMENT_SHARED_MAX_TOKENS") or DEFAULT_SHARED_MAX_TOKENS
+        )
+
+        per_file = []
+        for path, code, language, content in files:
+            try:
+                per_file.append(self.related(path, code, language, content, changed_paths))
+            except Exception as e:
+                logger.warning(f"[CONTEXT-ENRICHER] Erro ao consultar o índice de símbolos para {path}: {str(e)}")
+
+        merged, seen = [], set()
+        for position in range(max((len(related) for related in per_file), default=0)):
+            for related in per_file:
+                if position < len(related):
+                    symbol, relation = related[position]
+                    if (symbol.path, symbol.qualified_name) not in seen:
+                        seen.add((symbol.path, symbol.qualified_name))
+                        merged.append((symbol, relation))
+
+        blocks = self._blocks(merged, self.top_k * max(1, len(per_file)), max_tokens)
+        if not blocks:
+            return ""
+
+        logger.info(f"[CONTEXT-ENRICHER] PR: {len(blocks)} definição(ões) relacionada(s) de {len(merged)} encontrada(s)")
+        return HEADER + "".join(blocks)
+
+    @staticmethod
+    def _blocks(related: List[Tuple[IndexedSymbol, str]], top_k: int, max_tokens: int) -> List[str]:
+        budget = max_tokens - TokenCounter.count(HEADER)
+        blocks = []
+        for symbol, relation in related:
+            if len(blocks) >= top_k:
+                break
+            fence = SourceFiles.language(symbol.path) or ""
+            block = (
+                f"\n### {symbol.path}:{symbol.start_line}-{symbol.end_line} ({symbol.qualified_name}, {relation})\n"
+                f"```{fence}\n{symbol.text.rstrip()}\n```\n"
+            )
+            tokens = TokenCounter.count(block)
+            if tokens > budget:
+                continue
+            blocks.append(block)
+            budget -= tokens
+        return blocks
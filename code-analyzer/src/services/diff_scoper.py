@@ -0,0 +1,228 @@
+import re
+import logging
+from typing import List, Optional, Tuple
+
+import git
+from pydantic import BaseModel
+
+from ..adapters.dtos import UserPreferDTO, ChangedFileDTO, ChangeStatusEnum
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+
+logger = logging.getLogger(__name__)
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+# Linguagens em que o fim de um bloco é dado pela indentação e não por chaves
+INDENT_LANGUAGES = {'python', 'ruby'}
+
+# Padrões: 20 linhas de contexto, arquivos com até 150 linhas vão inteiros,
+# blocos com mais de 300 linhas não são expandidos até a definição inteira
+DEFAULT_CONTEXT_LINES = 20
+DEFAULT_MIN_FILE_LINES = 150
+DEFAULT_MAX_BLOCK_LINES = 300
+
+# Acima desta fração do arquivo, enviar as regiões não economiza tokens
+MAX_COVERAGE = 0.8
+
+
+class DiffRegion(BaseModel):
+    start_line: int
+    end_line: int
+    text: str
+
+
+class DiffScoper:
+    """
+    Restringe a análise de um arquivo do PR às regiões alteradas.
+
+    Cada hunk do diff é expandido com uma janela de contexto e ajustado aos limites
+    da função ou classe que o contém. Arquivos novos, pequenos ou com alterações
+    espalhadas pela maior parte do conteúdo continuam sendo analisados por inteiro.
+    """
+
+    def __init__(self, context_lines: Optional[int] = None, min_file_lines: Optional[int] = None,
+                 max_block_lines: Optional[int] = None):
+        self.context_lines = context_lines if context_lines is not None else int(
+            Environment.get("PR_DIFF_CONTEXT_LINES") or DEFAULT_CONTEXT_LINES
+        )
+        self.min_file_lines = min_file_lines if min_file_lines is not None else int(
+            Environment.get("PR_DIFF_MIN_FILE_LINES") or DEFAULT_MIN_FILE_LINES
+        )
+        self.max_block_lines = max_block_lines if max_block_lines is not None else int(
+            Environment.get("PR_DIFF_MAX_BLOCK_LINES") or DEFAULT_MAX_BLOCK_LINES
+        )
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("PR_DIFF_SCOPED_ANALYSIS")
+        return value is not None and value.lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def changed_lines(patch: str) -> List[int]:
+        """
+        Extrai de um diff unificado as linhas (1-based, lado novo) adicionadas ou alteradas.
+
+        Remoções puras marcam a linha onde o conteúdo foi removido.
+        """
+        lines = set()
+        current = None
+
+        for line in patch.splitlines():
+            header = HUNK_HEADER.match(line)
+            if header:
+                current = int(header.group(1))
+                # Hunk vazio no lado novo (remoção pura) começa na linha anterior
+                if header.group(2) == '0':
+                    current += 1
+                continue
+            if current is None or line.startswith('\\'):
+                continue
+            if line.startswith('+'):
+                lines.add(current)
+                current += 1
+            elif line.startswith('-'):
+                lines.add(max(current - 1, 1))
+            else:
+                current += 1
+
+        return sorted(lines)
+
+    @staticmethod
+    def load_patch(user_prefer: UserPreferDTO, path: str, repo_path: Optional[str] = None) -> Tuple[Optional[ChangedFileDTO], Optional[str]]:
+        """
+        Obtém o diff de um arquivo: da listagem do provedor ou, no clone, com git diff base..head.
+
+        Returns:
+            Tuple[Optional[ChangedFileDTO], Optional[str]]: Arquivo alterado (se conhecido) e diff unificado
+        """
+        changed_file = next((f for f in user_prefer.changed_files or [] if f.path == path), None)
+        if changed_file and changed_file.patch:
+            return changed_file, changed_file.patch
+
+        if repo_path and user_prefer.base_sha:
+            try:
+                patch = git.Repo(repo_path).git.diff(
+                    "--unified=0", user_prefer.base_sha, user_prefer.head_sha or "HEAD", "--", path
+                )
+                return changed_file, patch or None
+            except Exception as e:
+                logger.info(f"[DIFF-SCOPER] Diff indisponível para {path}: {str(e)}")
+
+        return changed_file, None
+
+    def scope(self, text: str, patch: Optional[str], language: Optional[str] = None,
+              status: Optional[ChangeStatusEnum] = None) -> Optional[List[DiffRegion]]:
+        """
+        Calcula as regiões a analisar.
+
+        Args:
+            text: Conteúdo do arquivo no head do PR
+            patch: Diff unificado do arquivo
+            language: Linguagem do arquivo
+            status: Situação do arquivo no PR
+
+        Returns:
+            Optional[List[DiffRegion]]: Regiões ordenadas, ou None para analisar o arquivo inteiro
+        """
+        lines = text.splitlines(keepends=True)
+
+        if status == ChangeStatusEnum.ADDED or not patch or len(lines) <= self.min_file_lines:
+            return None
+
+        changed = [line for line in self.changed_lines(patch) if line <= len(lines)]
+        if not changed:
+            return None
+
+        ranges = []
+        for line in changed:
+            start, end = self._expand(lines, line - 1, language)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+
+        covered = sum(end - start for start, end in ranges)
+        if covered >= len(lines) * MAX_COVERAGE:
+            return None
+
+        return [
+            DiffRegion(start_line=start + 1, end_line=end, text="".join(lines[start:end]))
+            for start, end in ranges
+        ]
+
+    @staticmethod
+    def render(regions: List[DiffRegion]) -> str:
+        """
+        Junta as regiões em um único texto, marcando o intervalo de linhas de cada uma.
+        """
+        parts = []
+        for region in regions:
+            text = region.text if region.text.endswith('\n') else region.text + '\n'
+            parts.append(f"@@ linhas {region.start_line}-{region.end_line} @@\n{text}")
+        return "".join(parts)
+
+    def _expand(self, lines: List[str], index: int, language: Optional[str]) -> Tuple[int, int]:
+        # Janela de contexto ao redor da linha alterada (índices 0-based, fim exclusivo)
+        start = max(0, index - self.context_lines)
+        end = min(len(lines), index + self.context_lines + 1)
+
+        definition = self._enclosing_definition(lines, index, language)
+        if definition is not None:
+            def_start, def_end = definition
+            if def_end - def_start <= self.max_block_lines:
+                start, end = min(start, def_start), max(end, def_end)
+
+        return start, end
+
+    def _enclosing_definition(self, lines: List[str], index: int, language: Optional[str]) -> Optional[Tuple[int, int]]:
+        """
+        Localiza a definição mais interna que contém a linha index.
+        """
+        threshold = None
+
+        for i in range(index, -1, -1):
+            line = lines[i]
+            if not line.strip():
+                continue
+
+            indent = len(line) - len(line.lstrip())
+            if threshold is not None and indent >= threshold and i != index:
+                continue
+            threshold = indent if threshold is None else min(threshold, indent)
+
+            if SourceFiles.is_definition(lines, i, language):
+                end = self._block_end(lines, i, language)
+                if end > index:
+                    return i, end
+
+        return None
+
+    @staticmethod
+    def _block_end(lines: List[str], start: int, language: Optional[str]) -> int:
+        """
+        Índice (exclusivo) do fim do bloco iniciado na linha start.
+        """
+        if language in INDENT_LANGUAGES:
+            # Decoradores precedem a linha da definição
+            while start + 1 < len(lines) and lines[start].lstrip().startswith('@'):
+                start += 1
+            base = len(lines[start]) - len(lines[start].lstrip())
+            last = start
+            for i in range(start + 1, len(lines)):
+                line = lines[i]
+                if not line.strip():
+                    continue
+                if len(line) - len(line.lstrip()) <= base:
+                    return i + 1 if line.strip() == 'end' else last + 1
+                last = i
+            return last + 1
+
+        depth = 0
+        opened = False
+        for i in range(start, len(lines)):
+            depth += lines[i].count('{') - lines[i].count('}')
+            opened = opened or '{' in lines[i]
+            if opened and depth <= 0:
+                return i + 1
+        return len(lines)
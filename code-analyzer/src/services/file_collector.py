@@ -0,0 +1,282 @@
+import os
+import re
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+
+logger = logging.getLogger(__name__)
+
+# Diretórios que nunca contêm código do projeto a ser analisado, em qualquer nível
+EXCLUDED_DIRS = {
+    '.git', '.hg', '.svn', 'node_modules', 'bower_components', '__pycache__', '.venv',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.idea', '.vscode', '.next', '.gradle'
+}
+
+# Nomes genéricos ignorados apenas na raiz do repositório: em subdiretórios (src/env/, app/build/)
+# podem ser código do projeto, e as saídas de build aninhadas ficam a cargo do .gitignore
+ROOT_EXCLUDED_DIRS = {
+    'vendor', 'third_party', 'dist', 'build', 'target', 'out', 'coverage', 'venv', 'env'
+}
+
+# Limites padrão: 512 KiB por arquivo e 8 MiB no total
+DEFAULT_MAX_FILE_BYTES = 512 * 1024
+DEFAULT_MAX_TOTAL_BYTES = 8 * 1024 * 1024
+
+
+class FileRecord(BaseModel):
+    path: str
+    size: int
+    language: Optional[str] = None
+    text: str
+
+
+class IgnoreRules:
+    """
+    Conjunto de padrões no formato do .gitignore, relativos a um diretório base.
+    """
+
+    def __init__(self, base: str, patterns: List[Tuple[re.Pattern, bool, bool]]):
+        self.base = base
+        self.patterns = patterns
+
+    @staticmethod
+    def compile(pattern: str) -> Tuple[re.Pattern, bool, bool]:
+        """
+        Converte um padrão do .gitignore em expressão regular.
+
+        Returns:
+            Tuple[re.Pattern, bool, bool]: (regex, negado, somente diretórios)
+        """
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+
+        # Padrões com "/" no início ou no meio são ancorados no diretório base
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+
+        regex = ''
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if pattern.startswith('**/', i):
+                regex += '(?:.*/)?'
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                regex += '.*'
+                i += 2
+                continue
+            if char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif char == '[':
+                end = pattern.find(']', i + 1)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    regex += '[' + pattern[i + 1:end].replace('\\', '\\\\') + ']'
+                    i = end
+            elif char == '\\' and i + 1 < len(pattern):
+                i += 1
+                regex += re.escape(pattern[i])
+            else:
+                regex += re.escape(char)
+            i += 1
+
+        prefix = '' if anchored else '(?:.*/)?'
+        return re.compile(f'^{prefix}{regex}$'), negated, dir_only
+
+    @staticmethod
+    def load(base: str, filename: str) -> Optional["IgnoreRules"]:
+        path = os.path.join(base, filename)
+        if not os.path.isfile(path):
+            return None
+
+        patterns = []
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as handle:
+                for line in handle:
+                    line = line.rstrip('\n').rstrip()
+                    if line and not line.startswith('#'):
+                        patterns.append(IgnoreRules.compile(line))
+        except OSError:
+            return None
+
+        return IgnoreRules(base, patterns) if patterns else None
+
+    def match(self, abs_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Retorna True se ignorado, False se explicitamente incluído ("!") e None se nenhum padrão casar.
+        """
+        rel_path = os.path.relpath(abs_path, self.base).replace(os.sep, '/')
+        result = None
+
+        for regex, negated, dir_only in self.patterns:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+
+        return result
+
+
+class FileCollector:
+    """
+    Percorre um repositório local e produz os arquivos de código sob demanda (streaming).
+
+    Respeita .gitignore, os atributos linguist-generated/linguist-vendored do
+    .gitattributes, ignora diretórios de dependências e binários e aplica limites
+    de bytes por arquivo e no total.
+    """
+
+    def __init__(self, repo_path: str, max_file_bytes: Optional[int] = None,
+                 max_total_bytes: Optional[int] = None):
+        self.repo_path = repo_path
+        self.max_file_bytes = max_file_bytes if max_file_bytes is not None else int(
+            Environment.get("COLLECTOR_MAX_FILE_BYTES") or DEFAULT_MAX_FILE_BYTES
+        )
+        self.max_total_bytes = max_total_bytes if max_total_bytes is not None else int(
+            Environment.get("COLLECTOR_MAX_TOTAL_BYTES") or DEFAULT_MAX_TOTAL_BYTES
+        )
+        self.stats: Dict[str, int] = {"files": 0, "bytes": 0, "skipped": 0, "truncated": 0}
+        self._attributes = self._load_attributes(repo_path)
+
+    def paths(self) -> Iterator[str]:
+        """
+        Produz os caminhos relativos dos arquivos de código, sem ler o conteúdo.
+        """
+        rules_by_dir: Dict[str, List[IgnoreRules]] = {}
+
+        for root, dirs, files in os.walk(self.repo_path):
+            parent_rules = rules_by_dir.get(os.path.dirname(root), []) if root != self.repo_path else []
+            rules = list(parent_rules)
+            local = IgnoreRules.load(root, '.gitignore')
+            if local:
+                rules.append(local)
+            rules_by_dir[root] = rules
+
+            excluded = EXCLUDED_DIRS | ROOT_EXCLUDED_DIRS if root == self.repo_path else EXCLUDED_DIRS
+            dirs[:] = sorted(
+                d for d in dirs
+                if d not in excluded and not self._ignored(os.path.join(root, d), True, rules)
+            )
+
+            for file in sorted(files):
+                if not SourceFiles.is_source(file):
+                    continue
+
+                abs_path = os.path.join(root, file)
+                if self._ignored(abs_path, False, rules) or self._generated(abs_path):
+                    self.stats["skipped"] += 1
+                    continue
+
+                yield os.path.relpath(abs_path, self.repo_path).replace(os.sep, '/')
+
+    def collect(self, reader: Optional[Callable[[str], Optional[str]]] = None) -> Iterator[FileRecord]:
+        """
+        Produz os arquivos de código com conteúdo, um de cada vez.
+
+        Args:
+            reader: Função que lê o texto de um caminho relativo (None para binários).
+                    Por padrão lê do disco em UTF-8.
+
+        Returns:
+            Iterator[FileRecord]: Arquivos coletados, até o limite total de bytes
+        """
+        reader = reader or self._read
+
+        for path in self.paths():
+            abs_path = os.path.join(self.repo_path, path)
+
+            try:
+                size = os.path.getsize(abs_path)
+            except OSError:
+                continue
+
+            if size > self.max_file_bytes:
+                logger.info(f"[FILE-COLLECTOR] Arquivo acima do limite de {self.max_file_bytes} bytes ignorado: {path}")
+                self.stats["skipped"] += 1
+                continue
+
+            if self.stats["bytes"] + size > self.max_total_bytes:
+                logger.warning(f"[FILE-COLLECTOR] Limite total de {self.max_total_bytes} bytes atingido, coleta interrompida")
+                self.stats["truncated"] = 1
+                return
+
+            try:
+                text = reader(path)
+            except Exception as e:
+                logger.warning(f"[FILE-COLLECTOR] Erro ao ler arquivo {path}: {str(e)}")
+                self.stats["skipped"] += 1
+                continue
+
+            if text is None:
+                self.stats["skipped"] += 1
+                continue
+
+            self.stats["files"] += 1
+            self.stats["bytes"] += size
+            yield FileRecord(path=path, size=size, language=SourceFiles.language(path), text=text)
+
+    def _read(self, path: str) -> Optional[str]:
+        with open(os.path.join(self.repo_path, path), 'rb') as handle:
+            data = handle.read()
+
+        if SourceFiles.is_binary(data):
+            return None
+
+        return data.decode('utf-8')
+
+    @staticmethod
+    def _ignored(abs_path: str, is_dir: bool, rules: List[IgnoreRules]) -> bool:
+        ignored = False
+        for rule in rules:
+            result = rule.match(abs_path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+    @staticmethod
+    def _load_attributes(repo_path: str) -> List[Tuple[re.Pattern, bool]]:
+        """
+        Lê do .gitattributes da raiz os padrões marcados como gerados ou de terceiros.
+        """
+        attributes = []
+        path = os.path.join(repo_path, '.gitattributes')
+        if not os.path.isfile(path):
+            return attributes
+
+        with open(path, 'r', encoding='utf-8', errors='ignore') as handle:
+            for line in handle:
+                parts = line.split()
+                if len(parts) < 2 or parts[0].startswith('#'):
+                    continue
+
+                excluded = None
+                for attribute in parts[1:]:
+                    name, _, value = attribute.partition('=')
+                    if name.lstrip('-!') in ('linguist-generated', 'linguist-vendored'):
+                        excluded = not (attribute.startswith(('-', '!')) or value == 'false')
+
+                if excluded is not None:
+                    regex, _, _ = IgnoreRules.compile(parts[0])
+                    attributes.append((regex, excluded))
+
+        return attributes
+
+    def _generated(self, abs_path: str) -> bool:
+        rel_path = os.path.relpath(abs_path, self.repo_path).replace(os.sep, '/')
+        excluded = False
+        for regex, value in self._attributes:
+            if regex.match(rel_path):
+                excluded = value
+        return excluded
@@ -0,0 +1,107 @@
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from ..utils.source_files import SourceFiles
+from ..utils.tokens import TokenCounter
+from .file_source import FileSource
+
+logger = logging.getLogger(__name__)
+
+
+class SourceFile(BaseModel):
+    path: str
+    content: str
+    sha: str
+    language: Optional[str] = None
+    size: int
+    tokens: int
+
+
+class FileSet:
+    """
+    Arquivos de um job, lidos uma única vez e indexados por caminho.
+
+    Cada arquivo guarda conteúdo, SHA do blob, linguagem e contagem de tokens; a análise,
+    a montagem dos prompts e a contagem de quota usam as mesmas instâncias.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, SourceFile] = {}
+
+    def add(self, path: str, content: str, sha: Optional[str] = None,
+            language: Optional[str] = None) -> SourceFile:
+        data = content.encode('utf-8')
+        source_file = SourceFile(
+            path=path,
+            content=content,
+            sha=sha or SourceFiles.blob_sha(data),
+            language=language or SourceFiles.language(path),
+            size=len(data),
+            tokens=TokenCounter.count(content)
+        )
+        self._files[path] = source_file
+        return source_file
+
+    def load(self, source: FileSource, paths: Iterable[str],
+             reader: Callable[[FileSource, str], Optional[str]]) -> "FileSet":
+        """
+        Lê os arquivos informados, ignorando os ausentes, binários e vazios.
+
+        Args:
+            source: Origem dos arquivos
+            paths: Caminhos relativos, na ordem desejada
+            reader: Função que lê o texto de um arquivo (None para binários)
+
+        Returns:
+            FileSet: O próprio conjunto, para encadeamento
+        """
+        for path in paths:
+            if path in self._files:
+                continue
+
+            if not source.exists(path):
+                logger.warning(f"[FILE-SET] Arquivo não encontrado: {path}")
+                continue
+
+            try:
+                content = reader(source, path)
+            except Exception as e:
+                logger.warning(f"[FILE-SET] Erro ao ler arquivo {path}: {str(e)}")
+                continue
+
+            if content is None:
+                logger.info(f"[FILE-SET] Arquivo binário ignorado: {path}")
+                continue
+            if not content.strip():
+                logger.info(f"[FILE-SET] Arquivo vazio ignorado: {path}")
+                continue
+
+            self.add(path, content, sha=source.blob_sha(path))
+
+        return self
+
+    def get(self, path: str) -> Optional[SourceFile]:
+        return self._files.get(path)
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self._files)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(f.size for f in self._files.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(f.tokens for f in self._files.values())
+
+    def __iter__(self) -> Iterator[SourceFile]:
+        return iter(self._files.values())
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._files
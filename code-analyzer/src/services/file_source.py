@@ -0,0 +1,122 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Union
+
+import git
+
+
+class FileSource(ABC):
+    """
+    Origem dos arquivos analisados: uma cópia local do repositório ou conteúdo obtido via API.
+    """
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def read_bytes(self, path: str) -> bytes:
+        """
+        Lê o conteúdo bruto de um arquivo.
+
+        Args:
+            path: Caminho relativo à raiz do repositório
+
+        Returns:
+            bytes: Conteúdo do arquivo
+        """
+        pass
+
+    def read(self, path: str) -> str:
+        """
+        Lê o conteúdo textual de um arquivo.
+
+        Args:
+            path: Caminho relativo à raiz do repositório
+
+        Returns:
+            str: Conteúdo do arquivo decodificado em UTF-8
+        """
+        return self.read_bytes(path).decode('utf-8')
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        """SHA do blob git do arquivo, quando conhecido sem ler o conteúdo."""
+        return None
+
+    @property
+    def root(self) -> Optional[str]:
+        """Diretório local do repositório, se houver."""
+        return None
+
+
+class LocalFileSource(FileSource):
+    """
+    Arquivos lidos de uma cópia local (clone) do repositório.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._shas: Optional[Dict[str, str]] = None
+
+    @property
+    def root(self) -> Optional[str]:
+        return self.repo_path
+
+    def exists(self, path: str) -> bool:
+        return os.path.isfile(os.path.join(self.repo_path, path))
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(os.path.join(self.repo_path, path), 'rb') as f:
+            return f.read()
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        if self._shas is None:
+            self._shas = LocalFileSource._index_shas(self.repo_path)
+        return self._shas.get(path)
+
+    @staticmethod
+    def _index_shas(repo_path: str) -> Dict[str, str]:
+        # O índice do git já tem o SHA de cada blob; o clone não tem alterações locais
+        if not os.path.exists(os.path.join(repo_path, '.git')):
+            return {}
+
+        try:
+            output = git.Repo(repo_path).git.ls_files('-s', '-z')
+        except Exception:
+            return {}
+
+        shas = {}
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            shas[path] = info.split()[1]
+        return shas
+
+
+class MemoryFileSource(FileSource):
+    """
+    Arquivos mantidos em memória, obtidos diretamente da API do provedor.
+    """
+
+    def __init__(self, files: Dict[str, Union[bytes, str]], shas: Optional[Dict[str, str]] = None):
+        self.files = files
+        self.shas = shas or {}
+
+    @property
+    def paths(self) -> List[str]:
+        return list(self.files)
+
+    def exists(self, path: str) -> bool:
+        return path in self.files
+
+    def read_bytes(self, path: str) -> bytes:
+        content = self.files[path]
+        return content.encode('utf-8') if isinstance(content, str) else content
+
+    def read(self, path: str) -> str:
+        content = self.files[path]
+        return content if isinstance(content, str) else content.decode('utf-8')
+
+    def blob_sha(self, path: str) -> Optional[str]:
+        return self.shas.get(path)
@@ -4,21 +4,41 @@ import logging
 import requests
 import traceback
 import time
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from pydantic import ValidationError
 from ..adapters.dtos import UserPreferDTO
 from .conversation import ConversationService
 from .comment_poster import CommentPosterFactory
 from .request_processor import RequestProcessor
-from ..domain import LLMGateway, ModelEmbeddings
+from ..domain import LLMGateway, ModelEmbeddings, LLMCache, ContextCache, RateLimiter, LLMQuotaExceededError
 from .repository_manager import RepositoryManager
 from .code_analyzer import CodeAnalyzer
+from .file_source import FileSource, MemoryFileSource
+from .file_set import FileSet
+from .blob_store import BlobStore
+from .worker_pool import WorkerPool
+from .content_provider import ContentProviderFactory, ContentBudgetExceededError
+from ..adapters.dtos import ChangeStatusEnum
+from ..utils import Environment
 from ..adapters.http_client import ConfigManagerClient
 
+# Padrões: até 5 entregas de um job sem cota, reentregue após 60s, 120s, 240s... (máximo de 600s do Pub/Sub)
+DEFAULT_MAX_DELIVERY_ATTEMPTS = 5
+DEFAULT_REDELIVERY_DELAY = 60
+MAX_ACK_DEADLINE = 600
+# Mensagens reentregues a outro worker nunca saem do contador local; as mais antigas são esquecidas
+MAX_TRACKED_MESSAGES = 10000
+
+
 class ProcessHandler(RequestProcessor):
     logger = logging.getLogger(__name__)
 
+    # Entregas por message_id quando a assinatura não tem política de dead letter (delivery_attempt vazio)
+    _attempts: Dict[str, int] = {}
+    _attempts_lock = threading.Lock()
+
     @staticmethod
     def process_message(message):
         """
@@ -32,15 +52,63 @@ class ProcessHandler(RequestProcessor):
         
         try:
             result = ProcessHandler.process_request(message.data)
+            ProcessHandler._forget(message)
             message.ack()
             ProcessHandler.logger.info(f"[CODE-ANALYZER] Processamento concluído com sucesso em {time.time() - start_time:.2f} segundos")
+            ProcessHandler.logger.info(f"[CODE-ANALYZER] Métricas do pool de jobs: {WorkerPool.default().metrics()}")
+        except LLMQuotaExceededError as e:
+            # Cota do LLM esgotada: devolver a mensagem para ser reprocessada mais tarde em vez de perder o job
+            ProcessHandler.logger.warning(f"[CODE-ANALYZER] Cota do LLM esgotada: {str(e)}")
+            ProcessHandler.logger.info(f"[CODE-ANALYZER] Métricas do RateLimiter: {RateLimiter.default().metrics()}")
+            ProcessHandler._redeliver(message)
         except Exception as e:
             ProcessHandler.logger.error(f"[CODE-ANALYZER] Erro ao processar mensagem: {str(e)}")
             ProcessHandler.logger.error(traceback.format_exc())
             # Ainda fazemos ack para não ficar reprocessando mensagens com erro
+            ProcessHandler._forget(message)
             message.ack()
             ProcessHandler.logger.info(f"[CODE-ANALYZER] Mensagem marcada como processada (ack) apesar do erro")
 
+    @staticmethod
+    def _redeliver(message):
+        """
+        Devolve a mensagem para uma nova entrega com atraso crescente, até o limite de entregas.
+
+        O prazo de confirmação é estendido para o atraso e a mensagem sai do controle de lease
+        do cliente, então o Pub/Sub só a reentrega quando o prazo expira. Atingido o limite, a
+        mensagem é confirmada (ack) para não ser reentregue indefinidamente.
+
+        Args:
+            message: Mensagem recebida do Pub/Sub
+        """
+        max_attempts = int(Environment.get("PUBSUB_MAX_DELIVERY_ATTEMPTS") or DEFAULT_MAX_DELIVERY_ATTEMPTS)
+        base_delay = int(Environment.get("PUBSUB_REDELIVERY_DELAY_SECONDS") or DEFAULT_REDELIVERY_DELAY)
+
+        attempt = getattr(message, "delivery_attempt", None)
+        with ProcessHandler._attempts_lock:
+            if not isinstance(attempt, int) or attempt <= 0:
+                attempt = ProcessHandler._attempts.get(message.message_id, 0) + 1
+            ProcessHandler._attempts.pop(message.message_id, None)
+            ProcessHandler._attempts[message.message_id] = attempt
+            while len(ProcessHandler._attempts) > MAX_TRACKED_MESSAGES:
+                ProcessHandler._attempts.pop(next(iter(ProcessHandler._attempts)))
+
+        if attempt >= max_attempts:
+            ProcessHandler.logger.error(f"[CODE-ANALYZER] Mensagem {message.message_id} descartada (ack) após {attempt} entregas sem cota do LLM")
+            ProcessHandler._forget(message)
+            message.ack()
+            return
+
+        delay = min(MAX_ACK_DEADLINE, base_delay * (2 ** (attempt - 1)))
+        ProcessHandler.logger.warning(f"[CODE-ANALYZER] Mensagem {message.message_id} devolvida para a fila (entrega {attempt} de {max_attempts}), nova entrega em {delay}s")
+        message.modify_ack_deadline(delay)
+        message.drop()
+
+    @staticmethod
+    def _forget(message):
+        with ProcessHandler._attempts_lock:
+            ProcessHandler._attempts.pop(message.message_id, None)
+
     @staticmethod
     def process_request(message_data: bytes):
         """
@@ -83,15 +151,22 @@ class ProcessHandler(RequestProcessor):
 
             # Analisar o código
             analysis_result = None
+            file_set = None
             if not user_prefer.code:
                 if user_prefer.repository.pull_request_number:
                     ProcessHandler.logger.info(f"[CODE-ANALYZER] Preparando para análise do PR #{user_prefer.repository.pull_request_number}")
-                    repo_path = RepositoryManager.clone_and_analyze_repository(user_prefer, analyze_pr_only=True)
-                    if repo_path:
-                        ProcessHandler.logger.info(f"[CODE-ANALYZER] Repositório clonado em: {repo_path}")
-                        analysis_result = CodeAnalyzer.analyze_pr(repo_path, user_prefer)
+                    file_set = FileSet()
+                    source = ProcessHandler._fetch_pr_source(user_prefer)
+                    if source:
+                        ProcessHandler.logger.info("[CODE-ANALYZER] Arquivos do PR obtidos via API do provedor, sem clone")
+                        analysis_result = CodeAnalyzer.analyze_pr(None, user_prefer, source=source, file_set=file_set)
                     else:
-                        raise ValueError("Falha ao clonar repositório")
+                        repo_path = RepositoryManager.clone_and_analyze_repository(user_prefer, analyze_pr_only=True)
+                        if repo_path:
+                            ProcessHandler.logger.info(f"[CODE-ANALYZER] Repositório clonado em: {repo_path}")
+                            analysis_result = CodeAnalyzer.analyze_pr(repo_path, user_prefer, file_set=file_set)
+                        else:
+                            raise ValueError("Falha ao clonar repositório")
                 elif getattr(user_prefer, 'analyze_full_project', False):
                     ProcessHandler.logger.info("[CODE-ANALYZER] Flag analyze_full_project ativada - analisando todo o projeto")
                     repo_path = RepositoryManager.clone_and_analyze_repository(user_prefer)
@@ -120,7 +195,16 @@ class ProcessHandler(RequestProcessor):
             ProcessHandler._post_analysis_comment(user_prefer, analysis_result)
             
             # Atualizar as métricas de quota de arquivos
-            ProcessHandler._update_file_quota(user_prefer)
+            ProcessHandler._update_file_quota(user_prefer, file_set)
+            
+            if BlobStore.enabled():
+                ProcessHandler.logger.info(f"[CODE-ANALYZER] Estatísticas do BlobStore: {BlobStore.default().stats()}")
+            if LLMCache.enabled():
+                ProcessHandler.logger.info(f"[CODE-ANALYZER] Estatísticas do cache do LLM: {LLMCache.default().stats()}")
+            if ContextCache.enabled():
+                purged = ContextCache.default().purge()
+                ProcessHandler.logger.info(f"[CODE-ANALYZER] Estatísticas do cache de contexto: {ContextCache.default().stats()}, {purged} prefixo(s) expirado(s) removido(s)")
+            ProcessHandler.logger.info(f"[CODE-ANALYZER] Métricas do RateLimiter: {RateLimiter.default().metrics()}")
 
         except Exception as e:
             ProcessHandler.logger.error(f"[CODE-ANALYZER] Erro durante o processamento: {str(e)}")
@@ -130,6 +214,52 @@ class ProcessHandler(RequestProcessor):
             if repo_path:
                 RepositoryManager.cleanup_repository(repo_path)
 
+    @staticmethod
+    def _fetch_pr_source(user_prefer: UserPreferDTO) -> Optional[FileSource]:
+        """
+        Decide entre clone e API do provedor para obter os arquivos do PR.
+        
+        A API é usada quando o PR tem poucos arquivos e o conteúdo total cabe no limite
+        configurado; caso contrário retorna None e o repositório é clonado.
+        
+        Args:
+            user_prefer: Preferências do usuário
+            
+        Returns:
+            Optional[FileSource]: Arquivos do PR em memória, ou None para usar o clone
+        """
+        enabled = Environment.get("PR_CONTENT_API_ENABLED")
+        if enabled is not None and enabled.lower() in ("0", "false", "no"):
+            return None
+        
+        max_files = int(Environment.get("PR_API_MAX_FILES") or 50)
+        max_bytes = int(Environment.get("PR_API_MAX_BYTES") or 2 * 1024 * 1024)
+        
+        try:
+            provider = ContentProviderFactory.create_content_provider(user_prefer)
+            changed_files = provider.list_changed_files(user_prefer)
+        except Exception as e:
+            ProcessHandler.logger.warning(f"[CODE-ANALYZER] Não foi possível listar os arquivos do PR via API: {str(e)}")
+            return None
+        
+        user_prefer.changed_files = changed_files
+        user_prefer.modified_files = [f.path for f in changed_files if f.status != ChangeStatusEnum.REMOVED]
+        
+        if len(user_prefer.modified_files) > max_files:
+            ProcessHandler.logger.info(f"[CODE-ANALYZER] PR com {len(user_prefer.modified_files)} arquivos (limite {max_files}) - usando clone")
+            return None
+        
+        try:
+            contents = provider.fetch_files(user_prefer, changed_files, max_bytes=max_bytes)
+        except ContentBudgetExceededError as e:
+            ProcessHandler.logger.info(f"[CODE-ANALYZER] {str(e)} - usando clone")
+            return None
+        except Exception as e:
+            ProcessHandler.logger.warning(f"[CODE-ANALYZER] Erro ao obter conteúdo dos arquivos via API, usando clone: {str(e)}")
+            return None
+        
+        return MemoryFileSource(contents, {f.path: f.sha for f in changed_files if f.sha})
+
     @staticmethod
     def _post_analysis_comment(user_prefer: UserPreferDTO, analysis_result: str):
         """
@@ -176,35 +306,19 @@ class ProcessHandler(RequestProcessor):
             raise
     
     @staticmethod
-    def _update_file_quota(user_prefer: UserPreferDTO):
+    def _update_file_quota(user_prefer: UserPreferDTO, file_set: Optional[FileSet] = None):
         """
         Atualiza as métricas de quota de arquivos do usuário após a análise.
         
         Args:
             user_prefer: Preferências do usuário com informações da análise
+            file_set: Arquivos efetivamente analisados no PR (None para análises sem PR)
         """
         try:
-            # Obter o número de arquivos no PR
-            # Para fins de demonstração, estamos usando um valor fixo de 1 arquivo
-            # Em uma implementação real, você deve contar o número de arquivos afetados pelo PR
+            # Em PRs, contar os arquivos realmente analisados; demais análises contam como 1 arquivo
             pr_file_count = 1
-            
-            # Se houver um PR associado à análise, contar os arquivos corretamente
-            if hasattr(user_prefer.repository, 'pull_request_number') and user_prefer.repository.pull_request_number:
-                # Aqui você pode implementar a lógica para contar os arquivos reais no PR
-                # Por simplicidade, estamos usando valores fixos para demonstração
-                if user_prefer.repository.type == 'Github':
-                    # Exemplo: contar arquivos em um PR do GitHub
-                    pr_file_count = 5  # Valor de exemplo
-                elif user_prefer.repository.type == 'Gitlab':
-                    # Exemplo: contar arquivos em um PR do GitLab
-                    pr_file_count = 3  # Valor de exemplo
-                elif user_prefer.repository.type == 'Azure':
-                    # Exemplo: contar arquivos em um PR do Azure DevOps
-                    pr_file_count = 4  # Valor de exemplo
-                elif user_prefer.repository.type == 'Bitbucket':
-                    # Exemplo: contar arquivos em um PR do Bitbucket
-                    pr_file_count = 2  # Valor de exemplo
+            if file_set is not None and user_prefer.repository.pull_request_number:
+                pr_file_count = len(file_set)
             
             # Extrair o e-mail do usuário para identificação
             # Em uma implementação real, você deve usar o ID do usuário
@@ -0,0 +1,234 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Versão dos templates; faz parte da chave dos prompts compilados e muda os prompts enviados ao LLM
+TEMPLATE_VERSION = "3"
+
+# Quantidade de prompts compilados mantidos em memória
+MAX_COMPILED_PROMPTS = 128
+
+ANALYSIS_MARKER = "analyze this code for:"
+
+# Início da seção de cada arquivo na resposta de um lote
+BATCH_HEADER = "### Arquivo: "
+
+# Termos procurados após "analyze this code for:"
+ANALYSIS_TERMS = {
+    "code quality": "code quality",
+    "quality": "code quality",
+    "security": "security issues",
+    "security issues": "security issues",
+    "performance": "performance optimizations",
+    "performance optimizations": "performance optimizations",
+    "bugs": "bugs and logical errors",
+    "logical errors": "bugs and logical errors",
+    "code smells": "code smells",
+    "vulnerabilities": "security vulnerabilities",
+    "owasp": "OWASP principles",
+    "owasp principles": "OWASP principles",
+    "solid": "SOLID principles",
+    "solid principles": "SOLID principles",
+    "componentization": "componentization",
+    "componentizacao": "componentization",
+    "componentização": "componentization",
+    "optimization": "optimization",
+    "otimizacao": "optimization",
+    "otimização": "optimization",
+    "big o": "algorithmic complexity",
+    "algorithmic complexity": "algorithmic complexity",
+    "duplication": "duplication",
+    "duplicidade": "duplication",
+    "duplicação": "duplication"
+}
+
+# Termos procurados no prompt inteiro quando ele não usa "analyze this code for:"
+FALLBACK_KEYWORDS = {
+    "quality": "code quality",
+    "qualidade": "code quality",
+    "security": "security issues",
+    "seguranca": "security issues",
+    "performance": "performance optimizations",
+    "desempenho": "performance optimizations",
+    "bugs": "bugs and logical errors",
+    "erros": "bugs and logical errors",
+    "code smell": "code smells",
+    "vulnerabilit": "security vulnerabilities",
+    "owasp": "OWASP principles",
+    "solid": "SOLID principles",
+    "componentizacao": "componentization",
+    "componentização": "componentization",
+    "otimizacao": "optimization",
+    "otimização": "optimization",
+    "big o": "algorithmic complexity",
+    "complexidade": "algorithmic complexity",
+    "duplicidade": "duplication",
+    "duplicação": "duplication"
+}
+
+# Seção do template de resposta para cada tipo de análise
+SECTION_TEMPLATES = {
+    # Tipos específicos do sistema
+    "Princípios SOLID": "Princípios SOLID:\n  [Avalie se o código segue os princípios SOLID (Single Responsibility, Open-Closed, Liskov Substitution, Interface Segregation, Dependency Inversion) e sugira melhorias.]",
+    "Código Limpo": "Código Limpo:\n  [Avalie a legibilidade, simplicidade e organização do código. Sugira melhorias para tornar o código mais limpo e fácil de manter.]",
+    "Code Smells": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
+    "Vulnerabilidades (OWASP)": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
+    "Componentização": "Componentização:\n  [Avalie a estrutura de componentes do código, a separação de responsabilidades e a reutilização. Sugira melhorias na organização dos componentes.]",
+    "Otimização (BIG O)": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
+    "Duplicação": "Duplicação:\n  [Identifique código duplicado ou repetitivo e sugira refatorações para melhorar a reutilização e manutenibilidade.]",
+    "Boas práticas da Linguagem": "Boas práticas da Linguagem:\n  [Avalie se o código segue as boas práticas e convenções da linguagem de programação utilizada. Sugira melhorias específicas da linguagem.]",
+    "Boas práticas do Framework": "Boas práticas do Framework:\n  [Avalie se o código segue as boas práticas e padrões recomendados do framework utilizado. Sugira melhorias específicas do framework.]",
+
+    # Mapeamentos alternativos para compatibilidade
+    "code quality": "Código Limpo:\n  [Avalie a legibilidade, simplicidade e organização do código. Sugira melhorias para tornar o código mais limpo e fácil de manter.]",
+    "security issues": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
+    "performance optimizations": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
+    "bugs and logical errors": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
+    "code smells": "Code Smells:\n  [Identifique code smells (indicadores de problemas potenciais no código) e sugira refatorações para melhorar a qualidade do código.]",
+    "security vulnerabilities": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
+    "OWASP principles": "Vulnerabilidades (OWASP):\n  [Identifique vulnerabilidades de segurança relacionadas aos princípios do OWASP (Open Web Application Security Project) e sugira correções.]",
+    "SOLID principles": "Princípios SOLID:\n  [Avalie se o código segue os princípios SOLID (Single Responsibility, Open-Closed, Liskov Substitution, Interface Segregation, Dependency Inversion) e sugira melhorias.]",
+    "componentization": "Componentização:\n  [Avalie a estrutura de componentes do código, a separação de responsabilidades e a reutilização. Sugira melhorias na organização dos componentes.]",
+    "optimization": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
+    "algorithmic complexity": "Otimização (BIG O):\n  [Analise a complexidade algorítmica (Big O) do código e sugira otimizações para melhorar a eficiência e o desempenho.]",
+    "duplication": "Duplicação:\n  [Identifique código duplicado ou repetitivo e sugira refatorações para melhorar a reutilização e manutenibilidade.]",
+    "language best practices": "Boas práticas da Linguagem:\n  [Avalie se o código segue as boas práticas e convenções da linguagem de programação utilizada. Sugira melhorias específicas da linguagem.]",
+    "framework best practices": "Boas práticas do Framework:\n  [Avalie se o código segue as boas práticas e padrões recomendados do framework utilizado. Sugira melhorias específicas do framework.]"
+}
+
+GENERAL_SECTION = "Considerações gerais:\n  [Faça recomendações gerais para melhorar o código, como modularização, legibilidade, uso de boas práticas, etc.]"
+
+
+class CompiledPrompt(BaseModel):
+    key: str
+    analysis_types: List[str]
+    prefix: str
+
+    def for_file(self, label: str) -> str:
+        """
+        Prompt de um arquivo: o prefixo compartilhado seguido da identificação do arquivo.
+
+        O código em si é anexado ao final pelo LLMGateway, uma única vez.
+        """
+        return f"{self.prefix}\n- Codigo: {label}\n"
+
+    def for_batch(self, labels: List[str]) -> str:
+        """
+        Prompt de um lote de arquivos: o prefixo compartilhado, os arquivos do lote e o pedido
+        de uma seção por arquivo, que permite separar a resposta de cada um.
+        """
+        files = "\n".join(f"  - {label}" for label in labels)
+        return (
+            f"{self.prefix}\n- Codigos ({len(labels)} arquivos, cada um iniciado por \"# File: <arquivo>\"):\n{files}\n"
+            f"Responda com uma seção para cada arquivo, na mesma ordem, iniciada pela linha "
+            f"\"{BATCH_HEADER}<arquivo>\" com o nome exatamente como acima, seguida da análise no formato do template.\n"
+        )
+
+    def with_context(self, context: str) -> "CompiledPrompt":
+        """
+        Prompt com uma seção comum a todas as requisições do job (o contexto do repositório)
+        acrescentada ao prefixo, para que ela também entre no cache de contexto.
+        """
+        if not context:
+            return self
+        key = hashlib.sha256(f"{self.key}\0{context}".encode('utf-8')).hexdigest()
+        return CompiledPrompt(key=key, analysis_types=self.analysis_types, prefix=self.prefix + context)
+
+
+class PromptCompiler:
+    """
+    Resolve uma vez por job os tipos de análise e as seções do template a partir do prompt do usuário.
+
+    O resultado fica em cache por hash do prompt e versão do template. O texto compilado é
+    um prefixo estável (instruções, prompt do usuário, template e linguagem) ao qual cada
+    requisição acrescenta apenas o arquivo e o código, o que permite cache de prefixo no provedor.
+    """
+
+    _cache: "OrderedDict[str, CompiledPrompt]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, language: Optional[str] = None) -> str:
+        payload = f"{TEMPLATE_VERSION}\0{language or ''}\0{prompt}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def compile(prompt: str, language: Optional[str] = None) -> CompiledPrompt:
+        """
+        Compila (ou obtém do cache) o prompt de análise.
+
+        Args:
+            prompt: Prompt personalizado do usuário
+            language: Linguagem informada nas preferências do usuário
+
+        Returns:
+            CompiledPrompt: Prefixo compartilhado pelas requisições do job
+        """
+        key = PromptCompiler.key(prompt, language)
+
+        with PromptCompiler._lock:
+            compiled = PromptCompiler._cache.get(key)
+            if compiled is not None:
+                PromptCompiler._cache.move_to_end(key)
+                return compiled
+
+        analysis_types = PromptCompiler.analysis_types(prompt)
+        # Tipos diferentes podem usar a mesma seção (performance e big o, por exemplo): cada seção entra uma vez
+        sections = list(dict.fromkeys(
+            SECTION_TEMPLATES.get(analysis_type) or (
+                f"{analysis_type.replace('_', ' ').title()}:\n  [Analise o código em relação a {analysis_type} e forneça sugestões de melhoria.]"
+            )
+            for analysis_type in analysis_types
+        ))
+        sections.append(GENERAL_SECTION)
+
+        language_info = f"\nO código está escrito em {language}.\n" if language else ""
+        template_text = "\n\n".join(sections)
+        prefix = f"""
+Você é um expert em análise de código. Analise o código ao final desta mensagem e forneça feedback seguindo exatamente o formato abaixo.
+
+{prompt}
+
+Formate sua resposta seguindo EXATAMENTE este template:
+
+{template_text}
+{language_info}"""
+
+        compiled = CompiledPrompt(key=key, analysis_types=analysis_types, prefix=prefix)
+        logger.info(f"[PROMPT-COMPILER] Tipos de análise: {', '.join(analysis_types) or 'nenhum'}")
+        logger.info(f"[PROMPT-COMPILER] Prompt compilado (versão {TEMPLATE_VERSION}):\n{'-'*50}\n{prefix}\n{'-'*50}")
+
+        with PromptCompiler._lock:
+            PromptCompiler._cache[key] = compiled
+            while len(PromptCompiler._cache) > MAX_COMPILED_PROMPTS:
+                PromptCompiler._cache.popitem(last=False)
+
+        return compiled
+
+    @staticmethod
+    def analysis_types(prompt: str) -> List[str]:
+        """
+        Extrai os tipos de análise do prompt, sem repetições e em ordem estável.
+        """
+        lowered = prompt.lower()
+
+        if ANALYSIS_MARKER in lowered:
+            # Considerar apenas o trecho após o marcador, até o próximo ponto
+            analysis_part = lowered.split(ANALYSIS_MARKER)[1].split(".")[0]
+            terms = ANALYSIS_TERMS
+        else:
+            analysis_part = lowered
+            terms = FALLBACK_KEYWORDS
+
+        analysis_types = []
+        for term, analysis_type in terms.items():
+            if term in analysis_part and analysis_type not in analysis_types:
+                analysis_types.append(analysis_type)
+
+        return analysis_types
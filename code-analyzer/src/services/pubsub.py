@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 
 from ..utils.environment import Environment
 from .request_processor import RequestProcessor
+from .worker_pool import WorkerPool
 load_dotenv()
 class PubSubClient:
 
@@ -40,10 +41,15 @@ class PubSubClient:
         if not self.subscription_id:
             raise ValueError("Assinatura (subscription_id) não foi fornecida.")
 
+        # Mensagens retidas limitadas pelo controle de fluxo e jobs simultâneos pelo executor do pool
+        pool = WorkerPool.default()
         streaming_pull_future = self.subscriber.subscribe(
-            self.subscription_path, callback=self.request_processor.process_message
+            self.subscription_path,
+            callback=self.request_processor.process_message,
+            flow_control=pool.flow_control(),
+            scheduler=pool.scheduler()
         )
-        print(f"Escutando na assinatura: {self.subscription_path}")
+        print(f"Escutando na assinatura: {self.subscription_path} ({pool.max_jobs} job(s) simultâneo(s), até {pool.max_messages} mensagem(ns) retida(s))")
 
         try:
             streaming_pull_future.result(timeout=timeout)
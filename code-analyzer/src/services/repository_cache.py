@@ -0,0 +1,301 @@
+import os
+import re
+import time
+import fcntl
+import shutil
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from git import Repo
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Orçamento padrão de disco para os espelhos: 10 GiB
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+# Limite de objetos soltos acima do qual o `gc --auto` compacta o espelho (o padrão do git)
+DEFAULT_GC_AUTO = 6700
+
+
+class RepositoryCache:
+    """
+    Cache em disco de espelhos (bare mirrors) dos repositórios remotos.
+
+    Cada repositório é identificado por provedor/owner/repo e mantido como um
+    espelho bare que recebe apenas `fetch` incremental. Cada job recebe um clone
+    local `--shared` do espelho, que não copia objetos e é descartado ao final.
+
+    O gc automático do git fica desligado no espelho; após cada fetch, um `gc --auto`
+    roda sob o lock de sincronização, para que os packs não cresçam sem limite.
+    """
+
+    _default: Optional["RepositoryCache"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None,
+                 gc_auto: Optional[int] = None):
+        self.root = root or Environment.get("REPO_CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-mirrors"
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            Environment.get("REPO_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES
+        )
+        self.gc_auto = gc_auto if gc_auto is not None else int(
+            Environment.get("REPO_CACHE_GC_AUTO") or DEFAULT_GC_AUTO
+        )
+        self._guard = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._leases: Dict[str, List] = {}
+        self._checkouts: Dict[str, str] = {}
+
+    @classmethod
+    def default(cls) -> "RepositoryCache":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("REPO_CACHE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def build_key(provider: str, owner: str, repo: str) -> str:
+        """
+        Monta a chave do espelho no formato provedor/owner/repo.
+
+        Args:
+            provider: Tipo do repositório (Github, Gitlab, ...)
+            owner: Dono do repositório
+            repo: Nome do repositório
+
+        Returns:
+            str: Chave normalizada, segura para uso como caminho
+        """
+        parts = [str(getattr(provider, "value", provider)), owner, repo]
+        if not all(parts):
+            raise ValueError("Provedor, owner e repo são obrigatórios para a chave do cache")
+        return "/".join(re.sub(r"[^A-Za-z0-9._-]", "_", part).lower() for part in parts)
+
+    def mirror_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.git")
+
+    def has_mirror(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.mirror_path(key), "HEAD"))
+
+    def checkout(self, key: str, remote_url: str, destination: str) -> Repo:
+        """
+        Atualiza o espelho do repositório e cria uma cópia de trabalho para o job.
+
+        Args:
+            key: Chave do repositório (ver build_key)
+            remote_url: URL remota, incluindo credenciais se necessário
+            destination: Diretório vazio onde a cópia de trabalho será criada
+
+        Returns:
+            Repo: Repositório da cópia de trabalho, com `origin` apontando para o espelho
+        """
+        mirror = self.mirror_path(key)
+        lease = self._acquire_lease(key)
+
+        try:
+            with self._sync_lock(key):
+                self._sync_mirror(mirror, remote_url)
+                self._touch(mirror)
+
+            start = time.time()
+            repo = Repo.clone_from(mirror, destination, shared=True)
+            logger.info(f"[REPO-CACHE] Cópia de trabalho criada a partir do espelho em {time.time() - start:.2f}s: {destination}")
+        except Exception:
+            self._release_lease(key, lease)
+            raise
+
+        with self._guard:
+            self._checkouts[os.path.abspath(destination)] = key
+
+        self.evict()
+        return repo
+
+    def release(self, destination: str):
+        """
+        Libera o espelho usado por uma cópia de trabalho, permitindo sua remoção pelo LRU.
+
+        Args:
+            destination: Diretório retornado por checkout
+        """
+        with self._guard:
+            key = self._checkouts.pop(os.path.abspath(destination), None)
+            lease = self._leases[key].pop() if key and self._leases.get(key) else None
+
+        if lease is not None:
+            self._close_lease(lease)
+
+    def evict(self):
+        """Remove os espelhos menos usados recentemente até caber no orçamento de disco."""
+        mirrors = self._list_mirrors()
+        total = sum(size for _, _, size in mirrors)
+
+        if total <= self.max_bytes:
+            return
+
+        for key, last_used, size in sorted(mirrors, key=lambda item: item[1]):
+            if total <= self.max_bytes:
+                break
+
+            with self._guard:
+                if self._leases.get(key):
+                    continue
+
+            if self._remove_mirror(key):
+                total -= size
+                logger.info(f"[REPO-CACHE] Espelho removido pelo LRU: {key} ({size} bytes)")
+
+    def _sync_mirror(self, mirror: str, remote_url: str):
+        start = time.time()
+
+        if os.path.exists(os.path.join(mirror, "HEAD")):
+            repo = Repo(mirror)
+            repo.git.fetch(remote_url, "--prune", "+refs/*:refs/*")
+            logger.info(f"[REPO-CACHE] Espelho atualizado via fetch incremental em {time.time() - start:.2f}s")
+            self._collect_garbage(repo)
+            return
+
+        shutil.rmtree(mirror, ignore_errors=True)
+        os.makedirs(os.path.dirname(mirror), exist_ok=True)
+
+        try:
+            repo = Repo.clone_from(remote_url, mirror, mirror=True)
+            # Não persistir credenciais no disco e evitar gc automático durante leituras
+            repo.git.remote("set-url", "origin", RepositoryCache._strip_credentials(remote_url))
+            repo.git.config("gc.auto", "0")
+        except Exception:
+            shutil.rmtree(mirror, ignore_errors=True)
+            raise
+
+        logger.info(f"[REPO-CACHE] Espelho criado em {time.time() - start:.2f}s: {mirror}")
+
+    def _collect_garbage(self, repo: Repo):
+        """
+        Compacta o espelho quando há objetos soltos ou packs demais (`gc --auto`).
+
+        Chamado com o lock de sincronização adquirido. O gc roda em primeiro plano para terminar
+        antes de o lock ser liberado. Objetos que ficaram inalcançáveis após o `--prune` só são
+        removidos depois do prazo do git (2 semanas), então as cópias `--shared` em uso não
+        perdem objetos. Falhas do gc não impedem o checkout.
+        """
+        if self.gc_auto <= 0:
+            return
+
+        start = time.time()
+        try:
+            repo.git(c=[f"gc.auto={self.gc_auto}", "gc.autoDetach=false"]).gc("--auto", "--quiet")
+        except Exception as e:
+            logger.warning(f"[REPO-CACHE] Falha no gc do espelho: {str(e)}")
+            return
+        logger.info(f"[REPO-CACHE] gc do espelho verificado em {time.time() - start:.2f}s")
+
+    @staticmethod
+    def _strip_credentials(url: str) -> str:
+        return re.sub(r"//[^/@]+@", "//", url)
+
+    @staticmethod
+    def _touch(mirror: str):
+        marker = os.path.join(mirror, "last-used")
+        with open(marker, "a"):
+            pass
+        os.utime(marker, None)
+
+    def _lock_file(self, key: str, name: str):
+        path = os.path.join(self.root, f"{key}.{name}.lock")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, "a+")
+
+    @contextmanager
+    def _sync_lock(self, key: str):
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            handle = self._lock_file(key, "sync")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+
+    def _acquire_lease(self, key: str):
+        # O lock compartilhado impede que outro processo remova o espelho em uso
+        handle = self._lock_file(key, "lease")
+        fcntl.flock(handle, fcntl.LOCK_SH)
+
+        with self._guard:
+            self._leases.setdefault(key, []).append(handle)
+
+        return handle
+
+    def _release_lease(self, key: str, lease):
+        with self._guard:
+            if lease in self._leases.get(key, []):
+                self._leases[key].remove(lease)
+        self._close_lease(lease)
+
+    @staticmethod
+    def _close_lease(lease):
+        try:
+            fcntl.flock(lease, fcntl.LOCK_UN)
+        finally:
+            lease.close()
+
+    def _remove_mirror(self, key: str) -> bool:
+        lease = self._lock_file(key, "lease")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lease.close()
+            return False
+
+        try:
+            with self._sync_lock(key):
+                shutil.rmtree(self.mirror_path(key), ignore_errors=True)
+            return True
+        finally:
+            self._close_lease(lease)
+
+    def _list_mirrors(self) -> List[Tuple[str, float, int]]:
+        mirrors = []
+
+        if not os.path.isdir(self.root):
+            return mirrors
+
+        for root, dirs, _ in os.walk(self.root):
+            for name in list(dirs):
+                if not name.endswith(".git"):
+                    continue
+
+                dirs.remove(name)
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, self.root)[:-len(".git")]
+                marker = os.path.join(path, "last-used")
+                last_used = os.path.getmtime(marker) if os.path.exists(marker) else 0.0
+                mirrors.append((key, last_used, RepositoryCache._disk_usage(path)))
+
+        return mirrors
+
+    @staticmethod
+    def _disk_usage(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for file in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file))
+                except OSError:
+                    continue
+        return total
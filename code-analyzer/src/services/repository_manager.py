@@ -1,11 +1,16 @@
 import os
+import re
+import json
 import shutil
 import tempfile
 import logging
+import requests
 from git import Repo, GitCommandError
 import git
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from ..adapters.dtos import UserPreferDTO
+from ..utils import Environment
+from .repository_cache import RepositoryCache
 
 # Initialize logger at module level
 logger = logging.getLogger(__name__)
@@ -94,8 +99,13 @@ class RepositoryManager:
             logger.info(f"[REPO-MANAGER] Clonando repositório: {user_prefer.repository.owner}/{user_prefer.repository.repo}")
             
             try:
-                # Tentar clonar o repositório
-                repo = Repo.clone_from(repo_url, temp_dir)
+                # Para PRs, tentar primeiro o clone parcial restrito aos arquivos modificados
+                if analyze_pr_only and user_prefer.repository.pull_request_number:
+                    if RepositoryManager._try_sparse_pr_clone(repo_url, temp_dir, user_prefer):
+                        return temp_dir
+                
+                # Tentar clonar o repositório (via cache de espelhos quando habilitado)
+                repo = RepositoryManager._clone(repo_url, temp_dir, user_prefer)
                 logger.info("[REPO-MANAGER] Repositório clonado com sucesso")
 
                 if analyze_pr_only and user_prefer.repository.pull_request_number:
@@ -121,9 +131,181 @@ class RepositoryManager:
         except Exception as e:
             logger.error(f"[REPO-MANAGER] Erro ao clonar repositório: {str(e)}")
             if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+                RepositoryManager.cleanup_repository(temp_dir)
             raise
     
+    @staticmethod
+    def _clone(repo_url: str, destination: str, user_prefer: UserPreferDTO) -> git.Repo:
+        """
+        Clona o repositório no diretório de destino, reaproveitando o espelho local quando possível.
+        
+        Args:
+            repo_url: URL do repositório com token
+            destination: Diretório vazio de destino
+            user_prefer: Preferências do usuário
+            
+        Returns:
+            git.Repo: Repositório clonado
+        """
+        if RepositoryCache.enabled():
+            try:
+                key = RepositoryCache.build_key(
+                    user_prefer.repository.type,
+                    user_prefer.repository.owner,
+                    user_prefer.repository.repo
+                )
+                logger.info(f"[REPO-MANAGER] Usando cache de espelhos para: {key}")
+                return RepositoryCache.default().checkout(key, repo_url, destination)
+            except Exception as e:
+                logger.warning(f"[REPO-MANAGER] Falha no cache de espelhos, realizando clone completo: {str(e)}")
+                shutil.rmtree(destination, ignore_errors=True)
+                os.makedirs(destination, exist_ok=True)
+        
+        return Repo.clone_from(repo_url, destination)
+
+    @staticmethod
+    def _sparse_pr_clone_enabled() -> bool:
+        value = Environment.get("REPO_SPARSE_PR_CLONE")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def _try_sparse_pr_clone(repo_url: str, destination: str, user_prefer: UserPreferDTO) -> bool:
+        """
+        Tenta o clone parcial do PR (sem blobs, raso e com sparse checkout dos arquivos modificados).
+        
+        Args:
+            repo_url: URL do repositório com token
+            destination: Diretório vazio de destino
+            user_prefer: Preferências do usuário
+            
+        Returns:
+            bool: True se o clone parcial foi realizado, False para usar o clone completo
+        """
+        if not RepositoryManager._sparse_pr_clone_enabled():
+            return False
+        
+        # Se o espelho local já existe, a cópia a partir dele é mais barata que qualquer acesso remoto
+        if RepositoryCache.enabled():
+            try:
+                key = RepositoryCache.build_key(
+                    user_prefer.repository.type,
+                    user_prefer.repository.owner,
+                    user_prefer.repository.repo
+                )
+                if RepositoryCache.default().has_mirror(key):
+                    logger.info(f"[REPO-MANAGER] Espelho local disponível para {key}, ignorando clone parcial")
+                    return False
+            except ValueError:
+                pass
+        
+        # Reaproveitar a lista já obtida pelo provedor de conteúdo, se houver
+        modified_files = user_prefer.modified_files or RepositoryManager._list_pr_files_from_api(user_prefer)
+        if not modified_files:
+            logger.info("[REPO-MANAGER] Lista de arquivos do PR indisponível, usando clone completo")
+            return False
+        
+        try:
+            RepositoryManager._sparse_clone_pr(
+                repo_url, destination, user_prefer.repository.pull_request_number, modified_files
+            )
+            user_prefer.modified_files = modified_files
+            return True
+        except Exception as e:
+            logger.warning(f"[REPO-MANAGER] Falha no clone parcial do PR, usando clone completo: {str(e)}")
+            shutil.rmtree(destination, ignore_errors=True)
+            os.makedirs(destination, exist_ok=True)
+            return False
+
+    @staticmethod
+    def _sparse_clone_pr(repo_url: str, destination: str, pr_number: int, paths: List[str]) -> git.Repo:
+        """
+        Busca apenas o head do PR (depth 1, sem blobs) e faz checkout somente dos caminhos informados.
+        
+        Args:
+            repo_url: URL do repositório com token
+            destination: Diretório vazio de destino
+            pr_number: Número do PR
+            paths: Caminhos modificados no PR
+            
+        Returns:
+            git.Repo: Repositório com o head do PR em checkout
+        """
+        logger.info(f"[REPO-MANAGER] Clone parcial do PR #{pr_number} com {len(paths)} arquivos no sparse checkout")
+        
+        repo = Repo.init(destination)
+        repo.git.remote("add", "origin", repo_url)
+        
+        # Configurar o remoto como promisor para que os blobs sejam baixados sob demanda
+        repo.git.config("core.repositoryformatversion", "1")
+        repo.git.config("extensions.partialClone", "origin")
+        repo.git.config("remote.origin.promisor", "true")
+        repo.git.config("remote.origin.partialclonefilter", "blob:none")
+        
+        # Sparse checkout no modo padrão (padrões estilo .gitignore) ancorado na raiz
+        repo.git.config("core.sparseCheckout", "true")
+        sparse_file = os.path.join(repo.git_dir, "info", "sparse-checkout")
+        os.makedirs(os.path.dirname(sparse_file), exist_ok=True)
+        with open(sparse_file, "w", encoding="utf-8") as handle:
+            for path in paths:
+                handle.write("/" + re.sub(r"([\\*?\[\]!#])", r"\\\1", path) + "\n")
+        
+        local_branch = f"pr_{pr_number}"
+        repo.git.fetch(
+            "--filter=blob:none", "--depth=1", "--no-tags", "origin",
+            f"+refs/pull/{pr_number}/head:refs/heads/{local_branch}"
+        )
+        repo.git.checkout(local_branch)
+        
+        logger.info(f"[REPO-MANAGER] Checkout parcial do PR #{pr_number} concluído")
+        return repo
+
+    @staticmethod
+    def _list_pr_files_from_api(user_prefer: UserPreferDTO) -> Optional[List[str]]:
+        """
+        Obtém a lista de arquivos modificados no PR via API do GitHub (com paginação).
+        
+        Args:
+            user_prefer: Preferências do usuário
+            
+        Returns:
+            Optional[List[str]]: Arquivos modificados ou None se não for possível consultar a API
+        """
+        if user_prefer.repository.type != 'Github' or not user_prefer.repository.owner or not user_prefer.repository.repo:
+            return None
+        
+        pr_number = user_prefer.repository.pull_request_number
+        api_url = f"https://api.github.com/repos/{user_prefer.repository.owner}/{user_prefer.repository.repo}/pulls/{pr_number}/files"
+        headers = {
+            "Authorization": f"token {user_prefer.token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        
+        try:
+            logger.info(f"[REPO-MANAGER] Obtendo arquivos do PR via API GitHub: {api_url}")
+            modified_files = []
+            page = 1
+            
+            while True:
+                response = requests.get(api_url, headers=headers, params={"per_page": 100, "page": page})
+                
+                if response.status_code != 200:
+                    logger.error(f"[REPO-MANAGER] Erro ao obter arquivos via API GitHub. Status: {response.status_code}, Resposta: {response.text}")
+                    return None
+                
+                files_data = response.json()
+                modified_files.extend(file_data['filename'] for file_data in files_data)
+                
+                if len(files_data) < 100:
+                    break
+                page += 1
+            
+            logger.info(f"[REPO-MANAGER] {len(modified_files)} arquivos modificados encontrados via API GitHub")
+            return modified_files
+            
+        except Exception as e:
+            logger.error(f"[REPO-MANAGER] Erro ao usar API GitHub para obter arquivos do PR: {str(e)}")
+            return None
+
     @staticmethod
     def _fetch_pr_files(repo: git.Repo, user_prefer: UserPreferDTO):
         """
@@ -161,75 +343,53 @@ class RepositoryManager:
             
             # GitHub PR access strategy 1: Use diretamente a GitHub API para obter arquivos modificados
             # Este é o método mais confiável, mas requer integração direta com a API GitHub
-            if user_prefer.repository.type == 'Github' and user_prefer.repository.owner and user_prefer.repository.repo:
+            modified_files = RepositoryManager._list_pr_files_from_api(user_prefer)
+            if modified_files is not None:
+                # Armazenar os arquivos modificados no objeto user_prefer para uso posterior
+                user_prefer.modified_files = modified_files
+                
+                # Log detalhado dos arquivos encontrados
+                logger.info(f"[REPO-MANAGER] ===== ARQUIVOS MODIFICADOS NO PR #{pr_number} (via API GitHub) =====")
+                for i, file in enumerate(modified_files, 1):
+                    logger.info(f"[REPO-MANAGER]   {i}. {file}")
+                
+                # Imprimir em formato JSON para facilitar cópia
+                logger.info(f"[REPO-MANAGER] RESULTADO JSON: {json.dumps(modified_files, indent=2)}")
+                
+                # Tentar fazer checkout do PR para ter acesso às modificações
                 try:
-                    import requests
-                    
-                    # Construir URL da API 
-                    api_url = f"https://api.github.com/repos/{user_prefer.repository.owner}/{user_prefer.repository.repo}/pulls/{pr_number}/files"
-                    headers = {
-                        "Authorization": f"token {user_prefer.token}",
-                        "Accept": "application/vnd.github.v3+json"
-                    }
-                    
-                    logger.info(f"[REPO-MANAGER] Obtendo arquivos do PR via API GitHub: {api_url}")
-                    response = requests.get(api_url, headers=headers)
-                    
-                    if response.status_code == 200:
-                        files_data = response.json()
-                        modified_files = [file_data['filename'] for file_data in files_data]
-                        logger.info(f"[REPO-MANAGER] {len(modified_files)} arquivos modificados encontrados via API GitHub")
-                        
-                        # Armazenar os arquivos modificados no objeto user_prefer para uso posterior
-                        user_prefer.modified_files = modified_files
-                        
-                        # Log detalhado dos arquivos encontrados
-                        logger.info(f"[REPO-MANAGER] ===== ARQUIVOS MODIFICADOS NO PR #{pr_number} (via API GitHub) =====")
-                        for i, file in enumerate(modified_files, 1):
-                            logger.info(f"[REPO-MANAGER]   {i}. {file}")
-                        
-                        # Imprimir em formato JSON para facilitar cópia
-                        import json
-                        logger.info(f"[REPO-MANAGER] RESULTADO JSON: {json.dumps(modified_files, indent=2)}")
-                        
-                        # Tentar fazer checkout do PR para ter acesso às modificações
+                    # Try multiple reference formats
+                    for ref_format in [
+                        f"refs/pull/{pr_number}/head",
+                        f"pull/{pr_number}/head",
+                        f"pr_{pr_number}"
+                    ]:
                         try:
-                            # Try multiple reference formats
-                            for ref_format in [
-                                f"refs/pull/{pr_number}/head",
-                                f"pull/{pr_number}/head",
-                                f"pr_{pr_number}"
-                            ]:
-                                try:
-                                    logger.info(f"[REPO-MANAGER] Tentando checkout para referência: {ref_format}")
-                                    repo.git.checkout(ref_format)
-                                    logger.info(f"[REPO-MANAGER] Checkout bem-sucedido para: {ref_format}")
-                                    return modified_files
-                                except Exception as e:
-                                    logger.warning(f"[REPO-MANAGER] Não foi possível fazer checkout de {ref_format}: {str(e)}")
-                            
-                            # Se nenhum checkout funcionou, tente criar um branch local
-                            try:
-                                logger.info(f"[REPO-MANAGER] Criando branch local para o PR #{pr_number}")
-                                repo.git.fetch('origin', f"pull/{pr_number}/head:pr_{pr_number}")
-                                repo.git.checkout(f"pr_{pr_number}")
-                                logger.info(f"[REPO-MANAGER] Checkout bem-sucedido para branch local pr_{pr_number}")
-                                return modified_files
-                            except Exception as e:
-                                logger.warning(f"[REPO-MANAGER] Não foi possível criar branch local: {str(e)}")
-                            
-                            # Mesmo sem checkout bem-sucedido, retornamos os arquivos da API
-                            logger.warning("[REPO-MANAGER] Não foi possível fazer checkout do PR, mas os arquivos foram obtidos via API")
+                            logger.info(f"[REPO-MANAGER] Tentando checkout para referência: {ref_format}")
+                            repo.git.checkout(ref_format)
+                            logger.info(f"[REPO-MANAGER] Checkout bem-sucedido para: {ref_format}")
                             return modified_files
-                            
                         except Exception as e:
-                            logger.warning(f"[REPO-MANAGER] Erro ao fazer checkout do PR após obter arquivos via API: {str(e)}")
-                            # Ainda temos os arquivos da API, podemos prosseguir
-                            return modified_files
-                    else:
-                        logger.error(f"[REPO-MANAGER] Erro ao obter arquivos via API GitHub. Status: {response.status_code}, Resposta: {response.text}")
+                            logger.warning(f"[REPO-MANAGER] Não foi possível fazer checkout de {ref_format}: {str(e)}")
+                    
+                    # Se nenhum checkout funcionou, tente criar um branch local
+                    try:
+                        logger.info(f"[REPO-MANAGER] Criando branch local para o PR #{pr_number}")
+                        repo.git.fetch('origin', f"pull/{pr_number}/head:pr_{pr_number}")
+                        repo.git.checkout(f"pr_{pr_number}")
+                        logger.info(f"[REPO-MANAGER] Checkout bem-sucedido para branch local pr_{pr_number}")
+                        return modified_files
+                    except Exception as e:
+                        logger.warning(f"[REPO-MANAGER] Não foi possível criar branch local: {str(e)}")
+                    
+                    # Mesmo sem checkout bem-sucedido, retornamos os arquivos da API
+                    logger.warning("[REPO-MANAGER] Não foi possível fazer checkout do PR, mas os arquivos foram obtidos via API")
+                    return modified_files
+                    
                 except Exception as e:
-                    logger.error(f"[REPO-MANAGER] Erro ao usar API GitHub para obter arquivos do PR: {str(e)}")
+                    logger.warning(f"[REPO-MANAGER] Erro ao fazer checkout do PR após obter arquivos via API: {str(e)}")
+                    # Ainda temos os arquivos da API, podemos prosseguir
+                    return modified_files
             
             # GitHub PR access strategy 2: Fetch the PR and create a local branch
             if user_prefer.repository.type == 'Github':
@@ -291,6 +451,9 @@ class RepositoryManager:
             repo_path: Caminho do diretório temporário
         """
         try:
+            # Liberar o espelho associado (se houver) antes de remover a cópia de trabalho
+            RepositoryCache.default().release(repo_path)
+            
             if repo_path and os.path.exists(repo_path):
                 shutil.rmtree(repo_path)
                 logger.info(f"[REPO-MANAGER] Diretório temporário removido: {repo_path}")
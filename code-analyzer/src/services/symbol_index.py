@@ -0,0 +1,318 @@
+import os
+import re
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from ..domain.code_splitter import CodeSplitter, MODULE_SYMBOL
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+
+logger = logging.getLogger(__name__)
+
+# Linhas de cada definição guardadas no índice (o restante é omitido ao montar o contexto)
+MAX_SYMBOL_LINES = 80
+
+# Nomes chamados: "nome(" ou ".nome("
+CALL = re.compile(r'(?<![\w$])([A-Za-z_$][\w$]*)\s*\(')
+
+# Palavra que antecede um nome declarado (a definição não é uma chamada)
+DECLARATION = re.compile(r'\b(?:def|function\*?|func|fn|class|interface|struct)\s+$')
+
+# Palavras reservadas que aparecem antes de "(" e não são chamadas
+NOT_CALLS = {
+    'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'def', 'class', 'print', 'super',
+    'elif', 'with', 'except', 'and', 'or', 'not', 'in', 'is', 'lambda', 'await', 'async', 'new', 'typeof',
+    'sizeof', 'func', 'fn', 'match', 'assert', 'yield', 'throw', 'len', 'str', 'int', 'list', 'dict', 'set',
+}
+
+# Importações por linguagem: (regex, grupo do módulo, grupo dos nomes importados)
+IMPORTS = [
+    (re.compile(r'^\s*from\s+([\w.]+)\s+import\s+(\([^)]*\)|[\w \t,*]+)', re.M), 1, 2),
+    (re.compile(r'^\s*import\s+([\w.]+)(?:\s+as\s+\w+)?\s*$', re.M), 1, None),
+    (re.compile(r'''^\s*import\s+(?:type\s+)?(?:\{([^}]*)\}|[\w$*\s,]+?)\s*from\s+['"]([^'"]+)['"]''', re.M), 2, 1),
+    (re.compile(r'''require\(\s*['"]([^'"]+)['"]\s*\)'''), 1, None),
+    (re.compile(r'^\s*import\s+(?:static\s+)?([\w.]+)(?:\.\*)?\s*;', re.M), 1, None),
+    (re.compile(r'''^\s*(?:import\s+)?(?:\w+\s+)?"([\w./-]+)"\s*$''', re.M), 1, None),
+]
+
+
+class IndexedSymbol(BaseModel):
+    path: str
+    name: str
+    qualified_name: str
+    start_line: int
+    end_line: int
+    text: str
+
+
+class SymbolIndex:
+    """
+    Índice das definições de cada repositório: onde cada símbolo está definido, quais
+    nomes ele chama e quais módulos cada arquivo importa.
+
+    É atualizado pelas análises de projeto inteiro (apenas os arquivos cujo SHA mudou) e
+    consultado pelas análises de PR para buscar definições relacionadas aos arquivos alterados.
+    """
+
+    _default: Optional["SymbolIndex"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Environment.get("SYMBOL_INDEX_PATH") or os.path.join(
+            tempfile.gettempdir(), "code-analyzer-symbol-index.sqlite3"
+        )
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._splitter = CodeSplitter()
+
+    @classmethod
+    def default(cls) -> "SymbolIndex":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def calls(text: str) -> Set[str]:
+        return {
+            match.group(1) for match in CALL.finditer(text)
+            if match.group(1) not in NOT_CALLS and len(match.group(1)) > 2
+            and not DECLARATION.search(text, max(0, match.start() - 16), match.start())
+        }
+
+    @staticmethod
+    def imports(text: str) -> List[Tuple[str, List[str]]]:
+        """
+        Returns:
+            List[Tuple[str, List[str]]]: (módulo, nomes importados) de cada importação
+        """
+        found = []
+        for pattern, module_group, names_group in IMPORTS:
+            for match in pattern.finditer(text):
+                names = []
+                if names_group and match.group(names_group):
+                    names = [n.strip().split(' as ')[0].strip() for n in match.group(names_group).strip('()').split(',')]
+                found.append((match.group(module_group), [n for n in names if n and n != '*']))
+        return found
+
+    def definitions(self, text: str, language: Optional[str]) -> List[IndexedSymbol]:
+        """
+        Definições de nível superior e, dentro delas, as de primeiro nível (métodos).
+        """
+        lines = text.splitlines(keepends=True)
+        symbols = []
+        for symbol in self._splitter.symbols(text, language):
+            if symbol.name == MODULE_SYMBOL:
+                continue
+            symbols.append(SymbolIndex._symbol(lines, symbol.name, symbol.name, symbol.start, symbol.end))
+
+            # Pular decoradores e anotações até a assinatura
+            body_start = symbol.start
+            while body_start < symbol.end - 1 and lines[body_start].lstrip().startswith('@'):
+                body_start += 1
+            indent = CodeSplitter._inner_indent(lines, body_start, symbol.end)
+            if indent is None:
+                continue
+            starts = [
+                body_start + 1 + i
+                for i in SourceFiles.definition_starts(lines[body_start + 1:symbol.end], language, indent)
+            ]
+            for start, end in zip(starts, starts[1:] + [symbol.end]):
+                name = CodeSplitter.definition_name(lines, start)
+                symbols.append(SymbolIndex._symbol(lines, name, f"{symbol.name}.{name}", start, end))
+        return symbols
+
+    def update(self, repository: str, path: str, text: str, language: Optional[str], blob_sha: str) -> bool:
+        """
+        Indexa um arquivo, se o conteúdo mudou desde a última indexação.
+
+        Returns:
+            bool: True se o arquivo foi (re)indexado
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT blob_sha FROM files WHERE repository = ? AND path = ?", (repository, path)
+            ).fetchone()
+        if row is not None and row[0] == blob_sha:
+            return False
+
+        symbols = self.definitions(text, language)
+        imports = SymbolIndex.imports(text)
+
+        with self._lock:
+            connection = self._db()
+            try:
+                self._delete(connection, repository, path)
+                connection.execute("INSERT INTO files (repository, path, blob_sha) VALUES (?, ?, ?)", (repository, path, blob_sha))
+                for symbol in symbols:
+                    cursor = connection.execute(
+                        "INSERT INTO symbols (repository, path, name, qualified_name, start_line, end_line, text) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (repository, path, symbol.name, symbol.qualified_name, symbol.start_line, symbol.end_line, symbol.text)
+                    )
+                    connection.executemany(
+                        "INSERT INTO calls (symbol_id, name) VALUES (?, ?)",
+                        [(cursor.lastrowid, name) for name in SymbolIndex.calls(symbol.text) if name != symbol.name]
+                    )
+                connection.executemany(
+                    "INSERT INTO imports (repository, path, module) VALUES (?, ?, ?)",
+                    [(repository, path, module) for module, _ in imports]
+                )
+                connection.commit()
+            except sqlite3.Error:
+                connection.rollback()
+                raise
+        return True
+
+    def prune(self, repository: str, exists: Callable[[str], bool]) -> int:
+        """
+        Remove os arquivos que não existem mais no repositório.
+        """
+        with self._lock:
+            connection = self._db()
+            paths = [row[0] for row in connection.execute("SELECT path FROM files WHERE repository = ?", (repository,))]
+            removed = [path for path in paths if not exists(path)]
+            for path in removed:
+                self._delete(connection, repository, path)
+            connection.commit()
+        return len(removed)
+
+    def lookup(self, repository: str, names: Iterable[str], exclude_paths: Iterable[str] = ()) -> List[IndexedSymbol]:
+        """
+        Definições com os nomes informados, fora dos arquivos excluídos.
+        """
+        return self._select(
+            "SELECT path, name, qualified_name, start_line, end_line, text FROM symbols WHERE repository = ? AND name IN ({names})",
+            repository, names, exclude_paths
+        )
+
+    def callers(self, repository: str, names: Iterable[str], exclude_paths: Iterable[str] = ()) -> List[IndexedSymbol]:
+        """
+        Definições que chamam algum dos nomes informados.
+        """
+        return self._select(
+            "SELECT DISTINCT s.path, s.name, s.qualified_name, s.start_line, s.end_line, s.text FROM symbols s "
+            "JOIN calls c ON c.symbol_id = s.id WHERE s.repository = ? AND c.name IN ({names})",
+            repository, names, exclude_paths
+        )
+
+    def module_paths(self, repository: str, module: str, importer: str) -> List[str]:
+        """
+        Arquivos do repositório que correspondem a um módulo importado por importer.
+        """
+        if module.startswith(('./', '../')):
+            # Importação relativa de JavaScript/TypeScript (./x, ../x)
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), module)).replace(os.sep, '/')
+        elif module.startswith('.'):
+            # Importação relativa de Python (.x, ..x): cada ponto além do primeiro sobe um diretório
+            rest = module.lstrip('.')
+            directory = os.path.dirname(importer)
+            for _ in range(len(module) - len(rest) - 1):
+                directory = os.path.dirname(directory)
+            base = "/".join(part for part in [directory] + rest.split('.') if part)
+        else:
+            base = module.replace('.', '/') if '/' not in module else module
+
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT path FROM files WHERE repository = ? AND (path LIKE ? OR path LIKE ?)",
+                (repository, f"%{base}.%", f"%{base}/%")
+            ).fetchall()
+
+        paths = []
+        for (path,) in rows:
+            stem = os.path.splitext(path)[0]
+            if stem == base or stem.endswith(f"/{base}") or stem in (f"{base}/__init__", f"{base}/index") \
+                    or stem.endswith((f"/{base}/__init__", f"/{base}/index")):
+                paths.append(path)
+        return paths
+
+    def symbols_in(self, repository: str, paths: Iterable[str], names: Optional[Iterable[str]] = None) -> List[IndexedSymbol]:
+        paths = list(paths)
+        if not paths:
+            return []
+        query = (
+            "SELECT path, name, qualified_name, start_line, end_line, text FROM symbols "
+            f"WHERE repository = ? AND path IN ({','.join('?' * len(paths))}) AND name = qualified_name"
+        )
+        params = [repository] + paths
+        names = list(names or [])
+        if names:
+            query += f" AND name IN ({','.join('?' * len(names))})"
+            params += names
+        with self._lock:
+            rows = self._db().execute(query, params).fetchall()
+        return [SymbolIndex._row(row) for row in rows]
+
+    def stats(self, repository: str) -> Dict[str, int]:
+        with self._lock:
+            connection = self._db()
+            files = connection.execute("SELECT COUNT(*) FROM files WHERE repository = ?", (repository,)).fetchone()[0]
+            symbols = connection.execute("SELECT COUNT(*) FROM symbols WHERE repository = ?", (repository,)).fetchone()[0]
+        return {"files": files, "symbols": symbols}
+
+    def _select(self, query: str, repository: str, names: Iterable[str], exclude_paths: Iterable[str]) -> List[IndexedSymbol]:
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        excluded = set(exclude_paths)
+        with self._lock:
+            rows = self._db().execute(query.format(names=','.join('?' * len(names))), [repository] + names).fetchall()
+        return [SymbolIndex._row(row) for row in rows if row[0] not in excluded]
+
+    @staticmethod
+    def _symbol(lines: List[str], name: str, qualified_name: str, start: int, end: int) -> IndexedSymbol:
+        text = "".join(lines[start:min(end, start + MAX_SYMBOL_LINES)])
+        if end - start > MAX_SYMBOL_LINES:
+            text += "    ...\n"
+        return IndexedSymbol(
+            path="", name=name, qualified_name=qualified_name, start_line=start + 1, end_line=end, text=text
+        )
+
+    @staticmethod
+    def _row(row) -> IndexedSymbol:
+        return IndexedSymbol(
+            path=row[0], name=row[1], qualified_name=row[2], start_line=row[3], end_line=row[4], text=row[5]
+        )
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, repository: str, path: str):
+        connection.execute(
+            "DELETE FROM calls WHERE symbol_id IN (SELECT id FROM symbols WHERE repository = ? AND path = ?)", (repository, path)
+        )
+        connection.execute("DELETE FROM symbols WHERE repository = ? AND path = ?", (repository, path))
+        connection.execute("DELETE FROM imports WHERE repository = ? AND path = ?", (repository, path))
+        connection.execute("DELETE FROM files WHERE repository = ? AND path = ?", (repository, path))
+
+    def _db(self) -> sqlite3.Connection:
+        # Chamado com self._lock adquirido
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (repository TEXT NOT NULL, path TEXT NOT NULL, "
+                "blob_sha TEXT NOT NULL, PRIMARY KEY (repository, path))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS symbols (id INTEGER PRIMARY KEY AUTOINCREMENT, repository TEXT NOT NULL, "
+                "path TEXT NOT NULL, name TEXT NOT NULL, qualified_name TEXT NOT NULL, start_line INTEGER NOT NULL, "
+                "end_line INTEGER NOT NULL, text TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS symbols_name ON symbols (repository, name)")
+            connection.execute("CREATE INDEX IF NOT EXISTS symbols_path ON symbols (repository, path)")
+            connection.execute("CREATE TABLE IF NOT EXISTS calls (symbol_id INTEGER NOT NULL, name TEXT NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS calls_name ON calls (name)")
+            connection.execute("CREATE INDEX IF NOT EXISTS calls_symbol ON calls (symbol_id)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS imports (repository TEXT NOT NULL, path TEXT NOT NULL, module TEXT NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
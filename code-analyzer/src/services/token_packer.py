@@ -0,0 +1,228 @@
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..utils import Environment
+from ..utils.source_files import SourceFiles
+from ..utils.tokens import TokenCounter
+from .file_collector import FileRecord
+
+logger = logging.getLogger(__name__)
+
+# Orçamento padrão por requisição e reserva para o prompt e a resposta do modelo
+DEFAULT_MAX_REQUEST_TOKENS = 32000
+DEFAULT_RESERVED_TOKENS = 4000
+
+# Profundidade máxima de aninhamento usada ao procurar pontos de divisão (classe > método)
+MAX_SPLIT_DEPTH = 3
+
+
+class PackUnit(BaseModel):
+    path: str
+    language: Optional[str] = None
+    part: int = 1
+    parts: int = 1
+    start_line: int = 1
+    end_line: int = 1
+    text: str
+    tokens: int
+
+    @property
+    def label(self) -> str:
+        if self.parts == 1:
+            return self.path
+        return f"{self.path} (parte {self.part}/{self.parts}, linhas {self.start_line}-{self.end_line})"
+
+    def render(self) -> str:
+        return f"\n# File: {self.label}\n{self.text}\n"
+
+
+class Batch(BaseModel):
+    index: int
+    tokens: int = 0
+    units: List[PackUnit] = []
+
+    def render(self) -> str:
+        return "".join(unit.render() for unit in self.units)
+
+
+class BatchPlan(BaseModel):
+    budget: int
+    batches: List[Batch] = []
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(batch.tokens for batch in self.batches)
+
+    def describe(self) -> str:
+        lines = [f"{len(self.batches)} lote(s), {self.total_tokens} tokens (orçamento de {self.budget} por requisição)"]
+        for batch in self.batches:
+            lines.append(f"  lote {batch.index}: {len(batch.units)} trecho(s), {batch.tokens} tokens")
+        return "\n".join(lines)
+
+
+class TokenPacker:
+    """
+    Divide arquivos grandes em limites de funções/classes e agrupa os trechos em
+    lotes que cabem no orçamento de tokens de uma requisição ao LLM.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, reserved_tokens: Optional[int] = None):
+        self.max_tokens = max_tokens if max_tokens is not None else TokenPacker.request_tokens()
+        self.reserved_tokens = reserved_tokens if reserved_tokens is not None else int(
+            Environment.get("LLM_PROMPT_RESERVED_TOKENS") or DEFAULT_RESERVED_TOKENS
+        )
+        # Orçamento disponível para o código em cada requisição
+        self.budget = max(self.max_tokens - self.reserved_tokens, 1)
+
+    @staticmethod
+    def request_tokens() -> int:
+        return int(Environment.get("LLM_MAX_REQUEST_TOKENS") or DEFAULT_MAX_REQUEST_TOKENS)
+
+    def split(self, path: str, text: str, language: Optional[str] = None,
+              tokens: Optional[int] = None) -> List[PackUnit]:
+        """
+        Divide um arquivo em trechos que cabem no orçamento, preferindo os limites de definições.
+
+        Args:
+            path: Caminho do arquivo
+            text: Conteúdo do arquivo
+            language: Linguagem (padrão: deduzida pela extensão)
+            tokens: Tokens de text, se já conhecidos
+
+        Returns:
+            List[PackUnit]: Trechos na ordem do arquivo (um único trecho se o arquivo couber inteiro)
+        """
+        language = language or SourceFiles.language(path)
+        header = TokenCounter.count(PackUnit(path=path, text="", tokens=0).render())
+        budget = max(self.budget - header, 1)
+
+        tokens = tokens if tokens is not None else TokenCounter.count(text)
+        lines = text.splitlines(keepends=True)
+        if tokens <= budget or len(lines) == 0:
+            return [PackUnit(path=path, language=language, end_line=max(len(lines), 1), text=text, tokens=tokens + header)]
+
+        segments = self._segments(lines, 0, len(lines), language, '', budget, 0)
+
+        # Juntar segmentos consecutivos enquanto couberem no orçamento
+        chunks: List[Tuple[int, int, int]] = []
+        for start, end, seg_tokens in segments:
+            if chunks and chunks[-1][2] + seg_tokens <= budget:
+                chunks[-1] = (chunks[-1][0], end, chunks[-1][2] + seg_tokens)
+            else:
+                chunks.append((start, end, seg_tokens))
+
+        units = []
+        for i, (start, end, seg_tokens) in enumerate(chunks, 1):
+            units.append(PackUnit(
+                path=path,
+                language=language,
+                part=i,
+                parts=len(chunks),
+                start_line=start + 1,
+                end_line=end,
+                text="".join(lines[start:end]),
+                tokens=seg_tokens + header
+            ))
+
+        return units
+
+    def plan(self, records: Iterable[FileRecord]) -> BatchPlan:
+        """
+        Monta o plano de lotes (first-fit decreasing) para os arquivos informados.
+
+        Args:
+            records: Arquivos a analisar
+
+        Returns:
+            BatchPlan: Lotes numerados; os trechos de cada lote mantêm a ordem dos arquivos
+        """
+        units: List[PackUnit] = []
+        for record in records:
+            if record.text.strip():
+                units.extend(self.split(record.path, record.text, record.language))
+        return self.pack(units)
+
+    def pack(self, units: List[PackUnit]) -> BatchPlan:
+        """
+        Agrupa trechos já divididos em lotes (first-fit decreasing) de até budget tokens.
+
+        Args:
+            units: Trechos a analisar, na ordem dos arquivos
+
+        Returns:
+            BatchPlan: Lotes numerados; os trechos de cada lote mantêm a ordem de units
+        """
+        order = {id(unit): i for i, unit in enumerate(units)}
+        batches: List[Batch] = []
+
+        for unit in sorted(units, key=lambda u: u.tokens, reverse=True):
+            batch = next((b for b in batches if b.tokens + unit.tokens <= self.budget), None)
+            if batch is None:
+                batch = Batch(index=len(batches) + 1)
+                batches.append(batch)
+            batch.units.append(unit)
+            batch.tokens += unit.tokens
+
+        for batch in batches:
+            batch.units.sort(key=lambda u: order[id(u)])
+
+        plan = BatchPlan(budget=self.max_tokens, batches=batches)
+        logger.info(f"[TOKEN-PACKER] Plano de lotes: {plan.describe()}")
+        return plan
+
+    def _segments(self, lines: List[str], start: int, end: int, language: Optional[str],
+                  indent: str, budget: int, depth: int) -> List[Tuple[int, int, int]]:
+        """
+        Divide lines[start:end] em segmentos (início, fim, tokens) de até budget tokens.
+        """
+        tokens = TokenCounter.count("".join(lines[start:end]))
+        if tokens <= budget:
+            return [(start, end, tokens)]
+
+        inner_indent = self._inner_indent(lines, start, end, indent) if depth > 0 else indent
+        boundaries = []
+        if inner_indent is not None and depth < MAX_SPLIT_DEPTH:
+            boundaries = [start + i for i in SourceFiles.definition_starts(lines[start:end], language, inner_indent)]
+
+        boundaries = [b for b in boundaries if b > start]
+        if not boundaries:
+            return self._line_segments(lines, start, end, budget)
+
+        segments = []
+        for seg_start, seg_end in zip([start] + boundaries, boundaries + [end]):
+            segments.extend(self._segments(lines, seg_start, seg_end, language, inner_indent, budget, depth + 1))
+        return segments
+
+    @staticmethod
+    def _inner_indent(lines: List[str], start: int, end: int, indent: str) -> Optional[str]:
+        # Indentação do corpo da definição: a da primeira linha não vazia mais indentada que o nível atual
+        for line in lines[start + 1:end]:
+            if not line.strip():
+                continue
+            prefix = line[:len(line) - len(line.lstrip())]
+            if len(prefix) > len(indent) and prefix.startswith(indent):
+                return prefix
+        return None
+
+    @staticmethod
+    def _line_segments(lines: List[str], start: int, end: int, budget: int) -> List[Tuple[int, int, int]]:
+        """
+        Último recurso: divide por linhas, sem respeitar definições.
+        """
+        segments = []
+        seg_start = start
+        seg_tokens = 0
+
+        for i in range(start, end):
+            line_tokens = TokenCounter.count(lines[i])
+            if seg_tokens and seg_tokens + line_tokens > budget:
+                segments.append((seg_start, i, seg_tokens))
+                seg_start, seg_tokens = i, 0
+            seg_tokens += line_tokens
+
+        if seg_start < end:
+            segments.append((seg_start, end, seg_tokens))
+
+        return segments
@@ -0,0 +1,148 @@
+import time
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+
+from ..utils import Environment
+
+logger = logging.getLogger(__name__)
+
+# Padrões: 2 jobs de análise simultâneos por worker e até 10 MiB de mensagens retidas
+DEFAULT_MAX_JOBS = 2
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+
+class MeteredExecutor(ThreadPoolExecutor):
+    """
+    Executor dos jobs que informa ao WorkerPool quando cada job entra na fila, começa e termina.
+
+    A mensagem continua como primeiro argumento de cada tarefa, como o ThreadScheduler do
+    Pub/Sub espera ao descartar a fila no encerramento.
+    """
+
+    def __init__(self, pool: "WorkerPool"):
+        super().__init__(max_workers=pool.max_jobs, thread_name_prefix="analysis-job")
+        self._pool = pool
+        self._submitted = 0
+        self._started = 0
+        self._counter_lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._counter_lock:
+            self._submitted += 1
+        self._pool._queued(1)
+        try:
+            return super().submit(functools.partial(self._metered, fn), *args, **kwargs)
+        except RuntimeError:
+            with self._counter_lock:
+                self._submitted -= 1
+            self._pool._queued(-1)
+            raise
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        # O ThreadScheduler esvazia a fila antes de encerrar: os jobs que não começaram foram descartados
+        with self._counter_lock:
+            dropped = self._submitted - self._started
+            self._submitted = self._started
+        if dropped > 0:
+            self._pool._queued(-dropped)
+            logger.info(f"[WORKER-POOL] {dropped} job(s) da fila descartado(s) no encerramento")
+
+    def _metered(self, fn: Callable, *args, **kwargs):
+        with self._counter_lock:
+            self._started += 1
+        self._pool._started()
+        started = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._pool._finished(time.monotonic() - started)
+
+
+class WorkerPool:
+    """
+    Pool dimensionado dos jobs de análise consumidos do Pub/Sub.
+
+    O controle de fluxo limita as mensagens e os bytes retidos pelo cliente do Pub/Sub e
+    o executor limita os jobs simultâneos (clone, LLM e comentário), então a memória e o
+    disco de um worker ficam limitados a max_jobs jobs. As métricas expõem a fila, os
+    jobs em andamento e a duração de cada job.
+    """
+
+    _default: Optional["WorkerPool"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, max_jobs: Optional[int] = None, max_messages: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        self.max_jobs = max(1, max_jobs if max_jobs is not None else int(
+            Environment.get("WORKER_MAX_JOBS") or DEFAULT_MAX_JOBS
+        ))
+        # Padrão: não reter mais mensagens do que jobs simultâneos, para as demais irem a outros workers
+        self.max_messages = max_messages if max_messages is not None else int(
+            Environment.get("PUBSUB_MAX_MESSAGES") or self.max_jobs
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            Environment.get("PUBSUB_MAX_BYTES") or DEFAULT_MAX_BYTES
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.inflight = 0
+        self.completed = 0
+        self.wall_time_total = 0.0
+        self.wall_time_max = 0.0
+        self.wall_time_last = 0.0
+
+    @classmethod
+    def default(cls) -> "WorkerPool":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def flow_control(self) -> pubsub_v1.types.FlowControl:
+        return pubsub_v1.types.FlowControl(max_messages=self.max_messages, max_bytes=self.max_bytes)
+
+    def scheduler(self) -> ThreadScheduler:
+        """
+        Scheduler de uma assinatura; o executor é encerrado junto com ela, então cada assinatura recebe um novo.
+        """
+        return ThreadScheduler(executor=MeteredExecutor(self))
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_jobs": self.max_jobs,
+                "max_messages": self.max_messages,
+                "max_bytes": self.max_bytes,
+                "queued": self.queued,
+                "inflight": self.inflight,
+                "completed": self.completed,
+                "wall_time_seconds_total": round(self.wall_time_total, 3),
+                "wall_time_seconds_avg": round(self.wall_time_total / self.completed, 3) if self.completed else 0.0,
+                "wall_time_seconds_max": round(self.wall_time_max, 3),
+                "wall_time_seconds_last": round(self.wall_time_last, 3),
+            }
+
+    def _queued(self, delta: int):
+        with self._lock:
+            self.queued += delta
+
+    def _started(self):
+        with self._lock:
+            self.queued -= 1
+            self.inflight += 1
+
+    def _finished(self, elapsed: float):
+        with self._lock:
+            self.inflight -= 1
+            self.completed += 1
+            self.wall_time_total += elapsed
+            self.wall_time_max = max(self.wall_time_max, elapsed)
+            self.wall_time_last = elapsed
@@ -2,9 +2,12 @@ import asyncio
 from .services import PubSubClient
 from .utils import logger
 from .services import ProcessHandler
+from .domain import ClientRegistry
 
 
 async def start_pubsub_listener():
+    # Inicializar os clientes do Vertex AI antes de consumir a primeira mensagem
+    await asyncio.to_thread(ClientRegistry.warm_up)
     pubsub_client = PubSubClient(ProcessHandler())
     await asyncio.to_thread(pubsub_client.subscribe_messages)
 
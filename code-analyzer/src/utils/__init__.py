@@ -3,4 +3,5 @@ __version__ = "0.1.0"
 from .logger import logger
 from .policy import Policy
 from .environment import Environment
-from .extractor import Extractor
\ No newline at end of file
+from .extractor import Extractor
+from .extraction_engine import ExtractionEngine
\ No newline at end of file
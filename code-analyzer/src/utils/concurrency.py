@@ -0,0 +1,79 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TaskTimeoutError(Exception):
+    """
+    Indica que uma tarefa não terminou dentro do tempo limite, contado a partir do seu início.
+    """
+    pass
+
+
+class Concurrency:
+
+    @staticmethod
+    def map_ordered(fn: Callable[[T], R], items: Sequence[T], max_workers: int,
+                    timeout: Optional[float] = None) -> List[Union[R, Exception]]:
+        """
+        Executa fn para cada item em um pool de threads limitado e devolve os resultados na ordem dos itens.
+
+        Falhas não interrompem as demais tarefas: a posição correspondente recebe a exceção
+        (TaskTimeoutError quando o tempo limite da tarefa é excedido).
+
+        Args:
+            fn: Função a executar
+            items: Itens de entrada
+            max_workers: Número máximo de tarefas simultâneas
+            timeout: Tempo limite por tarefa em segundos, contado a partir do início da execução
+
+        Returns:
+            List[Union[R, Exception]]: Resultado ou exceção de cada item, na ordem de entrada
+        """
+        if not items:
+            return []
+
+        starts: Dict[int, float] = {}
+
+        def run(index: int, item: T) -> R:
+            starts[index] = time.monotonic()
+            return fn(item)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+        results: List[Union[R, Exception]] = []
+        try:
+            futures = [executor.submit(run, i, item) for i, item in enumerate(items)]
+
+            for index, future in enumerate(futures):
+                try:
+                    results.append(Concurrency._result(future, index, starts, timeout))
+                except Exception as e:
+                    results.append(e)
+        finally:
+            # Tarefas que estouraram o tempo continuam em segundo plano até a chamada retornar
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    @staticmethod
+    def _result(future, index: int, starts: Dict[int, float], timeout: Optional[float]):
+        if timeout is None:
+            return future.result()
+
+        while True:
+            started = starts.get(index)
+            # Enquanto a tarefa está na fila, aguardar sem consumir o tempo limite dela
+            wait_for = timeout if started is None else started + timeout - time.monotonic()
+            try:
+                return future.result(timeout=max(wait_for, 0))
+            except FutureTimeoutError:
+                started = starts.get(index)
+                if started is not None and time.monotonic() >= started + timeout:
+                    future.cancel()
+                    raise TaskTimeoutError(f"Tempo limite de {timeout:g}s excedido")
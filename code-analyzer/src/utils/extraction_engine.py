@@ -0,0 +1,229 @@
+import os
+import math
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple, Union
+
+import fitz
+
+from .environment import Environment
+from .extractor import Content, Extractor
+from .concurrency import TaskTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Padrões: PDFs com mais de 50 páginas são divididos em faixas; 120s por documento
+DEFAULT_SHARD_PAGES = 50
+DEFAULT_TIMEOUT_SECONDS = 120
+
+
+def _pdf_range(data: bytes, start: int, end: int) -> str:
+    # Executada nos processos do pool: extrai as páginas [start, end) de um PDF
+    document = fitz.open(stream=data, filetype="pdf")
+    try:
+        return "".join(document.load_page(number).get_text() for number in range(start, end))
+    finally:
+        document.close()
+
+
+def _docx_text(data: bytes) -> str:
+    # Executada nos processos do pool: extrai os parágrafos de um DOCX
+    return "".join(Extractor.pages_from_docx(memoryview(data)))
+
+
+class ExtractionEngine:
+    """
+    Extrai o texto de lotes de documentos em um pool de processos.
+
+    PDFs grandes são divididos em faixas de páginas extraídas em paralelo e cada DOCX é
+    uma tarefa; documentos de um mesmo lote são processados ao mesmo tempo. Cada documento
+    tem um tempo limite, contado a partir do momento em que o lote passa a aguardá-lo.
+    """
+
+    _default: Optional["ExtractionEngine"] = None
+    _default_guard = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None,
+                 shard_pages: Optional[int] = None):
+        self.workers = workers if workers is not None else int(
+            Environment.get("EXTRACTION_WORKERS") or os.cpu_count() or 1
+        )
+        self.timeout = timeout if timeout is not None else float(
+            Environment.get("EXTRACTION_TIMEOUT_SECONDS") or DEFAULT_TIMEOUT_SECONDS
+        )
+        self.shard_pages = shard_pages if shard_pages is not None else int(
+            Environment.get("EXTRACTION_SHARD_PAGES") or DEFAULT_SHARD_PAGES
+        )
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def default(cls) -> "ExtractionEngine":
+        """Retorna a instância compartilhada pelo processo."""
+        with cls._default_guard:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def enabled() -> bool:
+        value = Environment.get("EXTRACTION_ENGINE_ENABLED")
+        return value is None or value.lower() not in ("0", "false", "no")
+
+    def extract(self, content: Content, extension: str) -> str:
+        result = self.extract_many([(content, extension)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def extract_many(self, documents: Sequence[Tuple[Content, str]]) -> List[Union[str, Exception]]:
+        """
+        Extrai o texto de cada documento, na ordem de entrada.
+
+        Falhas não interrompem os demais documentos: a posição correspondente recebe a
+        exceção (TaskTimeoutError quando o tempo limite do documento é excedido).
+
+        Args:
+            documents: (conteúdo em base64 ou bytes, extensão) de cada documento
+
+        Returns:
+            List[Union[str, Exception]]: Texto ou exceção de cada documento
+        """
+        plans: List[Union[str, Exception, Tuple[str, bytes, List[Tuple[int, int]]]]] = []
+        for content, extension in documents:
+            try:
+                plans.append(self._plan(content, extension))
+            except Exception as e:
+                plans.append(e)
+
+        tasks = sum(len(plan[2]) for plan in plans if isinstance(plan, tuple))
+        # Um único documento sem faixas não compensa o custo de enviar os bytes para outro processo
+        if tasks <= 1 and len(documents) <= 1:
+            return [self._run_local(plan) if isinstance(plan, tuple) else plan for plan in plans]
+
+        results: List[Union[str, Exception]] = [
+            None if isinstance(plan, tuple) else plan for plan in plans
+        ]
+        pending = [index for index, plan in enumerate(plans) if isinstance(plan, tuple)]
+        # Documentos perdidos porque o pool quebrou ou foi encerrado por outro documento têm uma nova tentativa
+        for attempt in range(2):
+            try:
+                executor = self._pool()
+                submitted = [(index, self._submit(executor, plans[index])) for index in pending]
+            except BrokenProcessPool as e:
+                logger.warning(f"[EXTRACTION-ENGINE] Pool de processos indisponível, extraindo no processo atual: {str(e)}")
+                self._reset()
+                for index in pending:
+                    results[index] = self._run_local(plans[index])
+                break
+
+            pending = []
+            for index, futures in submitted:
+                results[index] = self._collect(executor, futures)
+                if isinstance(results[index], BrokenProcessPool):
+                    pending.append(index)
+            if not pending or attempt == 1:
+                break
+            logger.warning(f"[EXTRACTION-ENGINE] {len(pending)} documento(s) reenviado(s) após o pool ser reiniciado")
+
+        logger.info(f"[EXTRACTION-ENGINE] {len(documents)} documento(s) extraído(s) em {tasks} tarefa(s)")
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _plan(self, content: Content, extension: str):
+        name = extension.lower()
+        if name == 'pdf':
+            data = Extractor._bytes(Extractor.buffer(content))
+            document = fitz.open(stream=data, filetype="pdf")
+            try:
+                pages = document.page_count
+            finally:
+                document.close()
+            # Faixas de pelo menos shard_pages páginas, no máximo uma por processo
+            size = max(self.shard_pages, math.ceil(pages / max(1, self.workers)))
+            return name, data, [(start, min(start + size, pages)) for start in range(0, pages, size)] or [(0, 0)]
+        if name == 'docx':
+            return name, Extractor._bytes(Extractor.buffer(content)), [(0, 0)]
+        return Extractor.extract_text(content, extension)
+
+    @staticmethod
+    def _run_local(plan) -> Union[str, Exception]:
+        name, data, ranges = plan
+        try:
+            if name == 'pdf':
+                return "".join(_pdf_range(data, start, end) for start, end in ranges)
+            return _docx_text(data)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _submit(executor: ProcessPoolExecutor, plan) -> List[Future]:
+        name, data, ranges = plan
+        if name == 'pdf':
+            return [executor.submit(_pdf_range, data, start, end) for start, end in ranges]
+        return [executor.submit(_docx_text, data)]
+
+    def _collect(self, executor: ProcessPoolExecutor, futures: List[Future]) -> Union[str, Exception]:
+        deadline = time.monotonic() + self.timeout
+        parts = []
+        try:
+            for future in futures:
+                parts.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        except FutureTimeoutError:
+            # cancel() não interrompe uma tarefa já iniciada: os processos do pool são encerrados
+            # para que o documento travado não ocupe um processo e atrase os lotes seguintes
+            self._terminate(executor)
+            return TaskTimeoutError(f"Tempo limite de {self.timeout:g}s excedido na extração do documento")
+        except BrokenProcessPool as e:
+            self._reset(executor)
+            return e
+        except Exception as e:
+            return e
+        return "".join(parts)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: o serviço usa threads, e fork copiaria locks adquiridos por elas
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers), mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset(self, executor: Optional[ProcessPoolExecutor] = None):
+        """
+        Descarta o pool (apenas se ainda for executor, quando informado); o próximo lote cria outro.
+        """
+        with self._lock:
+            if self._executor is None or (executor is not None and self._executor is not executor):
+                return
+            executor, self._executor = self._executor, None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _terminate(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+        terminate_workers = getattr(executor, "terminate_workers", None)
+        if terminate_workers is not None:
+            terminate_workers()
+            return
+
+        # Antes do Python 3.14 o executor não expõe os processos; as tarefas pendentes falham com BrokenProcessPool
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        for process in processes:
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.join(timeout=5)
+        logger.warning(f"[EXTRACTION-ENGINE] {len(processes)} processo(s) do pool encerrado(s) após tempo limite excedido")
@@ -2,43 +2,68 @@ import base64
 import io
 import fitz
 from docx import Document
-from typing import IO
+from typing import IO, Iterator, Union
+
+Content = Union[str, bytes, bytearray, memoryview, IO[bytes]]
 
 class Extractor:
+    """
+    Extrai o texto de documentos enviados em base64.
+
+    O conteúdo é decodificado uma única vez para um buffer exposto como memoryview e o
+    texto é montado página a página em uma lista unida no final, então um documento grande
+    ocupa aproximadamente uma cópia dos seus bytes em memória.
+    """
 
     @staticmethod
-    def stream(content: str) -> IO[bytes]:
-        data = base64.b64decode(content)
-        stream = io.BytesIO(data)
+    def buffer(content: Content) -> memoryview:
+        """
+        Retorna os bytes do documento sem cópias além da decodificação do base64.
+        """
+        if isinstance(content, memoryview):
+            return content
+        if isinstance(content, (bytes, bytearray)):
+            return memoryview(content)
+        if isinstance(content, io.BytesIO):
+            return content.getbuffer()
+        if hasattr(content, "read"):
+            return memoryview(content.read())
 
-        return stream
+        return memoryview(base64.b64decode(content))
 
     @staticmethod
-    def extract_text_from_pdf(stream: str | IO[bytes]) -> str:
-        document = fitz.open(stream=stream, filetype="pdf")
-        text = ""
-
-        for page_num in range(len(document)):
-            page = document.load_page(page_num)
-            text += page.get_text()
+    def stream(content: Content) -> IO[bytes]:
+        return io.BytesIO(Extractor._bytes(Extractor.buffer(content)))
 
-        return text
+    @staticmethod
+    def pages_from_pdf(buffer: memoryview) -> Iterator[str]:
+        document = fitz.open(stream=Extractor._bytes(buffer), filetype="pdf")
+        try:
+            for page in document:
+                yield page.get_text()
+        finally:
+            document.close()
 
     @staticmethod
-    def extract_text_from_docx(stream: str | IO[bytes]) -> str:
-        document = Document(stream)
-        text = ""
+    def pages_from_docx(buffer: memoryview) -> Iterator[str]:
+        document = Document(io.BytesIO(Extractor._bytes(buffer)))
 
         for paragraph in document.paragraphs:
-            text += paragraph.text + "\n"
+            yield paragraph.text + "\n"
 
-        return text
+    @staticmethod
+    def extract_text_from_pdf(stream: Content) -> str:
+        return "".join(Extractor.pages_from_pdf(Extractor.buffer(stream)))
 
     @staticmethod
-    def extract_text(content:  str | IO[bytes], extension: str) -> str:
+    def extract_text_from_docx(stream: Content) -> str:
+        return "".join(Extractor.pages_from_docx(Extractor.buffer(stream)))
+
+    @staticmethod
+    def extract_text(content: Content, extension: str) -> str:
         extraction_methods = {
-            'pdf': Extractor.extract_text_from_pdf,
-            'docx': Extractor.extract_text_from_docx
+            'pdf': Extractor.pages_from_pdf,
+            'docx': Extractor.pages_from_docx
         }
         name = extension.lower()
 
@@ -46,8 +71,15 @@ class Extractor:
             try:
                 method = extraction_methods[name]
 
-                return method(Extractor.stream(content))
+                return "".join(method(Extractor.buffer(content)))
             except KeyError:
                 raise ValueError("Unsupported file extension")
 
         return content
+
+    @staticmethod
+    def _bytes(buffer: memoryview) -> bytes:
+        # PyMuPDF e o BytesIO aceitam bytes sem copiar; a memoryview só é copiada se for um recorte
+        if isinstance(buffer.obj, bytes) and buffer.nbytes == len(buffer.obj):
+            return buffer.obj
+        return buffer.tobytes()
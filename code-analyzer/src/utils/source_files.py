@@ -0,0 +1,127 @@
+import os
+import re
+import hashlib
+from typing import List, Optional
+
+
+class SourceFiles:
+
+    LANGUAGES = {
+        '.py': 'python',
+        '.js': 'javascript',
+        '.jsx': 'javascript',
+        '.ts': 'typescript',
+        '.tsx': 'typescript',
+        '.java': 'java',
+        '.go': 'go',
+        '.rb': 'ruby',
+        '.c': 'c',
+        '.h': 'c',
+        '.cpp': 'cpp',
+        '.hpp': 'cpp',
+        '.cs': 'csharp',
+        '.php': 'php',
+        '.swift': 'swift',
+        '.kt': 'kotlin',
+        '.rs': 'rust',
+        '.scala': 'scala',
+        '.sh': 'shell',
+        '.bash': 'shell',
+    }
+
+    # Extensões de código-fonte consideradas nas análises de repositório e de PR
+    EXTENSIONS = tuple(LANGUAGES)
+
+    # Início de definições de nível superior (funções, classes, tipos) por linguagem
+    DEFINITIONS = {
+        'python': re.compile(r'^(?:@|(?:async\s+)?def\s|class\s)'),
+        'javascript': re.compile(r'^(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function\b|class\s|(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:\(|function\b))'),
+        'typescript': re.compile(r'^(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?(?:function\b|class\s|interface\s|type\s+\w+\s*=|enum\s|(?:const|let|var)\s+\w+\s*(?::[^=]+)?=\s*(?:async\s*)?(?:\(|function\b))'),
+        'go': re.compile(r'^(?:func|type)\s'),
+        'rust': re.compile(r'^(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:fn|struct|enum|trait|impl|mod)\b'),
+        'ruby': re.compile(r'^(?:def|class|module)\s'),
+        'shell': re.compile(r'^(?:function\s+\w+|\w+\s*\(\)\s*\{?)'),
+    }
+
+    # Linguagens com chaves: declaração sem indentação seguida de "{" (mesma linha ou a próxima)
+    BRACE_DEFINITION = re.compile(r'^(?!\s|//|/\*|\*|#|}|\)|(?:else|catch|finally|if|for|foreach|while|switch|do|try|return|using|lock|synchronized)\b)[^;]*(?:\)|\w|>)\s*(?:throws\s[^{]*)?\{?\s*$')
+
+    @staticmethod
+    def is_source(path: str) -> bool:
+        return path.lower().endswith(SourceFiles.EXTENSIONS)
+
+    @staticmethod
+    def language(path: str) -> Optional[str]:
+        _, extension = os.path.splitext(path)
+        return SourceFiles.LANGUAGES.get(extension.lower())
+
+    @staticmethod
+    def is_binary(data: bytes, sample_size: int = 8000) -> bool:
+        # Mesma heurística do git: um byte NUL no início indica conteúdo binário
+        return b'\0' in data[:sample_size]
+
+    @staticmethod
+    def blob_sha(data: bytes) -> str:
+        """
+        Calcula o SHA-1 do objeto blob do git para o conteúdo informado.
+        """
+        digest = hashlib.sha1(f"blob {len(data)}\0".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def definition_starts(lines: List[str], language: Optional[str], indent: str = '') -> List[int]:
+        """
+        Retorna os índices das linhas onde começam definições no nível de indentação informado.
+
+        Decoradores, anotações e comentários imediatamente anteriores ficam junto da definição.
+
+        Args:
+            lines: Linhas do código
+            language: Linguagem do código (None usa a heurística de chaves)
+            indent: Prefixo de indentação do nível procurado ('' para o nível superior)
+        """
+        starts = []
+
+        for i, line in enumerate(lines):
+            if SourceFiles._at_indent(line, indent) is None or not SourceFiles.is_definition(lines, i, language):
+                continue
+
+            start = i
+            while start > 0:
+                previous = lines[start - 1]
+                if not previous.startswith(indent) or \
+                        not previous[len(indent):].startswith(('@', '#', '//', '/*', ' *', '*/')):
+                    break
+                start -= 1
+
+            if not starts or start > starts[-1]:
+                starts.append(start)
+
+        return starts
+
+    @staticmethod
+    def is_definition(lines: List[str], index: int, language: Optional[str]) -> bool:
+        """
+        Indica se a linha index inicia uma definição (função, classe, tipo), em qualquer indentação.
+        """
+        pattern = SourceFiles.DEFINITIONS.get(language, SourceFiles.BRACE_DEFINITION)
+        body = lines[index].lstrip()
+        if not body or not pattern.match(body):
+            return False
+
+        if pattern is SourceFiles.BRACE_DEFINITION:
+            next_line = lines[index + 1].strip() if index + 1 < len(lines) else ''
+            return body.rstrip().endswith('{') or next_line == '{'
+
+        return True
+
+    @staticmethod
+    def _at_indent(line: str, indent: str) -> Optional[str]:
+        # Conteúdo da linha quando ela está exatamente no nível de indentação informado
+        if not line.startswith(indent):
+            return None
+        body = line[len(indent):]
+        if not body or body[0] in ' \t':
+            return None
+        return body
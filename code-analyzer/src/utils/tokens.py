@@ -0,0 +1,54 @@
+import logging
+import threading
+from typing import Optional
+
+from .environment import Environment
+
+logger = logging.getLogger(__name__)
+
+# Média aproximada de caracteres por token quando o tokenizer não está disponível
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """
+    Contagem de tokens com tiktoken.
+
+    O modelo usado na análise (Gemini) tem tokenizer próprio; a codificação do
+    tiktoken é uma aproximação suficiente para orçamento de requisições. Se a
+    codificação não puder ser carregada (por exemplo, sem acesso à rede para
+    baixá-la), usa a estimativa de CHARS_PER_TOKEN caracteres por token.
+    """
+
+    _encoding = None
+    _loaded = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def count(text: Optional[str]) -> int:
+        if not text:
+            return 0
+
+        encoding = TokenCounter._get_encoding()
+        if encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+
+        return len(encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def _get_encoding():
+        if TokenCounter._loaded:
+            return TokenCounter._encoding
+
+        with TokenCounter._lock:
+            if not TokenCounter._loaded:
+                name = Environment.get("TOKENIZER_ENCODING") or "cl100k_base"
+                try:
+                    import tiktoken
+                    TokenCounter._encoding = tiktoken.get_encoding(name)
+                except Exception as e:
+                    logger.warning(f"[TOKENS] Codificação {name} indisponível, usando estimativa por caracteres: {str(e)}")
+                    TokenCounter._encoding = None
+                TokenCounter._loaded = True
+
+        return TokenCounter._encoding
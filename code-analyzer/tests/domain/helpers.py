@@ -0,0 +1,31 @@
+import zlib
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+class WordEmbeddings(Embeddings):
+    """Embeddings determinísticos (saco de palavras com hash) que contam os textos enviados."""
+
+    model_name = "words"
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * 32
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % 32] += 1.0
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+def documents(**contents):
+    return [Document(page_content=text, metadata={"source": source}) for source, text in contents.items()]
@@ -0,0 +1,54 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from src.domain.client_registry import ClientRegistry
+
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self):
+        ClientRegistry.clear()
+        self.addCleanup(ClientRegistry.clear)
+
+    @patch("src.domain.client_registry.ChatVertexAI")
+    def test_chat_client_is_reused(self, chat_vertex_ai):
+        chat_vertex_ai.side_effect = lambda **kwargs: MagicMock(**kwargs)
+
+        first = ClientRegistry.chat("gemini", "project", "us-central1")
+        second = ClientRegistry.chat("gemini", "project", "us-central1")
+        other = ClientRegistry.chat("gemini", "project", "europe-west1")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(chat_vertex_ai.call_count, 2)
+
+    @patch("src.domain.client_registry.ChatVertexAI")
+    def test_concurrent_access_creates_one_client(self, chat_vertex_ai):
+        def slow_client(**kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        chat_vertex_ai.side_effect = slow_client
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: ClientRegistry.chat("gemini", "project", "us"), range(8)))
+
+        self.assertEqual(chat_vertex_ai.call_count, 1)
+        self.assertTrue(all(client is clients[0] for client in clients))
+
+    @patch("src.domain.client_registry.ModelEmbeddings")
+    @patch("src.domain.client_registry.ChatVertexAI")
+    def test_warm_up_ignores_failures(self, chat_vertex_ai, model_embeddings):
+        chat_vertex_ai.side_effect = RuntimeError("sem credenciais")
+        model_embeddings.DEFAULT_MODEL_NAME = "gecko"
+
+        ClientRegistry.warm_up()
+
+        model_embeddings.assert_called_once()
+        self.assertEqual(len(ClientRegistry._clients), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from langchain_core.documents import Document
+
+from src.domain.code_splitter import CodeSplitter
+from src.domain.rag import RAG
+
+
+def python_class(methods: int) -> str:
+    body = "".join(
+        f"    def method_{i}(self, x):\n" + "".join(f"        value_{j} = x + {j}\n" for j in range(10)) + "        return x\n\n"
+        for i in range(methods)
+    )
+    return f"class Service:\n    name = 'service'\n\n{body}"
+
+
+class TestCodeSplitter(unittest.TestCase):
+
+    def test_small_definitions_are_grouped(self):
+        code = "import os\n\n\n@decorator\ndef a():\n    return 1\n\n\ndef b():\n    return 2\n"
+
+        chunks = CodeSplitter(chunk_tokens=200).split_text(code, "python")
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0][1], ["a", "b"])
+
+    def test_large_class_is_split_at_methods_with_signature(self):
+        code = python_class(4)
+
+        chunks = CodeSplitter(chunk_tokens=80).split_text(code, "python")
+
+        method_chunks = [chunk for chunk in chunks if any(s.startswith("Service.method_") for s in chunk[1])]
+        self.assertEqual(len(method_chunks), 4)
+        for text, symbols, start, end in method_chunks:
+            self.assertTrue(text.startswith("class Service:\n    def method_"))
+        # Sem sobreposição além da assinatura: as linhas dos trechos não se repetem
+        ranges = [(start, end) for _, _, start, end in chunks]
+        self.assertEqual([r[0] for r in ranges[1:]], [r[1] for r in ranges[:-1]])
+
+    def test_brace_language(self):
+        code = "package app;\n\npublic class Api {\n" + "".join(
+            f"    public int handle{i}(int x) {{\n" + "".join(f"        int v{j} = x;\n" for j in range(8)) + "        return x;\n    }\n\n"
+            for i in range(3)
+        ) + "}\n"
+
+        chunks = CodeSplitter(chunk_tokens=70).split_text(code, "java")
+
+        symbols = [s for chunk in chunks for s in chunk[1]]
+        self.assertIn("Api.handle2", symbols)
+        last = next(chunk for chunk in chunks if "Api.handle2" in chunk[1])
+        self.assertTrue(last[0].startswith("public class Api {\n    public int handle2(int x) {"))
+
+    def test_invalid_python_falls_back_to_heuristics(self):
+        code = "def a(:\n    pass\n\ndef b():\n    pass\n"
+
+        symbols = CodeSplitter().symbols(code, "python")
+
+        self.assertEqual([s.name for s in symbols], ["a", "b"])
+
+    def test_rag_uses_code_splitter_for_source_files(self):
+        documents = [
+            Document(page_content=python_class(2), metadata={"source": "app/service.py"}),
+            Document(page_content="Texto comum. " * 200, metadata={"source": "manual.pdf"}),
+        ]
+
+        chunks = RAG.split_documents(documents)
+
+        code_chunks = [c for c in chunks if c.metadata["source"] == "app/service.py"]
+        self.assertTrue(all(c.metadata["language"] == "python" for c in code_chunks))
+        self.assertIn("Service", code_chunks[0].metadata["symbols"])
+        self.assertEqual(code_chunks[0].metadata["start_line"], 1)
+        self.assertTrue(any("symbols" not in c.metadata for c in chunks))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.domain.context_cache import ContextCache, LocalContextCacheBackend, VertexContextCacheBackend
+from src.domain.llm_gateway import LLMGateway
+
+
+class TestContextCache(unittest.TestCase):
+
+    def setUp(self):
+        self.generated = []
+        self.backend = LocalContextCacheBackend(generator=lambda text: self.generated.append(text) or "análise")
+        self.cache = ContextCache(backend=self.backend, ttl=600, min_tokens=10, refresh_seconds=60)
+        self.prefix = "Instruções compartilhadas do job. " * 20
+
+    def test_prefix_is_created_once(self):
+        first = self.cache.get_or_create("gemini", self.prefix)
+        second = self.cache.get_or_create("gemini", self.prefix)
+        other_model = self.cache.get_or_create("gemini-pro", self.prefix)
+
+        self.assertEqual(first.name, second.name)
+        self.assertNotEqual(first.name, other_model.name)
+        self.assertEqual(self.cache.stats()["created"], 2)
+
+    def test_small_prefix_or_missing_backend_is_not_cached(self):
+        self.assertIsNone(self.cache.get_or_create("gemini", "curto"))
+        self.assertIsNone(ContextCache(backend=None, min_tokens=0).get_or_create("gemini", self.prefix))
+
+    def test_ttl_is_extended_and_expired_entries_recreated(self):
+        entry = self.cache.get_or_create("gemini", self.prefix)
+        entry.expires_at -= 590
+        close_to_expiry = entry.expires_at
+
+        renewed = self.cache.get_or_create("gemini", self.prefix)
+        self.assertEqual(renewed.name, entry.name)
+        self.assertGreater(renewed.expires_at, close_to_expiry + 500)
+
+        renewed.expires_at = 0
+        self.assertEqual(self.cache.purge(), 1)
+        self.assertNotIn(entry.name, self.backend.contents)
+        self.assertNotEqual(self.cache.get_or_create("gemini", self.prefix).name, entry.name)
+
+    def test_expired_entries_are_purged_periodically(self):
+        entry = self.cache.get_or_create("gemini", self.prefix)
+        entry.expires_at = 0
+        self.cache._purged_at -= 60
+
+        self.cache.get_or_create("gemini", "Outro prefixo compartilhado. " * 20)
+
+        self.assertNotIn(entry.name, self.backend.contents)
+        self.assertNotIn(entry.key, self.cache._locks)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_generate_reports_saved_tokens(self):
+        entry = self.cache.get_or_create("gemini", self.prefix)
+
+        self.cache.generate(entry, "código")
+        self.cache.record(0.2)
+
+        stats = self.cache.stats()
+        self.assertEqual(self.generated, [self.prefix + "código"])
+        self.assertEqual(stats["cached_calls"], 1)
+        self.assertEqual(stats["tokens_saved"], entry.tokens)
+        self.assertEqual(stats["latency_ms_uncached_avg"], 200.0)
+
+    def test_gateway_sends_only_suffix(self):
+        model = MagicMock()
+        backend = MagicMock(wraps=self.backend)
+
+        with patch.dict(os.environ, {"CONTEXT_CACHE_ENABLED": "true", "LLM_CACHE_ENABLED": "false",
+                                     "GOOGLE_AI_MODEL_NAME": "gemini"}), \
+                patch.object(self.cache, "backend", backend), \
+                patch.object(ContextCache, "default", return_value=self.cache), \
+                patch("src.domain.llm_gateway.ClientRegistry.chat", return_value=model):
+            for i in range(3):
+                result = LLMGateway.analyze_code(f"x = {i}", prompt=self.prefix + f"\n- Codigo: mod{i}.py\n",
+                                                 shared_prefix=self.prefix)
+
+        self.assertEqual(result, "análise")
+        model.invoke.assert_not_called()
+        self.assertEqual(backend.create.call_count, 1)
+        suffix = backend.generate.call_args.args[1]
+        self.assertNotIn(self.prefix, suffix)
+        self.assertIn("mod2.py", suffix)
+        self.assertIn("x = 2", suffix)
+        self.assertEqual(self.cache.stats()["cached_calls"], 3)
+
+    def test_gateway_without_cache_uses_full_prompt(self):
+        model = MagicMock()
+        model.invoke.return_value = MagicMock(content="análise")
+
+        with patch.dict(os.environ, {"CONTEXT_CACHE_ENABLED": "false", "LLM_CACHE_ENABLED": "false"}), \
+                patch("src.domain.llm_gateway.ClientRegistry.chat", return_value=model):
+            LLMGateway.analyze_code("x = 1", prompt=self.prefix, shared_prefix=self.prefix)
+
+        self.assertIn(self.prefix, model.invoke.call_args.args[0][0].content)
+
+
+class TestVertexContextCacheBackend(unittest.TestCase):
+
+    def test_backend_uses_cached_content(self):
+        from vertexai.preview import caching
+        from vertexai.preview.generative_models import GenerativeModel
+
+        cached_content = MagicMock()
+        cached_content.name = "projects/p/locations/l/cachedContents/1"
+        model = MagicMock()
+        model.generate_content.return_value = MagicMock(text="análise")
+
+        with patch("vertexai.init"), \
+                patch.object(caching.CachedContent, "create", return_value=cached_content) as create, \
+                patch.object(GenerativeModel, "from_cached_content", return_value=model) as from_cached_content:
+            backend = VertexContextCacheBackend()
+            name = backend.create("gemini-1.5-pro-002", "prefixo", ttl=600)
+            result = backend.generate(name, "código")
+
+        self.assertEqual(name, cached_content.name)
+        self.assertEqual(create.call_args.kwargs["model_name"], "gemini-1.5-pro-002")
+        self.assertEqual(create.call_args.kwargs["system_instruction"], "prefixo")
+        self.assertEqual(create.call_args.kwargs["ttl"].total_seconds(), 600)
+        from_cached_content.assert_called_once_with(cached_content=cached_content)
+        model.generate_content.assert_called_once_with("código")
+        self.assertEqual(result, "análise")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.domain.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "embeddings.sqlite3")
+        self.requests = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def embed_batch(self, batch):
+        self.requests.append(list(batch))
+        return [[float(len(text)), 0.5] for text in batch]
+
+    def test_misses_are_deduplicated_and_cached(self):
+        cache = EmbeddingCache(path=self.path, batch_size=10)
+
+        vectors = cache.embed("gecko", "RETRIEVAL_DOCUMENT", ["a", "bb", "a"], self.embed_batch)
+        again = cache.embed("gecko", "RETRIEVAL_DOCUMENT", ["bb", "ccc"], self.embed_batch)
+
+        self.assertEqual(vectors, [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]])
+        self.assertEqual(again, [[2.0, 0.5], [3.0, 0.5]])
+        self.assertEqual(self.requests, [["a", "bb"], ["ccc"]])
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_persistent_tier(self):
+        EmbeddingCache(path=self.path).embed("gecko", None, ["texto"], self.embed_batch)
+
+        cache = EmbeddingCache(path=self.path)
+        self.assertEqual(cache.embed("gecko", None, ["texto"], self.embed_batch), [[5.0, 0.5]])
+        self.assertEqual(len(self.requests), 1)
+
+        # Outro modelo ou tipo de tarefa não reaproveita o vetor
+        cache.embed("gecko-2", None, ["texto"], self.embed_batch)
+        cache.embed("gecko", "RETRIEVAL_QUERY", ["texto"], self.embed_batch)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_batches_respect_count_and_token_limits(self):
+        cache = EmbeddingCache(path=self.path, batch_size=3, batch_tokens=10)
+
+        by_count = cache.batches(["a"] * 7)
+        by_tokens = cache.batches(["x " * 15, "y " * 15, "z " * 15])
+
+        self.assertEqual([len(b) for b in by_count], [3, 3, 1])
+        self.assertEqual([len(b) for b in by_tokens], [1, 1, 1])
+
+    def test_misses_are_sent_in_full_batches(self):
+        cache = EmbeddingCache(path=self.path, batch_size=4)
+        cache.embed("gecko", None, ["t1", "t2"], self.embed_batch)
+        self.requests.clear()
+
+        cache.embed("gecko", None, [f"t{i}" for i in range(1, 11)], self.embed_batch)
+
+        self.assertEqual([len(r) for r in self.requests], [4, 4])
+
+    def test_memory_tier_is_bounded_by_bytes(self):
+        # Cada vetor [len, 0.5] ocupa 8 bytes em float32
+        cache = EmbeddingCache(path=self.path, memory_bytes=16)
+
+        vectors = cache.embed("gecko", None, ["a", "bb", "ccc"], self.embed_batch)
+
+        self.assertEqual(vectors, [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5]])
+        self.assertEqual((cache.stats()["memory_entries"], cache.stats()["memory_bytes"]), (2, 16))
+        # O vetor despejado da memória continua no SQLite
+        self.assertEqual(cache.embed("gecko", None, ["a"], self.embed_batch), [[1.0, 0.5]])
+        self.assertEqual(len(self.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
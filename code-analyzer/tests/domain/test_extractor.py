@@ -0,0 +1,140 @@
+import io
+import time
+import base64
+import unittest
+from unittest.mock import patch
+
+import fitz
+from docx import Document
+
+from src.utils import Extractor, ExtractionEngine
+from src.utils.concurrency import TaskTimeoutError
+
+
+def pdf_bytes(pages):
+    document = fitz.open()
+    for text in pages:
+        document.new_page().insert_text((72, 72), text)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def docx_bytes(paragraphs):
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+class TestExtractor(unittest.TestCase):
+
+    def test_pdf_pages_are_joined_in_order(self):
+        content = base64.b64encode(pdf_bytes(["primeira", "segunda", "terceira"])).decode()
+
+        text = Extractor.extract_text(content, "PDF")
+
+        self.assertEqual([line for line in text.splitlines() if line], ["primeira", "segunda", "terceira"])
+
+    def test_docx_paragraphs(self):
+        content = base64.b64encode(docx_bytes(["um", "dois"])).decode()
+
+        self.assertEqual(Extractor.extract_text(content, "docx"), "um\ndois\n")
+
+    def test_decoded_buffer_is_not_copied(self):
+        data = pdf_bytes(["página"])
+
+        buffer = Extractor.buffer(data)
+
+        self.assertIs(buffer.obj, data)
+        self.assertIs(Extractor._bytes(buffer), data)
+        self.assertEqual(Extractor._bytes(buffer[:4]), data[:4])
+        self.assertIn("página", Extractor.extract_text(buffer, "pdf"))
+
+    def test_stream_and_other_extensions(self):
+        data = docx_bytes(["texto"])
+
+        self.assertEqual(Extractor.stream(base64.b64encode(data).decode()).getvalue(), data)
+        self.assertEqual(Extractor.extract_text_from_docx(io.BytesIO(data)), "texto\n")
+        self.assertEqual(Extractor.extract_text("conteúdo", "txt"), "conteúdo")
+
+
+class TestExtractionEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = ExtractionEngine(workers=2, timeout=60, shard_pages=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.shutdown()
+
+    def test_large_pdf_is_sharded_in_page_order(self):
+        pages = [f"página {i}" for i in range(7)]
+        data = pdf_bytes(pages)
+
+        plan = self.engine._plan(data, "pdf")
+        text = self.engine.extract(base64.b64encode(data).decode(), "pdf")
+
+        self.assertEqual(plan[2], [(0, 4), (4, 7)])
+        self.assertEqual([line for line in text.splitlines() if line], pages)
+
+    def test_batch_keeps_order_and_isolates_failures(self):
+        documents = [
+            (base64.b64encode(docx_bytes(["um"])).decode(), "docx"),
+            (base64.b64encode(pdf_bytes(["dois"])).decode(), "pdf"),
+            (base64.b64encode(b"not a pdf").decode(), "pdf"),
+            ("texto", "txt"),
+        ]
+
+        results = self.engine.extract_many(documents)
+
+        self.assertEqual(results[0], "um\n")
+        self.assertEqual(results[1].strip(), "dois")
+        self.assertIsInstance(results[2], Exception)
+        self.assertEqual(results[3], "texto")
+
+    def test_timeout_per_document(self):
+        engine = ExtractionEngine(workers=1, timeout=0, shard_pages=1)
+        try:
+            results = engine.extract_many([(pdf_bytes(["a", "b"]), "pdf"), (docx_bytes(["c"]), "docx")])
+        finally:
+            engine.shutdown()
+
+        self.assertIsInstance(results[0], TaskTimeoutError)
+
+    def test_hung_document_does_not_hold_the_pool(self):
+        engine = ExtractionEngine(workers=1, timeout=1, shard_pages=1)
+        hung = pdf_bytes(["travado"])
+        submit = ExtractionEngine._submit
+        hung_pools = []
+
+        def submit_hanging(executor, plan):
+            # Simula um documento que trava o PyMuPDF
+            if plan[1] == hung:
+                futures = [executor.submit(time.sleep, 60)]
+                hung_pools.append(list(executor._processes.values()))
+                return futures
+            return submit(executor, plan)
+
+        try:
+            with patch.object(engine, "_submit", side_effect=submit_hanging):
+                first = engine.extract_many([(hung, "pdf"), (docx_bytes(["depois"]), "docx")])
+            started = time.monotonic()
+            second = engine.extract_many([(docx_bytes(["próximo"]), "docx"), (pdf_bytes(["lote"]), "pdf")])
+        finally:
+            engine.shutdown()
+
+        self.assertIsInstance(first[0], TaskTimeoutError)
+        # O outro documento do lote é reenviado ao novo pool
+        self.assertEqual(first[1], "depois\n")
+        self.assertEqual(second[0], "próximo\n")
+        self.assertLess(time.monotonic() - started, 30)
+        self.assertTrue(hung_pools[0])
+        self.assertFalse(any(process.is_alive() for process in hung_pools[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.domain.lexical_index import LexicalIndex, HybridRetriever
+from src.domain.rag import RAG
+from src.domain.vector_index import VectorIndex
+from tests.domain.helpers import WordEmbeddings, documents
+
+SOURCES = dict(
+    users="def getUserById(user_id):\n    return db.fetch(user_id)\n",
+    orders="def list_orders(customer):\n    return db.query(customer)\n",
+    billing="class InvoiceService:\n    def total(self, invoice):\n        return invoice.amount\n",
+    notes="user accounts are fetched from the database by id",
+)
+
+
+class TestLexicalIndex(unittest.TestCase):
+
+    def test_tokens_split_identifiers(self):
+        self.assertEqual(
+            LexicalIndex.tokens("getUserById(user_id) HTTPServer"),
+            ["getuserbyid", "get", "user", "by", "id", "user_id", "user", "id", "httpserver", "http", "server"]
+        )
+
+    def test_bm25_prefers_exact_identifier(self):
+        index = LexicalIndex()
+        index.add(enumerate(SOURCES.values()))
+
+        results = index.search("getUserById", k=2)
+
+        self.assertEqual(results[0][0], 0)
+        self.assertEqual(index.search("list_orders", k=1)[0][0], 1)
+        self.assertEqual(index.search("nothing_matches_this", k=3), [])
+
+    def test_remove(self):
+        index = LexicalIndex()
+        index.add(enumerate(SOURCES.values()))
+
+        index.remove([0])
+
+        self.assertNotIn(0, [chunk_id for chunk_id, _ in index.search("getUserById", k=4)])
+        self.assertEqual(index.ids(), {1, 2, 3})
+
+    def test_fuse_combines_rankings(self):
+        self.assertEqual(LexicalIndex.fuse([1, 2, 3], [3, 4], k=2, lexical_weight=1.0), [3, 1])
+        self.assertEqual(LexicalIndex.fuse([1, 2, 3], [3, 4], k=2, lexical_weight=0.0), [1, 2])
+
+
+class TestHybridRetrieval(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.embeddings = WordEmbeddings()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def open(self):
+        return VectorIndex("repo", self.embeddings, RAG.split_documents, directory=self.root, compact_ratio=1.0)
+
+    def test_vector_index_finds_identifier(self):
+        index = self.open()
+        index.sync(documents(**SOURCES))
+
+        self.assertEqual(index.search("InvoiceService", k=1)[0].metadata["source"], "billing")
+
+    def test_lexical_postings_follow_sync_and_persist(self):
+        index = self.open()
+        index.sync(documents(**SOURCES))
+        index.sync(documents(**dict(SOURCES, users="def getAccount(account_id):\n    return account_id\n")))
+
+        # O trecho antigo virou lápide e saiu das listas invertidas
+        self.assertFalse([d for d in index.search("getUserById", k=4) if "getUserById" in d.page_content])
+        reopened = self.open()
+        self.assertEqual(reopened.search("getAccount", k=1)[0].metadata["source"], "users")
+        self.assertEqual(len(reopened.lexical.ids()), len(SOURCES))
+
+    def test_existing_index_is_backfilled(self):
+        index = self.open()
+        index.sync(documents(**SOURCES))
+        with index._lock:
+            index._connection.execute("DELETE FROM lexical_postings")
+            index._connection.execute("DELETE FROM lexical_documents")
+            index._connection.commit()
+
+        self.assertEqual(len(self.open().lexical.ids()), len(SOURCES))
+
+    @patch.dict(os.environ, {"VECTOR_INDEX_ENABLED": "false"})
+    def test_rag_retriever_is_hybrid(self):
+        # Sem o índice persistente, a busca híbrida é montada em memória
+        retriever = RAG.retriever(documents(**SOURCES), self.embeddings)
+
+        self.assertIsInstance(retriever, HybridRetriever)
+        self.assertEqual(retriever.invoke("list_orders")[0].metadata["source"], "orders")
+
+        with patch.dict(os.environ, {"HYBRID_RETRIEVAL_ENABLED": "false"}):
+            self.assertNotIsInstance(RAG.retriever(documents(**SOURCES), self.embeddings), HybridRetriever)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.domain.llm_cache import LLMCache
+from src.domain.llm_gateway import LLMGateway
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "cache.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_key_depends_on_every_component(self):
+        base = LLMCache.key("gemini", "prompt", "python", "code")
+
+        self.assertEqual(base, LLMCache.key("gemini", "prompt", "python", "code"))
+        self.assertNotEqual(base, LLMCache.key("gemini-pro", "prompt", "python", "code"))
+        self.assertNotEqual(base, LLMCache.key("gemini", "prompt v2", "python", "code"))
+        self.assertNotEqual(base, LLMCache.key("gemini", "prompt", "java", "code"))
+        self.assertNotEqual(base, LLMCache.key("gemini", "prompt", "python", "code "))
+
+    def test_persistent_tier_and_stats(self):
+        LLMCache(path=self.path).put("k", "resposta", tokens=120)
+
+        cache = LLMCache(path=self.path)
+        self.assertEqual(cache.get("k"), "resposta")
+        self.assertEqual(cache.get("k"), "resposta")
+        self.assertIsNone(cache.get("outra"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["tokens_saved"], 240)
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
+
+    def test_expired_entries_are_ignored(self):
+        cache = LLMCache(path=self.path, ttl=-1)
+        cache.put("k", "resposta", tokens=1)
+
+        self.assertIsNone(cache.get("k"))
+
+    def test_version_change_invalidates(self):
+        LLMCache(path=self.path, version="1").put("k", "resposta", tokens=1)
+
+        self.assertIsNone(LLMCache(path=self.path, version="2").get("k"))
+        self.assertIsNone(LLMCache(path=self.path, version="1").get("k"))
+
+    def test_gateway_uses_cache(self):
+        cache = LLMCache(path=self.path)
+        model = MagicMock()
+        model.invoke.return_value = MagicMock(content="análise")
+
+        with patch.object(LLMCache, "default", return_value=cache), \
+                patch("src.domain.llm_gateway.ClientRegistry.chat", return_value=model):
+            first = LLMGateway.analyze_code("print(1)", prompt="revise", language="python")
+            second = LLMGateway.analyze_code("print(1)", prompt="revise", language="python")
+            LLMGateway.analyze_code("print(1)", prompt="revise de novo", language="python")
+
+        self.assertEqual(first, second)
+        self.assertEqual(model.invoke.call_count, 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
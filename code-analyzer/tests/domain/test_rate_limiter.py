@@ -0,0 +1,94 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from google.api_core.exceptions import ResourceExhausted
+
+from src.domain.rate_limiter import RateLimiter, TokenBucket, LLMQuotaExceededError
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_reserve_returns_wait_when_empty(self):
+        bucket = TokenBucket(per_minute=60, capacity=2)
+
+        self.assertEqual(bucket.reserve(1), 0.0)
+        self.assertEqual(bucket.reserve(1), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0, delta=0.05)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def build(self, **kwargs):
+        params = dict(rpm=0, tpm=0, max_inflight=8, max_retries=3, backoff_base=0.001, backoff_max=0.01)
+        params.update(kwargs)
+        return RateLimiter(**params)
+
+    def test_retries_quota_errors_and_halves_concurrency(self):
+        limiter = self.build()
+        fn = MagicMock(side_effect=[ResourceExhausted("quota"), ResourceExhausted("quota"), "ok"])
+
+        self.assertEqual(limiter.call(fn), "ok")
+
+        metrics = limiter.metrics()
+        self.assertEqual(metrics["throttles"], 2)
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["inflight"], 0)
+        self.assertLess(metrics["concurrency_limit"], 8)
+
+    def test_raises_quota_exceeded_after_max_retries(self):
+        limiter = self.build(max_retries=1)
+
+        with self.assertRaises(LLMQuotaExceededError):
+            limiter.call(MagicMock(side_effect=Exception("429 Too Many Requests")))
+
+        self.assertEqual(limiter.metrics()["failures"], 1)
+
+    def test_other_errors_are_not_retried(self):
+        limiter = self.build()
+        fn = MagicMock(side_effect=ValueError("resposta inválida"))
+
+        with self.assertRaises(ValueError):
+            limiter.call(fn)
+
+        self.assertEqual(fn.call_count, 1)
+        self.assertEqual(limiter.metrics()["concurrency_limit"], 8)
+
+    def test_quota_errors_are_classified_by_type_or_status(self):
+        class HttpError(Exception):
+            status_code = 429
+
+        wrapped = RuntimeError("falha no modelo")
+        wrapped.__cause__ = ResourceExhausted("quota")
+
+        self.assertTrue(RateLimiter.is_quota_error(ResourceExhausted("quota")))
+        self.assertTrue(RateLimiter.is_quota_error(HttpError("erro")))
+        self.assertTrue(RateLimiter.is_quota_error(wrapped))
+        self.assertTrue(RateLimiter.is_quota_error(Exception("429 Resource exhausted")))
+        self.assertFalse(RateLimiter.is_quota_error(ValueError("InvalidArgument: prompt com 4290 tokens")))
+        self.assertFalse(RateLimiter.is_quota_error(ValueError("request 1429-abc falhou")))
+        self.assertFalse(RateLimiter.is_quota_error(ValueError("429 campos inválidos")))
+
+    def test_success_increases_concurrency_additively(self):
+        limiter = self.build(max_inflight=4)
+        limiter.concurrency_limit = 2.0
+
+        limiter.call(lambda: None)
+
+        self.assertAlmostEqual(limiter.concurrency_limit, 2.5)
+
+    def test_requests_per_minute_delay_is_recorded(self):
+        limiter = self.build(rpm=600)
+        limiter.requests_bucket = TokenBucket(per_minute=600, capacity=1)
+
+        with patch("src.domain.rate_limiter.time.sleep") as sleep:
+            limiter.call(lambda: None)
+            limiter.call(lambda: None)
+
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args[0][0], 0.1, delta=0.02)
+        self.assertEqual(limiter.metrics()["requests"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
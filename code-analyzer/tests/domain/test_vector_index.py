@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.domain.rag import RAG
+from src.domain.vector_index import VectorIndex
+from tests.domain.helpers import WordEmbeddings, documents
+
+
+class TestVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.embeddings = WordEmbeddings()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def open(self, **kwargs):
+        # Compactação em segundo plano desligada, exceto quando o teste a configura
+        kwargs.setdefault("compact_ratio", 1.0)
+        return VectorIndex("repo", self.embeddings, RAG.split_documents, directory=self.root, **kwargs)
+
+    def test_search_returns_most_similar(self):
+        index = self.open()
+        index.sync(documents(auth="login password token session", db="database query table index"))
+
+        results = index.search("password token", k=1)
+
+        self.assertEqual(results[0].metadata["source"], "auth")
+
+    def test_only_changed_sources_are_embedded(self):
+        self.open().sync(documents(a="alpha beta", b="gamma delta", c="epsilon zeta"))
+        self.embeddings.embedded.clear()
+
+        # Reaberto do disco: nenhuma fonte mudou
+        index = self.open()
+        result = index.sync(documents(a="alpha beta", b="gamma delta changed", c="epsilon zeta"))
+
+        self.assertEqual(self.embeddings.embedded, ["gamma delta changed"])
+        self.assertEqual(result["unchanged"], 2)
+        self.assertEqual(index.stats()["tombstones"], 1)
+
+    def test_removed_sources_are_tombstoned(self):
+        index = self.open()
+        index.sync(documents(a="alpha beta", b="gamma delta"))
+        index.sync(documents(a="alpha beta"))
+
+        sources = {d.metadata["source"] for d in index.search("gamma delta", k=5)}
+
+        self.assertEqual(sources, {"a"})
+
+    def test_compaction_drops_tombstones(self):
+        index = self.open(max_segments=100)
+        index.sync(documents(a="alpha beta", b="gamma delta"))
+        index.sync(documents(a="alpha beta", b="gamma delta epsilon"))
+        self.embeddings.embedded.clear()
+
+        self.assertTrue(index.compact())
+
+        stats = index.stats()
+        self.assertEqual(stats, {"segments": 1, "vectors": 2, "tombstones": 0})
+        self.assertEqual(self.embeddings.embedded, [])
+        self.assertEqual(self.open().search("gamma delta epsilon", k=1)[0].page_content, "gamma delta epsilon")
+
+    def test_background_compaction(self):
+        index = self.open(compact_ratio=0.1)
+        index.sync(documents(a="alpha beta", b="gamma delta"))
+        index.sync(documents(a="alpha beta", b="gamma delta epsilon"))
+        index._compaction.join(timeout=10)
+
+        self.assertEqual(index.stats()["segments"], 1)
+        self.assertEqual(index.stats()["tombstones"], 0)
+
+    def test_retriever(self):
+        index = self.open()
+        index.sync(documents(auth="login password", db="database query"))
+
+        results = index.as_retriever(k=1).invoke("database")
+
+        self.assertEqual(results[0].metadata["source"], "db")
+
+    def test_rag_retriever_reuses_index_without_repository(self):
+        corpus = documents(auth="login password", db="database query")
+
+        with patch.dict(VectorIndex._instances, clear=True), patch.dict("os.environ", {"VECTOR_INDEX_DIR": self.root}):
+            RAG.retriever(corpus, self.embeddings)
+            self.embeddings.embedded.clear()
+            # Outro processo: o índice é reaberto do disco pela mesma chave
+            VectorIndex._instances.clear()
+            retriever = RAG.retriever(documents(auth="login password", db="database query"), self.embeddings)
+
+        self.assertEqual(self.embeddings.embedded, [])
+        self.assertEqual(retriever.invoke("database")[0].metadata["source"], "db")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.domain.index_benchmark import IndexBenchmark
+from src.domain.rag import RAG
+from src.domain.vector_index import VectorIndex
+from src.domain.vector_storage import VectorStorage, FLAT, HNSW, SQ16, IVF, IVFPQ, KINDS
+from tests.domain.helpers import WordEmbeddings, documents
+
+
+class TestVectorStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.vectors = IndexBenchmark.synthetic(2000, 32, clusters=16)
+
+    def test_choose_by_corpus_size(self):
+        storage = VectorStorage(kind="auto", flat_max=100, compress_min=1000)
+
+        self.assertEqual(storage.choose(100), FLAT)
+        self.assertEqual(storage.choose(500), HNSW)
+        self.assertEqual(storage.choose(5000), IVF)
+        # Poucos vetores para treinar as listas do IVF
+        self.assertEqual(VectorStorage(kind=IVFPQ).choose(200), SQ16)
+        self.assertEqual(VectorStorage(kind=FLAT).choose(10 ** 6), FLAT)
+        with self.assertRaises(ValueError):
+            VectorStorage(kind="lsh")
+
+    def test_every_kind_finds_exact_matches(self):
+        storage = VectorStorage(kind="auto", nprobe=8)
+        ids = np.arange(1000, 3000, dtype='int64')
+
+        for kind in KINDS:
+            index = storage.build(self.vectors, ids, kind=kind)
+            _, found = index.search(self.vectors[:20], 1)
+
+            self.assertEqual(VectorStorage.kind_of(index), kind)
+            # A quantização por produto é aproximada mesmo para o próprio vetor
+            self.assertGreaterEqual(np.mean(found[:, 0] == ids[:20]), 0.5 if kind == IVFPQ else 0.9, kind)
+
+    def test_vectors_are_reconstructed_with_ids(self):
+        storage = VectorStorage()
+        ids = np.arange(2000, dtype='int64') * 3
+
+        for kind in (FLAT, SQ16, IVF):
+            vectors, found_ids = VectorStorage.vectors(storage.build(self.vectors, ids, kind=kind))
+
+            np.testing.assert_array_equal(found_ids, ids)
+            np.testing.assert_allclose(vectors, self.vectors, atol=1e-2)
+
+    def test_benchmark_measures_recall_and_size(self):
+        results = IndexBenchmark.run(self.vectors[:1900], self.vectors[1900:], k=5, kinds=[FLAT, SQ16, IVFPQ])
+
+        by_kind = {result.kind: result for result in results}
+        self.assertEqual(by_kind[FLAT].recall, 1.0)
+        self.assertGreater(by_kind[SQ16].recall, 0.9)
+        self.assertLess(by_kind[SQ16].bytes_per_vector, by_kind[FLAT].bytes_per_vector)
+        self.assertLess(by_kind[IVFPQ].bytes_per_vector, by_kind[SQ16].bytes_per_vector)
+
+
+class TestCompressedIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.embeddings = WordEmbeddings()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_vector_index_segments_use_chosen_kind(self):
+        index = VectorIndex("repo", self.embeddings, RAG.split_documents, directory=self.root,
+                            compact_ratio=1.0, storage=VectorStorage(kind=HNSW))
+        index.sync(documents(auth="login password token session", db="database query table index"))
+        index.sync(documents(auth="login password token session", db="schema migration column"))
+
+        self.assertEqual({VectorStorage.kind_of(segment) for segment in index._segments.values()}, {HNSW})
+        self.assertTrue(index.compact())
+        self.assertEqual(index.stats()["segments"], 1)
+        self.assertEqual(index.search("schema column", k=1)[0].metadata["source"], "db")
+
+    def test_rag_vector_uses_compressed_index_for_large_corpora(self):
+        docs = [Document(page_content=f"word{i} shared text", metadata={"n": i}) for i in range(60)]
+
+        with patch.dict("os.environ", {"VECTOR_INDEX_TYPE": SQ16}):
+            vector = RAG.vector(docs, self.embeddings)
+
+        self.assertEqual(VectorStorage.kind_of(vector.index), SQ16)
+        self.assertEqual(vector.similarity_search("word7 shared text", k=1)[0].metadata["n"], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
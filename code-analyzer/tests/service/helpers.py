@@ -0,0 +1,13 @@
+from src.adapters.dtos import UserPreferDTO
+
+
+def build_user_prefer() -> UserPreferDTO:
+    return UserPreferDTO(
+        language="python",
+        prompt="analyze this code for: security",
+        name="tester",
+        code="",
+        email="tester@example.com",
+        token="token",
+        repository={"type": "Github", "owner": "owner", "repo": "repo", "pull_request_number": 7}
+    )
@@ -0,0 +1,221 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.domain import LLMQuotaExceededError
+from src.services.analysis_pipeline import AnalysisPipeline, PipelineCheckpoint
+from src.services.analysis_store import AnalysisStore
+from src.services.file_collector import FileRecord
+from src.services.prompt_compiler import BATCH_HEADER, PromptCompiler
+from src.services.token_packer import TokenPacker
+
+
+def records(paths):
+    return [FileRecord(path=path, size=10, language="python", text=f"def f():\n    return '{path}'\n") for path in paths]
+
+
+def answer(code, prompt, analysis):
+    """Responde como o modelo: uma análise por arquivo, em seções quando o prompt é de um lote."""
+    if BATCH_HEADER not in prompt:
+        return analysis(prompt.splitlines()[-1].replace("- Codigo: ", ""))
+    labels = re.findall(r"^# File: (.+)$", code, re.MULTILINE)
+    return "\n".join(f"{BATCH_HEADER}{label}\n{analysis(label)}\n" for label in labels)
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.compiled_prompt = PromptCompiler.compile("analyze this code for: security", "python")
+        self.paths = ["main.py", "api/routes.py", "api/models.py", "core/engine.py"]
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def pipeline(self, run_id="run", packer=None):
+        return AnalysisPipeline(self.compiled_prompt, PipelineCheckpoint(run_id, directory=self.root),
+                                packer=packer, max_workers=2)
+
+    def one_file_per_batch(self):
+        unit = TokenPacker().split("core/engine.py", records(["core/engine.py"])[0].text)[0]
+        return TokenPacker(max_tokens=unit.tokens, reserved_tokens=0)
+
+    def test_group_by_directory(self):
+        self.assertEqual(AnalysisPipeline.group("main.py", 1), ".")
+        self.assertEqual(AnalysisPipeline.group("src/api/routes.py", 1), "src")
+        self.assertEqual(AnalysisPipeline.group("src/api/routes.py", 2), "src/api")
+
+    def test_map_combine_reduce(self):
+        calls = []
+
+        def analyze_code(code, prompt=None, language=None, shared_prefix=None):
+            calls.append(prompt)
+            if prompt.startswith(self.compiled_prompt.prefix):
+                return answer(code, prompt, lambda label: f"análise: {label}")
+            if "relatório final" in prompt:
+                return "relatório do repositório"
+            return "resumo do módulo"
+
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", side_effect=analyze_code):
+            pipeline = self.pipeline()
+            result = pipeline.run(records(self.paths))
+
+        # 1 lote com os 4 arquivos, 1 resumo (api tem dois arquivos) e o relatório final
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(result.startswith("relatório do repositório"))
+        self.assertIn("## Módulo: api\n\nresumo do módulo", result)
+        self.assertIn("## Módulo: core\n\n### Arquivo: core/engine.py\n\nanálise: core/engine.py", result)
+        self.assertEqual(pipeline.report.batches, 1)
+        self.assertEqual(pipeline.report.groups, 3)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_resumes_from_checkpoint(self):
+        calls = []
+
+        def failing(code, prompt=None, language=None, shared_prefix=None):
+            if "core/engine.py" in prompt:
+                raise LLMQuotaExceededError("429")
+            calls.append(prompt)
+            return "ok"
+
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", side_effect=failing):
+            with self.assertRaises(LLMQuotaExceededError):
+                self.pipeline(packer=self.one_file_per_batch()).run(records(self.paths))
+
+        analyzed = len(calls)
+        self.assertGreater(analyzed, 0)
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", return_value="ok") as analyze_code:
+            pipeline = self.pipeline(packer=self.one_file_per_batch())
+            pipeline.run(records(self.paths))
+
+        mapped = [call for call in analyze_code.call_args_list if call.kwargs.get("shared_prefix")]
+        self.assertEqual(pipeline.report.resumed, analyzed)
+        self.assertEqual(analyze_code.call_count, pipeline.report.llm_calls)
+        # Só o arquivo que falhou volta a ser analisado
+        self.assertEqual(len(mapped), 4 - analyzed)
+
+    def test_checkpoint_appends_one_line_per_result(self):
+        checkpoint = PipelineCheckpoint("run", directory=self.root)
+        checkpoint.put("a", "primeiro")
+        checkpoint.put("b", "segundo")
+        checkpoint.put("a", "refeito")
+        # Escrita interrompida no meio da última linha
+        with open(checkpoint.path, 'a', encoding='utf-8') as f:
+            f.write('{"key": "c", "resu')
+
+        reloaded = PipelineCheckpoint("run", directory=self.root)
+        reloaded.put("d", "após a queda")
+
+        self.assertEqual((reloaded.get("a"), reloaded.get("b"), reloaded.get("c")), ("refeito", "segundo", None))
+        with open(checkpoint.path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 4)
+        self.assertEqual(PipelineCheckpoint("run", directory=self.root).get("d"), "após a queda")
+
+    def test_large_summaries_are_reduced_in_levels(self):
+        pipeline = self.pipeline()
+        pipeline.packer.budget = 5
+
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", return_value="resumo") as analyze_code:
+            result = pipeline._summarize([f"texto longo número {i}" for i in range(8)], "resuma")
+
+        self.assertEqual(result, "resumo")
+        # 4 partes de 2 textos e depois um resumo dos 4 resumos, que já cabem juntos
+        self.assertEqual(analyze_code.call_count, 4 + 1)
+
+    def test_split_batch_response(self):
+        response = "Resumo geral\n### Arquivo: a.py\nanálise de a\n\n## Arquivo: `b.py`\nanálise de b\n"
+
+        self.assertEqual(AnalysisPipeline.split_batch(["a.py", "b.py"], response), ["análise de a", "análise de b"])
+        self.assertIsNone(AnalysisPipeline.split_batch(["a.py", "b.py", "c.py"], response))
+
+    def test_batch_without_sections_falls_back_to_one_call_per_file(self):
+        prompts = []
+
+        def analyze_code(code, prompt=None, language=None, shared_prefix=None):
+            prompts.append(prompt)
+            if BATCH_HEADER in prompt:
+                return "análise sem seções"
+            return f"análise: {prompt.splitlines()[-1]}"
+
+        pipeline = self.pipeline()
+        units = [unit for record in records(["a.py", "b.py"]) for unit in pipeline.packer.split(record.path, record.text)]
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", side_effect=analyze_code):
+            results = pipeline._map(units, {})
+
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual(results, ["análise: - Codigo: a.py", "análise: - Codigo: b.py"])
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = AnalysisStore(path=os.path.join(self.root, "store.sqlite3"))
+        self.compiled_prompt = PromptCompiler.compile("analyze this code for: security", "python")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def run_pipeline(self, files, analyze_code):
+        pipeline = AnalysisPipeline(
+            self.compiled_prompt,
+            PipelineCheckpoint("run", directory=os.path.join(self.root, "checkpoints")),
+            max_workers=2,
+            group_depth=0,
+            store=self.store,
+            repository="https://example.com/team/repo.git"
+        )
+        with patch("src.services.analysis_pipeline.LLMGateway.analyze_code", side_effect=analyze_code):
+            result = pipeline.run(files)
+        return pipeline, result
+
+    def test_store_key(self):
+        self.store.put("repo", "a.py", "sha1", "prompt", ["análise"])
+
+        self.assertEqual(self.store.get("repo", "a.py", "sha1", "prompt"), ["análise"])
+        self.assertIsNone(self.store.get("repo", "a.py", "sha2", "prompt"))
+        self.assertIsNone(self.store.get("repo", "a.py", "sha1", "outro prompt"))
+        self.assertIsNone(self.store.get("outro", "a.py", "sha1", "prompt"))
+
+    def test_only_changed_files_are_sent(self):
+        paths = ["a.py", "b.py", "c.py"]
+        analyzed = []
+
+        def analyze(label):
+            analyzed.append(label)
+            return f"análise {len(analyzed)}"
+
+        def analyze_code(code, prompt=None, language=None, shared_prefix=None):
+            if shared_prefix:
+                return answer(code, prompt, analyze)
+            return "resumo"
+
+        self.run_pipeline(records(paths), analyze_code)
+        self.assertEqual(len(analyzed), 3)
+
+        changed = records(paths)
+        changed[1].text += "\n# alterado\n"
+        analyzed.clear()
+        pipeline, result = self.run_pipeline(changed, analyze_code)
+
+        self.assertEqual(analyzed, ["b.py"])
+        self.assertEqual(pipeline.report.reused_files, 2)
+        self.assertIn("3 arquivo(s) analisado(s), 2 reaproveitado(s)", result)
+
+    def test_failed_files_are_not_stored(self):
+        def failing(code, prompt=None, language=None, shared_prefix=None):
+            if shared_prefix and "b.py" in prompt:
+                raise ValueError("erro")
+            return "ok"
+
+        self.run_pipeline(records(["a.py", "b.py"]), failing)
+        pipeline, _ = self.run_pipeline(records(["a.py", "b.py"]), lambda *args, **kwargs: "ok")
+
+        self.assertEqual(pipeline.report.reused_files, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.services.blob_store import BlobStore
+from src.utils.source_files import SourceFiles
+
+
+class TestBlobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = BlobStore(root=self.root, max_bytes=1024 ** 2, memory_bytes=1024 ** 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_blob_sha_matches_git(self):
+        # Valor de `echo 'hello' | git hash-object --stdin`
+        self.assertEqual(SourceFiles.blob_sha(b"hello\n"), "ce013625030ba8dba906f756967f9e9ca394464a")
+
+    def test_put_and_get_with_counters(self):
+        record = self.store.put(b"print('hi')\n", "app.py")
+
+        self.assertEqual(record.language, "python")
+        self.assertFalse(record.binary)
+        self.assertIsNone(self.store.get("0" * 40))
+
+        # Um novo store no mesmo diretório encontra o blob na camada em disco
+        other = BlobStore(root=self.root, max_bytes=1024 ** 2, memory_bytes=1024 ** 2)
+        self.assertEqual(other.get(record.sha).text, "print('hi')\n")
+        self.assertEqual(other.stats()["hits"], 1)
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_get_or_load_skips_loader_on_hit(self):
+        record = self.store.put(b"x = 1\n", "a.py")
+        loader_calls = []
+
+        result = self.store.get_or_load(record.sha, "a.py", lambda: loader_calls.append(1) or b"")
+
+        self.assertEqual(result.text, "x = 1\n")
+        self.assertEqual(loader_calls, [])
+
+    def test_binary_detection(self):
+        record = self.store.put(b"\x89PNG\x00\x01", "image.png")
+        self.assertTrue(record.binary)
+        self.assertIsNone(record.text)
+
+    def test_disk_eviction(self):
+        store = BlobStore(root=self.root, max_bytes=2048, memory_bytes=0)
+        for i in range(20):
+            store.put(f"value = {i}\n".encode() * 20, f"file{i}.py")
+
+        size = sum(os.path.getsize(os.path.join(r, f)) for r, _, files in os.walk(self.root) for f in files)
+        self.assertLessEqual(size, 2048)
+        self.assertGreater(store.stats()["evictions"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import time
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.services.code_analyzer import CodeAnalyzer
+from src.services.file_set import FileSet
+from src.services.file_source import MemoryFileSource
+from src.utils.concurrency import Concurrency, TaskTimeoutError
+from tests.service.helpers import build_user_prefer
+
+
+class TestConcurrency(unittest.TestCase):
+
+    def test_map_ordered_keeps_input_order(self):
+        def work(delay):
+            time.sleep(delay)
+            return delay
+
+        results = Concurrency.map_ordered(work, [0.05, 0.0, 0.02], max_workers=3)
+
+        self.assertEqual(results, [0.05, 0.0, 0.02])
+
+    def test_map_ordered_timeout_and_errors(self):
+        def work(item):
+            if item == "slow":
+                time.sleep(0.5)
+            if item == "fail":
+                raise ValueError("boom")
+            return item
+
+        results = Concurrency.map_ordered(work, ["ok", "slow", "fail"], max_workers=3, timeout=0.1)
+
+        self.assertEqual(results[0], "ok")
+        self.assertIsInstance(results[1], TaskTimeoutError)
+        self.assertIsInstance(results[2], ValueError)
+
+    def test_queued_tasks_do_not_consume_timeout(self):
+        results = Concurrency.map_ordered(lambda item: time.sleep(0.06) or item, [1, 2, 3], max_workers=1, timeout=0.1)
+
+        self.assertEqual(results, [1, 2, 3])
+
+
+class TestAnalyzePrConcurrency(unittest.TestCase):
+
+    def setUp(self):
+        environ = patch.dict(os.environ, {"BLOB_STORE_ENABLED": "false", "LLM_MAX_CONCURRENCY": "4"})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+        self.files = {f"mod{i}.py": f"def f{i}():\n    return {i}\n" for i in range(4)}
+        self.user_prefer = build_user_prefer()
+        self.user_prefer.modified_files = list(self.files)
+
+    def test_files_are_analyzed_concurrently_in_order(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def analyze_code(code, prompt=None, language=None, shared_prefix=None):
+            with lock:
+                active.append(code)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(code)
+            return f"análise de {code.split('(')[0]}"
+
+        with patch("src.services.code_analyzer.LLMGateway.analyze_code", side_effect=analyze_code):
+            result = CodeAnalyzer.analyze_pr(None, self.user_prefer, source=MemoryFileSource(self.files))
+
+        self.assertGreater(max(peak), 1)
+        positions = [result.index(f"## Arquivo: mod{i}.py") for i in range(4)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn("análise de def f3", result)
+
+    def test_file_set_is_shared_with_caller(self):
+        files = dict(self.files, **{"empty.py": "  \n", "image.c": b"\x00\x01"})
+        self.user_prefer.modified_files = list(files) + ["missing.py"]
+        file_set = FileSet()
+
+        with patch("src.services.code_analyzer.LLMGateway.analyze_code", return_value="ok") as analyze_code:
+            CodeAnalyzer.analyze_pr(None, self.user_prefer, source=MemoryFileSource(files), file_set=file_set)
+
+        self.assertEqual(file_set.paths, list(self.files))
+        self.assertEqual(analyze_code.call_count, 4)
+        # O código vai uma única vez, anexado pelo LLMGateway, e não dentro do prompt
+        first_call = analyze_code.call_args_list[0].kwargs
+        self.assertNotIn(first_call["code"], first_call["prompt"])
+        source_file = file_set.get("mod0.py")
+        self.assertEqual(source_file.language, "python")
+        self.assertEqual(len(source_file.sha), 40)
+        self.assertGreater(file_set.total_tokens, 0)
+
+    def test_related_context_is_appended_after_shared_prefix(self):
+        with patch.dict(os.environ, {"CONTEXT_ENRICHMENT_ENABLED": "true"}), \
+                patch("src.services.code_analyzer.ContextEnricher.context", return_value="\n- Contexto relacionado: x\n") as context, \
+                patch("src.services.code_analyzer.LLMGateway.analyze_code", return_value="ok") as analyze_code:
+            CodeAnalyzer.analyze_pr(None, self.user_prefer, source=MemoryFileSource(self.files))
+
+        self.assertEqual(context.call_count, 4)
+        self.assertEqual(context.call_args.args[4], list(self.files))
+        call = analyze_code.call_args_list[0].kwargs
+        self.assertTrue(call["prompt"].startswith(call["shared_prefix"]))
+        self.assertTrue(call["prompt"].endswith("- Contexto relacionado: x\n"))
+
+    def test_related_context_goes_into_cached_prefix(self):
+        with patch.dict(os.environ, {"CONTEXT_ENRICHMENT_ENABLED": "true"}), \
+                patch("src.services.code_analyzer.ContextCache.available", return_value=True), \
+                patch("src.services.code_analyzer.ContextEnricher.shared_context", return_value="\n- Contexto do PR\n") as shared, \
+                patch("src.services.code_analyzer.ContextEnricher.context") as context, \
+                patch("src.services.code_analyzer.LLMGateway.analyze_code", return_value="ok") as analyze_code:
+            CodeAnalyzer.analyze_pr(None, self.user_prefer, source=MemoryFileSource(self.files))
+
+        context.assert_not_called()
+        self.assertEqual([path for path, *_ in shared.call_args.args[0]], list(self.files))
+        # O contexto faz parte do prefixo, igual em todas as requisições
+        prefixes = {call.kwargs["shared_prefix"] for call in analyze_code.call_args_list}
+        self.assertEqual(len(prefixes), 1)
+        self.assertTrue(prefixes.pop().endswith("- Contexto do PR\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.adapters.dtos import ChangedFileDTO, ChangeStatusEnum
+from src.services.content_provider import GitHubContentProvider, ContentBudgetExceededError
+from tests.service.helpers import build_user_prefer
+
+
+def response(payload=None, content=b""):
+    mock = MagicMock()
+    mock.status_code = 200
+    mock.json.return_value = payload
+    mock.content = content
+    return mock
+
+
+class TestGitHubContentProvider(unittest.TestCase):
+
+    def setUp(self):
+        environ = patch.dict(os.environ, {"BLOB_STORE_ENABLED": "false"})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+        self.provider = GitHubContentProvider()
+        self.provider.request_client = MagicMock()
+        self.user_prefer = build_user_prefer()
+
+    def test_list_changed_files(self):
+        self.provider.request_client.get.side_effect = [
+            response({"head": {"sha": "abc1234"}, "base": {"sha": "def5678"}}),
+            response([
+                {"filename": "app.py", "status": "modified", "sha": "1" * 40, "patch": "@@ -1 +1 @@"},
+                {"filename": "old.py", "status": "removed", "sha": None},
+            ]),
+        ]
+
+        changed_files = self.provider.list_changed_files(self.user_prefer)
+
+        self.assertEqual(self.user_prefer.head_sha, "abc1234")
+        self.assertEqual(self.user_prefer.base_sha, "def5678")
+        self.assertEqual([f.path for f in changed_files], ["app.py", "old.py"])
+        self.assertEqual(changed_files[1].status, ChangeStatusEnum.REMOVED)
+
+    def test_fetch_files_keeps_order_and_skips_removed(self):
+        def fetch(url, headers, params, timeout):
+            # O primeiro arquivo termina por último para validar a ordenação determinística
+            if url.endswith("a" * 40):
+                time.sleep(0.05)
+            return response(content=url[-40:].encode())
+
+        self.provider.request_client.get.side_effect = fetch
+        changed_files = [
+            ChangedFileDTO(path="a.py", sha="a" * 40),
+            ChangedFileDTO(path="b.py", sha="b" * 40),
+            ChangedFileDTO(path="gone.py", status=ChangeStatusEnum.REMOVED),
+        ]
+
+        contents = self.provider.fetch_files(self.user_prefer, changed_files)
+
+        self.assertEqual(list(contents), ["a.py", "b.py"])
+        self.assertEqual(changed_files[0].size, 40)
+
+    def test_fetch_files_budget(self):
+        self.provider.request_client.get.return_value = response(content=b"x" * 100)
+        changed_files = [ChangedFileDTO(path=f"{i}.py", sha=str(i) * 40) for i in range(3)]
+
+        with self.assertRaises(ContentBudgetExceededError):
+            self.provider.fetch_files(self.user_prefer, changed_files, max_bytes=150)
+
+
+if __name__ == '__main__':
+    unittest.main()
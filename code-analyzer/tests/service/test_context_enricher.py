@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.services.context_enricher import ContextEnricher
+from src.services.symbol_index import SymbolIndex
+
+REPOSITORY = "acme/shop"
+
+FILES = {
+    "shop/pricing.py": (
+        "def apply_discount(total, coupon):\n"
+        "    return total - coupon.value\n"
+        "\n"
+        "\n"
+        "def tax(total):\n"
+        "    return total * 0.1\n"
+    ),
+    "shop/cart.py": (
+        "from .pricing import apply_discount\n"
+        "\n"
+        "\n"
+        "class Cart:\n"
+        "    def __init__(self):\n"
+        "        self.items = []\n"
+        "\n"
+        "    def checkout(self, coupon):\n"
+        "        return apply_discount(self.subtotal(), coupon)\n"
+        "\n"
+        "    def subtotal(self):\n"
+        "        return sum(item.price for item in self.items)\n"
+    ),
+    "shop/api.py": (
+        "def checkout_handler(request):\n"
+        "    cart = load_cart(request)\n"
+        "    return cart.checkout(request.coupon)\n"
+    ),
+    "web/format.js": (
+        "export function money(value) {\n"
+        "  return value.toFixed(2);\n"
+        "}\n"
+    ),
+}
+
+
+class TestContextEnricher(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.index = SymbolIndex(os.path.join(self.root, "symbols.sqlite3"))
+        for path, text in FILES.items():
+            self.index.update(REPOSITORY, path, text, "javascript" if path.endswith(".js") else "python", path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_definitions_include_methods(self):
+        names = [symbol.qualified_name for symbol in self.index.definitions(FILES["shop/cart.py"], "python")]
+
+        self.assertEqual(names, ["Cart", "Cart.__init__", "Cart.checkout", "Cart.subtotal"])
+        self.assertNotIn("checkout", SymbolIndex.calls("    def checkout(self, coupon):\n"))
+
+    def test_unchanged_files_are_not_reindexed(self):
+        self.assertFalse(self.index.update(REPOSITORY, "shop/api.py", FILES["shop/api.py"], "python", "shop/api.py"))
+        self.assertTrue(self.index.update(REPOSITORY, "shop/api.py", "def other():\n    pass\n", "python", "new-sha"))
+
+        self.assertEqual(self.index.lookup(REPOSITORY, ["checkout_handler"]), [])
+        self.assertEqual(len(self.index.lookup(REPOSITORY, ["other"])), 1)
+
+    def test_related_ranks_imports_callees_and_callers(self):
+        enricher = ContextEnricher(REPOSITORY, self.index, top_k=10, max_tokens=5000)
+
+        related = enricher.related("shop/cart.py", FILES["shop/cart.py"], "python")
+        found = [(symbol.path, symbol.qualified_name, relation) for symbol, relation in related]
+
+        self.assertEqual(found[0], ("shop/pricing.py", "apply_discount", "importado"))
+        self.assertIn(("shop/api.py", "checkout_handler", "chama este arquivo"), found)
+        # Definições do próprio arquivo e de arquivos sem relação ficam de fora
+        self.assertFalse([entry for entry in found if entry[0] in ("shop/cart.py", "web/format.js")])
+
+    def test_changed_files_are_excluded(self):
+        enricher = ContextEnricher(REPOSITORY, self.index, top_k=10, max_tokens=5000)
+
+        related = enricher.related("shop/cart.py", FILES["shop/cart.py"], "python",
+                                   changed_paths=["shop/cart.py", "shop/pricing.py"])
+
+        self.assertEqual({symbol.path for symbol, _ in related}, {"shop/api.py"})
+
+    def test_context_respects_top_k_and_token_budget(self):
+        context = ContextEnricher(REPOSITORY, self.index, top_k=1, max_tokens=5000).context(
+            "shop/cart.py", FILES["shop/cart.py"], "python"
+        )
+
+        self.assertIn("### shop/pricing.py:1-2 (apply_discount, importado)", context)
+        self.assertIn("```python\ndef apply_discount(total, coupon):", context)
+        self.assertEqual(context.count("###"), 1)
+
+        self.assertEqual(ContextEnricher(REPOSITORY, self.index, max_tokens=20).context(
+            "shop/cart.py", FILES["shop/cart.py"], "python"
+        ), "")
+
+    def test_shared_context_merges_changed_files(self):
+        enricher = ContextEnricher(REPOSITORY, self.index, top_k=1, max_tokens=5000)
+        files = [(path, FILES[path], "python", FILES[path]) for path in ("shop/cart.py", "shop/api.py")]
+
+        context = enricher.shared_context(files + files[:1], ["shop/cart.py"])
+
+        # Cada arquivo contribui com até top_k definições, sem repetições entre eles
+        self.assertEqual(context.count("### shop/pricing.py:1-2 (apply_discount, importado)"), 1)
+        self.assertIn("(checkout_handler, chama este arquivo)", context)
+        self.assertEqual(context.count("###"), 2)
+        self.assertEqual(enricher.shared_context(files, max_tokens=20), "")
+
+    def test_prune_removes_deleted_files(self):
+        removed = self.index.prune(REPOSITORY, lambda path: path != "shop/pricing.py")
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(self.index.lookup(REPOSITORY, ["apply_discount"]), [])
+        self.assertEqual(self.index.stats(REPOSITORY)["files"], 3)
+
+    def test_enabled_defaults_to_false(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(ContextEnricher.enabled())
+        with patch.dict(os.environ, {"CONTEXT_ENRICHMENT_ENABLED": "true"}):
+            self.assertTrue(ContextEnricher.enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from src.adapters.dtos import ChangeStatusEnum
+from src.services.diff_scoper import DiffScoper
+
+
+def python_module(functions: int = 10) -> str:
+    blocks = []
+    for i in range(functions):
+        body = "".join(f"    value_{j} = {j}\n" for j in range(8))
+        blocks.append(f"def function_{i}(x):\n{body}    return x\n\n\n")
+    return "".join(blocks)
+
+
+class TestDiffScoper(unittest.TestCase):
+
+    def setUp(self):
+        self.code = python_module()
+        self.lines = self.code.splitlines()
+        self.scoper = DiffScoper(context_lines=1, min_file_lines=10, max_block_lines=50)
+
+    def test_changed_lines(self):
+        patch = "@@ -3,3 +3,4 @@ def a():\n ctx\n-old\n+new\n+added\n ctx\n@@ -20,1 +21,0 @@\n-gone\n"
+
+        self.assertEqual(DiffScoper.changed_lines(patch), [3, 4, 5, 21])
+
+    def test_region_snaps_to_enclosing_function(self):
+        target = self.lines.index("def function_4(x):") + 1
+        patch = f"@@ -{target + 3},1 +{target + 3},1 @@\n-    value_2 = 0\n+    value_2 = 2\n"
+
+        regions = self.scoper.scope(self.code, patch, "python")
+
+        self.assertEqual(len(regions), 1)
+        self.assertEqual(regions[0].start_line, target)
+        self.assertTrue(regions[0].text.startswith("def function_4(x):"))
+        self.assertIn("    return x\n", regions[0].text)
+        self.assertNotIn("def function_5", regions[0].text)
+        self.assertIn(f"@@ linhas {target}-", DiffScoper.render(regions))
+
+    def test_overlapping_regions_are_merged(self):
+        first = self.lines.index("def function_1(x):") + 1
+        patch = f"@@ -{first + 1},2 +{first + 1},2 @@\n-a\n-b\n+c\n+d\n"
+
+        regions = self.scoper.scope(self.code, patch, "python")
+
+        self.assertEqual(len(regions), 1)
+
+    def test_brace_language_block(self):
+        methods = "".join(
+            f"public int method{i}(int x) {{\n" + "".join(f"    int v{j} = {j};\n" for j in range(5)) + "    return x;\n}\n\n"
+            for i in range(6)
+        )
+        lines = methods.splitlines()
+        target = lines.index("public int method3(int x) {") + 1
+        patch = f"@@ -{target + 2},1 +{target + 2},1 @@\n-x\n+y\n"
+
+        regions = self.scoper.scope(methods, patch, "java")
+
+        self.assertEqual(regions[0].start_line, target)
+        self.assertTrue(regions[0].text.rstrip().endswith("}"))
+        self.assertNotIn("method4", regions[0].text)
+
+    def test_falls_back_to_whole_file(self):
+        patch = "@@ -1,1 +1,1 @@\n-a\n+b\n"
+
+        self.assertIsNone(self.scoper.scope(self.code, patch, "python", ChangeStatusEnum.ADDED))
+        self.assertIsNone(self.scoper.scope(self.code, None, "python"))
+        self.assertIsNone(DiffScoper(min_file_lines=1000).scope(self.code, patch, "python"))
+
+        everything = "@@ -1,120 +1,120 @@\n" + "".join(f"+{line}\n" for line in self.lines)
+        self.assertIsNone(self.scoper.scope(self.code, everything, "python"))
+
+
+if __name__ == '__main__':
+    unittest.main()
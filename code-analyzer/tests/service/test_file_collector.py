@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.services.file_collector import FileCollector, IgnoreRules
+
+
+class TestFileCollector(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self._write("src/app.py", "print('app')\n")
+        self._write("src/generated/api.py", "x = 1\n")
+        self._write("src/keep.js", "const a = 1;\n")
+        self._write("node_modules/lib/index.js", "module.exports = 1;\n")
+        self._write("logs/debug.py", "print('debug')\n")
+        self._write("build.py", "print('build')\n")
+        self._write("assets/blob.c", b"\x00\x01\x02")
+        self._write("big.go", "// " + "x" * 2000 + "\n")
+        self._write("README.md", "# readme\n")
+        self._write(".gitignore", "logs/\n*.log\n")
+        self._write("src/.gitignore", "generated/\n!keep.js\n")
+        self._write(".gitattributes", "build.py linguist-generated\n*.js linguist-vendored=false\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write(self, path: str, content):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        with open(full_path, mode) as handle:
+            handle.write(content)
+
+    def test_paths_apply_ignore_rules(self):
+        paths = list(FileCollector(self.root).paths())
+
+        self.assertEqual(paths, ["big.go", "assets/blob.c", "src/app.py", "src/keep.js"])
+
+    def test_generic_directory_names_are_excluded_only_at_root(self):
+        self._write("build/out.py", "x = 1\n")
+        self._write("src/env/settings.py", "DEBUG = False\n")
+        self._write("app/build/steps.py", "STEPS = []\n")
+        self._write("app/node_modules/dep/index.js", "module.exports = 1;\n")
+
+        paths = list(FileCollector(self.root).paths())
+
+        self.assertIn("src/env/settings.py", paths)
+        self.assertIn("app/build/steps.py", paths)
+        self.assertNotIn("build/out.py", paths)
+        self.assertNotIn("app/node_modules/dep/index.js", paths)
+
+    def test_collect_skips_binary_and_large_files(self):
+        collector = FileCollector(self.root, max_file_bytes=1024)
+        records = list(collector.collect())
+
+        self.assertEqual([r.path for r in records], ["src/app.py", "src/keep.js"])
+        self.assertEqual(records[0].language, "python")
+        self.assertEqual(collector.stats["files"], 2)
+
+    def test_collect_stops_at_total_budget(self):
+        collector = FileCollector(self.root, max_file_bytes=1024, max_total_bytes=20)
+        records = list(collector.collect())
+
+        self.assertEqual([r.path for r in records], ["src/app.py"])
+        self.assertEqual(collector.stats["truncated"], 1)
+
+    def test_ignore_pattern_anchoring(self):
+        rules = IgnoreRules(self.root, [IgnoreRules.compile("/docs/**/*.py"), IgnoreRules.compile("tmp*")])
+
+        self.assertTrue(rules.match(os.path.join(self.root, "docs/a/b/c.py"), False))
+        self.assertIsNone(rules.match(os.path.join(self.root, "src/docs/c.py"), False))
+        self.assertTrue(rules.match(os.path.join(self.root, "src/tmp_file.py"), False))
+
+
+if __name__ == '__main__':
+    unittest.main()
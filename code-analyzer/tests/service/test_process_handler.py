@@ -0,0 +1,53 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.domain import LLMQuotaExceededError
+from src.services.process_handler import ProcessHandler
+
+
+def build_message(message_id="m-1", delivery_attempt=None):
+    message = MagicMock()
+    message.message_id = message_id
+    message.delivery_attempt = delivery_attempt
+    return message
+
+
+class TestProcessMessage(unittest.TestCase):
+
+    def setUp(self):
+        ProcessHandler._attempts.clear()
+        patcher = patch.object(ProcessHandler, "process_request", side_effect=LLMQuotaExceededError("cota"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_quota_error_delays_redelivery(self):
+        message = build_message()
+
+        with patch.dict(os.environ, {"PUBSUB_REDELIVERY_DELAY_SECONDS": "30"}):
+            ProcessHandler.process_message(message)
+            ProcessHandler.process_message(message)
+
+        self.assertEqual([c.args[0] for c in message.modify_ack_deadline.call_args_list], [30, 60])
+        self.assertEqual(message.drop.call_count, 2)
+        message.nack.assert_not_called()
+        message.ack.assert_not_called()
+
+    def test_message_is_acked_after_max_deliveries(self):
+        with patch.dict(os.environ, {"PUBSUB_MAX_DELIVERY_ATTEMPTS": "3"}):
+            message = build_message(delivery_attempt=3)
+            ProcessHandler.process_message(message)
+
+            local = build_message("m-2")
+            for _ in range(3):
+                ProcessHandler.process_message(local)
+
+        message.ack.assert_called_once()
+        message.modify_ack_deadline.assert_not_called()
+        local.ack.assert_called_once()
+        self.assertEqual(local.drop.call_count, 2)
+        self.assertNotIn("m-2", ProcessHandler._attempts)
+
+
+if __name__ == '__main__':
+    unittest.main()
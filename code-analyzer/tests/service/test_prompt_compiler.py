@@ -0,0 +1,48 @@
+import unittest
+
+from src.services.prompt_compiler import PromptCompiler, GENERAL_SECTION
+
+
+class TestPromptCompiler(unittest.TestCase):
+
+    def test_analysis_types_from_marker(self):
+        types = PromptCompiler.analysis_types("Analyze this code for: security, SOLID and duplicação. Ignore performance.")
+
+        self.assertEqual(types, ["security issues", "SOLID principles", "duplication"])
+
+    def test_analysis_types_fallback_keywords(self):
+        types = PromptCompiler.analysis_types("Revise a qualidade e o desempenho")
+
+        self.assertEqual(types, ["code quality", "performance optimizations"])
+
+    def test_compile_is_cached_by_prompt_and_language(self):
+        first = PromptCompiler.compile("analyze this code for: security", "python")
+
+        self.assertIs(first, PromptCompiler.compile("analyze this code for: security", "python"))
+        self.assertIsNot(first, PromptCompiler.compile("analyze this code for: security", "java"))
+
+    def test_prefix_is_shared_and_code_goes_last(self):
+        compiled = PromptCompiler.compile("analyze this code for: security", "python")
+        first = compiled.for_file("a.py")
+        second = compiled.for_file("b.py")
+
+        self.assertTrue(first.startswith(compiled.prefix) and second.startswith(compiled.prefix))
+        self.assertIn("Vulnerabilidades (OWASP)", compiled.prefix)
+        self.assertIn(GENERAL_SECTION, compiled.prefix)
+        self.assertTrue(first.rstrip().endswith("- Codigo: a.py"))
+
+    def test_shared_sections_are_rendered_once(self):
+        compiled = PromptCompiler.compile(
+            "analyze this code for: performance, optimization, big o, bugs, code smells, security, owasp."
+        )
+
+        self.assertEqual(len(compiled.analysis_types), 7)
+        self.assertEqual(compiled.prefix.count("Otimização (BIG O):"), 1)
+        self.assertEqual(compiled.prefix.count("Code Smells:"), 1)
+        self.assertEqual(compiled.prefix.count("Vulnerabilidades (OWASP):"), 1)
+        # A ordem das seções segue a do primeiro tipo que as usa
+        self.assertLess(compiled.prefix.index("Vulnerabilidades (OWASP):"), compiled.prefix.index("Otimização (BIG O):"))
+
+
+if __name__ == '__main__':
+    unittest.main()
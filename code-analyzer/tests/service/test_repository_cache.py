@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git import Repo, Actor
+
+from src.services.repository_cache import RepositoryCache
+
+
+class TestRepositoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.workdir, "remote")
+        self.remote = Repo.init(self.remote_path)
+        self._commit("app.py", "print('v1')\n")
+        self.cache = RepositoryCache(root=os.path.join(self.workdir, "cache"), max_bytes=1024 ** 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _commit(self, name: str, content: str):
+        with open(os.path.join(self.remote_path, name), "w") as handle:
+            handle.write(content)
+        self.remote.index.add([name])
+        author = Actor("Tester", "tester@example.com")
+        self.remote.index.commit(f"update {name}", author=author, committer=author)
+
+    def _destination(self, name: str) -> str:
+        path = os.path.join(self.workdir, name)
+        os.makedirs(path)
+        return path
+
+    def test_build_key(self):
+        self.assertEqual(RepositoryCache.build_key("Github", "Owner", "my repo"), "github/owner/my_repo")
+        with self.assertRaises(ValueError):
+            RepositoryCache.build_key("Github", None, "repo")
+
+    def test_checkout_reuses_mirror_and_fetches_incrementally(self):
+        key = RepositoryCache.build_key("Github", "owner", "repo")
+
+        first = self._destination("job1")
+        self.cache.checkout(key, self.remote_path, first)
+        self.assertTrue(os.path.exists(os.path.join(self.cache.mirror_path(key), "HEAD")))
+        self.cache.release(first)
+
+        self._commit("app.py", "print('v2')\n")
+
+        second = self._destination("job2")
+        self.cache.checkout(key, self.remote_path, second)
+        with open(os.path.join(second, "app.py")) as handle:
+            self.assertEqual(handle.read(), "print('v2')\n")
+        self.cache.release(second)
+
+    def test_evict_skips_leased_mirrors(self):
+        key = RepositoryCache.build_key("Github", "owner", "repo")
+        destination = self._destination("job")
+        self.cache.checkout(key, self.remote_path, destination)
+
+        self.cache.max_bytes = 0
+        self.cache.evict()
+        self.assertTrue(os.path.exists(self.cache.mirror_path(key)))
+
+        self.cache.release(destination)
+        self.cache.evict()
+        self.assertFalse(os.path.exists(self.cache.mirror_path(key)))
+
+    def count_objects(self, key):
+        stats = Repo(self.cache.mirror_path(key)).git.count_objects("-v").splitlines()
+        return {line.split(": ")[0]: int(line.split(": ")[1]) for line in stats if line.split(": ")[0] in ("count", "packs")}
+
+    def test_fetch_collects_garbage_in_the_mirror(self):
+        key = RepositoryCache.build_key("Github", "owner", "repo")
+        self.cache.release(self.cache.checkout(key, self.remote_path, self._destination("job0")).working_dir)
+        # Cada fetch grava um pack; acima de 2 packs o gc --auto os junta
+        mirror = Repo(self.cache.mirror_path(key))
+        mirror.git.config("fetch.unpackLimit", "1")
+        mirror.git.config("gc.autoPackLimit", "2")
+
+        for i in range(1, 4):
+            self._commit("app.py", f"print('v{i + 1}')\n")
+            destination = self._destination(f"job{i}")
+            self.cache.checkout(key, self.remote_path, destination)
+            self.cache.release(destination)
+
+        self.assertEqual(self.count_objects(key)["packs"], 1)
+        with open(os.path.join(destination, "app.py")) as handle:
+            self.assertEqual(handle.read(), "print('v4')\n")
+
+    def test_gc_failure_does_not_fail_checkout(self):
+        key = RepositoryCache.build_key("Github", "owner", "repo")
+        self.cache.release(self.cache.checkout(key, self.remote_path, self._destination("job1")).working_dir)
+        self._commit("app.py", "print('v2')\n")
+
+        with patch("git.cmd.Git.gc", side_effect=Exception("gc falhou"), create=True):
+            destination = self._destination("job2")
+            self.cache.checkout(key, self.remote_path, destination)
+
+        with open(os.path.join(destination, "app.py")) as handle:
+            self.assertEqual(handle.read(), "print('v2')\n")
+        self.cache.release(destination)
+
+
+if __name__ == '__main__':
+    unittest.main()
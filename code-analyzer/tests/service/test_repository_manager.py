@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Repo, Actor
+
+from src.services.repository_manager import RepositoryManager
+
+
+class TestRepositoryManagerSparseClone(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.workdir, "remote")
+        remote = Repo.init(self.remote_path)
+        remote.git.config("uploadpack.allowFilter", "true")
+
+        for name, content in (("src/app.py", "print('app')\n"), ("docs/guide.md", "# guide\n"), ("lib [v2].py", "x = 1\n")):
+            path = os.path.join(self.remote_path, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as handle:
+                handle.write(content)
+            remote.index.add([name])
+
+        author = Actor("Tester", "tester@example.com")
+        commit = remote.index.commit("initial", author=author, committer=author)
+        remote.create_head("feature")
+        remote.git.update_ref("refs/pull/3/head", commit.hexsha)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_sparse_clone_checks_out_only_modified_files(self):
+        destination = os.path.join(self.workdir, "job")
+        os.makedirs(destination)
+
+        repo = RepositoryManager._sparse_clone_pr(
+            f"file://{self.remote_path}", destination, 3, ["src/app.py", "lib [v2].py"]
+        )
+
+        self.assertTrue(os.path.exists(os.path.join(destination, "src", "app.py")))
+        self.assertTrue(os.path.exists(os.path.join(destination, "lib [v2].py")))
+        self.assertFalse(os.path.exists(os.path.join(destination, "docs")))
+        self.assertEqual(repo.git.rev_parse("--is-shallow-repository"), "true")
+        self.assertEqual(repo.active_branch.name, "pr_3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.file_collector import FileRecord
+from src.services.token_packer import TokenPacker
+from src.utils.source_files import SourceFiles
+from src.utils.tokens import TokenCounter
+
+
+def count(text):
+    # Contagem determinística para os testes: uma palavra por token
+    return len(text.split()) if text else 0
+
+
+PYTHON_CODE = """import os
+
+
+@decorator
+def first():
+    return 1 + 1 + 1 + 1
+
+
+class Second:
+    def a(self):
+        return 2 + 2 + 2 + 2
+
+    def b(self):
+        return 3 + 3 + 3 + 3
+
+
+def third():
+    return 4
+"""
+
+
+class TestTokenPacker(unittest.TestCase):
+
+    def setUp(self):
+        counter = patch.object(TokenCounter, "count", side_effect=count)
+        counter.start()
+        self.addCleanup(counter.stop)
+
+    def test_definition_starts_keep_decorators(self):
+        lines = PYTHON_CODE.splitlines(keepends=True)
+
+        self.assertEqual(SourceFiles.definition_starts(lines, "python"), [3, 8, 16])
+        self.assertEqual(SourceFiles.definition_starts(lines, "python", "    "), [9, 12])
+
+    def test_small_file_is_single_unit(self):
+        units = TokenPacker(max_tokens=100, reserved_tokens=0).split("app.py", PYTHON_CODE)
+
+        self.assertEqual(len(units), 1)
+        self.assertEqual(units[0].label, "app.py")
+
+    def test_split_at_definition_boundaries(self):
+        units = TokenPacker(max_tokens=20, reserved_tokens=0).split("app.py", PYTHON_CODE)
+
+        self.assertGreater(len(units), 1)
+        self.assertEqual("".join(u.text for u in units), PYTHON_CODE)
+        for unit in units:
+            self.assertLessEqual(unit.tokens, 20)
+            first_line = unit.text.lstrip("\n").splitlines()[0]
+            self.assertTrue(first_line.lstrip().startswith(("import", "@", "def", "class")), first_line)
+
+    def test_brace_language_split(self):
+        code = "".join(
+            f"public int method{i}(int x) {{\n    return x + {i} + {i} + {i};\n}}\n\n" for i in range(4)
+        )
+        units = TokenPacker(max_tokens=20, reserved_tokens=0).split("App.java", code)
+
+        self.assertEqual("".join(u.text for u in units), code)
+        self.assertTrue(all(u.text.startswith("public int method") for u in units))
+
+    def test_plan_bin_packs_under_budget(self):
+        records = [
+            FileRecord(path=f"f{i}.py", size=0, language="python", text=" ".join(["x"] * size))
+            for i, size in enumerate([8, 3, 5, 2, 6])
+        ]
+        plan = TokenPacker(max_tokens=15, reserved_tokens=0).plan(records)
+
+        self.assertEqual(sum(len(b.units) for b in plan.batches), 5)
+        for batch in plan.batches:
+            self.assertLessEqual(batch.tokens, 15)
+            paths = [u.path for u in batch.units]
+            self.assertEqual(paths, sorted(paths))
+        self.assertIn("lote 1", plan.describe())
+
+    def test_pack_keeps_units_whole_and_in_order(self):
+        # Cada trecho soma 3 tokens do cabeçalho "# File: ...": 5, 9 e 5
+        packer = TokenPacker(max_tokens=15, reserved_tokens=0)
+        units = [packer.split(f"f{i}.py", " ".join(["x"] * size))[0] for i, size in enumerate([2, 6, 2])]
+
+        plan = packer.pack(units)
+
+        self.assertEqual([[u.path for u in b.units] for b in plan.batches], [["f0.py", "f1.py"], ["f2.py"]])
+        self.assertEqual(plan.batches[0].render(), units[0].render() + units[1].render())
+
+
+if __name__ == '__main__':
+    unittest.main()
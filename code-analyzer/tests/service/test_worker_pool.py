@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.services.worker_pool import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def test_limits_from_environment(self):
+        with patch.dict(os.environ, {"WORKER_MAX_JOBS": "3", "PUBSUB_MAX_BYTES": "1024"}):
+            pool = WorkerPool()
+
+        flow_control = pool.flow_control()
+        self.assertEqual(pool.max_jobs, 3)
+        # Sem configuração, o Pub/Sub retém tantas mensagens quantos jobs simultâneos
+        self.assertEqual(flow_control.max_messages, 3)
+        self.assertEqual(flow_control.max_bytes, 1024)
+
+    def test_jobs_are_bounded_and_metered(self):
+        pool = WorkerPool(max_jobs=2)
+        scheduler = pool.scheduler()
+        release = threading.Event()
+        running = threading.Semaphore(0)
+        peak = []
+
+        def job(message):
+            running.release()
+            peak.append(pool.metrics()["inflight"])
+            release.wait(5)
+            message.ack()
+
+        messages = [MagicMock() for _ in range(5)]
+        for message in messages:
+            scheduler.schedule(job, message)
+        running.acquire(timeout=5)
+        running.acquire(timeout=5)
+
+        metrics = pool.metrics()
+        self.assertEqual(metrics["inflight"], 2)
+        self.assertEqual(metrics["queued"], 3)
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while pool.metrics()["completed"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scheduler.shutdown(await_msg_callbacks=True)
+
+        metrics = pool.metrics()
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual((metrics["inflight"], metrics["queued"], metrics["completed"]), (0, 0, 5))
+        self.assertTrue(all(message.ack.called for message in messages))
+        self.assertGreater(metrics["wall_time_seconds_max"], 0)
+
+    def test_shutdown_returns_queued_messages(self):
+        pool = WorkerPool(max_jobs=1)
+        scheduler = pool.scheduler()
+        release = threading.Event()
+        started = threading.Event()
+
+        def job(message):
+            started.set()
+            release.wait(5)
+
+        scheduler.schedule(job, "first")
+        started.wait(5)
+        scheduler.schedule(job, "second")
+        scheduler.schedule(job, "third")
+
+        dropped = scheduler.shutdown(await_msg_callbacks=False)
+        release.set()
+
+        self.assertEqual(dropped, ["second", "third"])
+        self.assertEqual(pool.metrics()["queued"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()